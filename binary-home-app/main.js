@@ -83,8 +83,8 @@ async function fetchFoxFromCloud() {
           fogLevel: data.latest.fog ?? 0,
           fatigue: data.latest.fatigue ?? 0,
           nausea: data.latest.nausea ?? 0,
-          hr: 72, // Not in uplink, keep default
-          bodyBattery: 45, // Not in uplink, keep default
+          hr: data.latest.hr ?? 72, // Sent by garmin_sync pushes
+          bodyBattery: data.latest.bodyBattery ?? 45,
           status: data.latest.mood || 'okay',
           note: data.latest.notes || data.latest.need || '',
           location: data.latest.location || 'The Nest',
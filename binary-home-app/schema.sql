@@ -421,29 +421,154 @@ BEGIN
 END;
 
 -- ============================================================
--- J) VIEWS
+-- I2) ROLLUPS
+-- Running totals kept up to date by triggers, so the dashboard's
+-- type and axis reads cost the same at 60 observations or 6 million.
 -- ============================================================
 
-CREATE VIEW IF NOT EXISTS v_axis_totals AS
+CREATE TABLE IF NOT EXISTS Axis_Totals (
+  dyad_id INTEGER PRIMARY KEY,
+  e_i_total INTEGER NOT NULL DEFAULT 0,
+  s_n_total INTEGER NOT NULL DEFAULT 0,
+  t_f_total INTEGER NOT NULL DEFAULT 0,
+  j_p_total INTEGER NOT NULL DEFAULT 0,
+  signal_count INTEGER NOT NULL DEFAULT 0,
+
+  FOREIGN KEY (dyad_id) REFERENCES Dyad(dyad_id)
+);
+
+-- Existing databases: fill once from the signals already logged
+INSERT OR IGNORE INTO Axis_Totals (dyad_id, e_i_total, s_n_total, t_f_total, j_p_total, signal_count)
 SELECT
   dyad_id,
-  COALESCE(SUM(e_i_delta), 0) AS e_i_total,
-  COALESCE(SUM(s_n_delta), 0) AS s_n_total,
-  COALESCE(SUM(t_f_delta), 0) AS t_f_total,
-  COALESCE(SUM(j_p_delta), 0) AS j_p_total,
-  COUNT(*) AS signal_count
+  COALESCE(SUM(e_i_delta), 0),
+  COALESCE(SUM(s_n_delta), 0),
+  COALESCE(SUM(t_f_delta), 0),
+  COALESCE(SUM(j_p_delta), 0),
+  COUNT(*)
 FROM Axis_Signals
+WHERE NOT EXISTS (SELECT 1 FROM Axis_Totals)
 GROUP BY dyad_id;
 
-CREATE VIEW IF NOT EXISTS v_latest_type AS
-SELECT s1.*
-FROM Emergent_Type_Snapshot s1
-JOIN (
-  SELECT dyad_id, MAX(snapshot_date) AS max_time
+CREATE TRIGGER IF NOT EXISTS trg_axis_totals_insert
+AFTER INSERT ON Axis_Signals
+FOR EACH ROW
+BEGIN
+  INSERT INTO Axis_Totals (dyad_id, e_i_total, s_n_total, t_f_total, j_p_total, signal_count)
+  VALUES (
+    NEW.dyad_id,
+    COALESCE(NEW.e_i_delta, 0),
+    COALESCE(NEW.s_n_delta, 0),
+    COALESCE(NEW.t_f_delta, 0),
+    COALESCE(NEW.j_p_delta, 0),
+    1
+  )
+  ON CONFLICT(dyad_id) DO UPDATE SET
+    e_i_total = e_i_total + excluded.e_i_total,
+    s_n_total = s_n_total + excluded.s_n_total,
+    t_f_total = t_f_total + excluded.t_f_total,
+    j_p_total = j_p_total + excluded.j_p_total,
+    signal_count = signal_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_axis_totals_delete
+AFTER DELETE ON Axis_Signals
+FOR EACH ROW
+BEGIN
+  UPDATE Axis_Totals
+  SET e_i_total = e_i_total - COALESCE(OLD.e_i_delta, 0),
+      s_n_total = s_n_total - COALESCE(OLD.s_n_delta, 0),
+      t_f_total = t_f_total - COALESCE(OLD.t_f_delta, 0),
+      j_p_total = j_p_total - COALESCE(OLD.j_p_delta, 0),
+      signal_count = signal_count - 1
+  WHERE dyad_id = OLD.dyad_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_axis_totals_update
+AFTER UPDATE OF e_i_delta, s_n_delta, t_f_delta, j_p_delta ON Axis_Signals
+FOR EACH ROW
+BEGIN
+  UPDATE Axis_Totals
+  SET e_i_total = e_i_total - COALESCE(OLD.e_i_delta, 0) + COALESCE(NEW.e_i_delta, 0),
+      s_n_total = s_n_total - COALESCE(OLD.s_n_delta, 0) + COALESCE(NEW.s_n_delta, 0),
+      t_f_total = t_f_total - COALESCE(OLD.t_f_delta, 0) + COALESCE(NEW.t_f_delta, 0),
+      j_p_total = j_p_total - COALESCE(OLD.j_p_delta, 0) + COALESCE(NEW.j_p_delta, 0)
+  WHERE dyad_id = NEW.dyad_id;
+END;
+
+-- Points at each dyad's newest type snapshot
+CREATE TABLE IF NOT EXISTS Latest_Type (
+  dyad_id INTEGER PRIMARY KEY,
+  snapshot_id INTEGER NOT NULL,
+  snapshot_date TEXT,
+
+  FOREIGN KEY (dyad_id) REFERENCES Dyad(dyad_id),
+  FOREIGN KEY (snapshot_id) REFERENCES Emergent_Type_Snapshot(snapshot_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_type_dyad_time ON Emergent_Type_Snapshot(dyad_id, snapshot_date, snapshot_id);
+
+INSERT OR IGNORE INTO Latest_Type (dyad_id, snapshot_id, snapshot_date)
+SELECT dyad_id, MAX(snapshot_id), snapshot_date
+FROM Emergent_Type_Snapshot s
+WHERE snapshot_date = (
+  SELECT MAX(snapshot_date) FROM Emergent_Type_Snapshot WHERE dyad_id = s.dyad_id
+)
+GROUP BY dyad_id;
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_type_insert
+AFTER INSERT ON Emergent_Type_Snapshot
+FOR EACH ROW
+BEGIN
+  INSERT INTO Latest_Type (dyad_id, snapshot_id, snapshot_date)
+  VALUES (NEW.dyad_id, NEW.snapshot_id, NEW.snapshot_date)
+  ON CONFLICT(dyad_id) DO UPDATE SET
+    snapshot_id = excluded.snapshot_id,
+    snapshot_date = excluded.snapshot_date
+  WHERE excluded.snapshot_date >= Latest_Type.snapshot_date;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_latest_type_delete
+AFTER DELETE ON Emergent_Type_Snapshot
+FOR EACH ROW
+WHEN OLD.snapshot_id = (SELECT snapshot_id FROM Latest_Type WHERE dyad_id = OLD.dyad_id)
+BEGIN
+  DELETE FROM Latest_Type WHERE dyad_id = OLD.dyad_id;
+
+  INSERT INTO Latest_Type (dyad_id, snapshot_id, snapshot_date)
+  SELECT dyad_id, snapshot_id, snapshot_date
   FROM Emergent_Type_Snapshot
-  GROUP BY dyad_id
-) s2
-ON s1.dyad_id = s2.dyad_id AND s1.snapshot_date = s2.max_time;
+  WHERE dyad_id = OLD.dyad_id
+  ORDER BY snapshot_date DESC, snapshot_id DESC
+  LIMIT 1;
+END;
+
+-- Emotion_Vocabulary.times_used is already a running count; this keeps
+-- v_emotion_frequency an index walk instead of a sort
+CREATE INDEX IF NOT EXISTS idx_emotion_vocab_frequency ON Emotion_Vocabulary(dyad_id, times_used DESC);
+
+-- ============================================================
+-- J) VIEWS
+-- ============================================================
+
+-- Axis totals and latest type read from the rollups above. Dropped and
+-- recreated so databases made before the rollups pick up the new definitions.
+DROP VIEW IF EXISTS v_axis_totals;
+CREATE VIEW v_axis_totals AS
+SELECT
+  dyad_id,
+  e_i_total,
+  s_n_total,
+  t_f_total,
+  j_p_total,
+  signal_count
+FROM Axis_Totals;
+
+DROP VIEW IF EXISTS v_latest_type;
+CREATE VIEW v_latest_type AS
+SELECT s.*
+FROM Latest_Type lt
+JOIN Emergent_Type_Snapshot s ON s.snapshot_id = lt.snapshot_id;
 
 CREATE VIEW IF NOT EXISTS v_recent_observations AS
 SELECT
@@ -0,0 +1,336 @@
+"""
+Indexed reads over companion episodic memory
+memory-episodic.jsonl is append-only JSONL, so finding "biometric logs from
+last week" means parsing every line. This keeps a binary sidecar index
+(memory-episodic.idx) of each entry's byte offset, sorted by entity type
+and date and by name, and reads entries through mmap - a lookup is a
+binary search plus one json.loads per entry returned.
+
+The index catches up incrementally: appended lines are parsed and merged
+in; if the file was rewritten (not just appended to) it's rebuilt. A
+rewrite is noticed by digests of the first and last HEAD_BYTES the index
+covers, plus a spot check that a sample of indexed entries still sit on
+whole lines.
+
+Stdlib only - the MCP server uses it.
+
+Usage:
+    python episodic_index.py --stats
+    python episodic_index.py --type biometric_log --from 2026-01-01 --to 2026-01-07
+    python episodic_index.py --name Garmin_Sync_2026-01-06
+    python episodic_index.py --rebuild
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+
+from garmin_paths import COMPANION_MEMORY_PATH
+
+
+MEMORY_FILE = "memory-episodic.jsonl"
+INDEX_FILE = "memory-episodic.idx"
+
+MAGIC = b"EPIDX002"
+HEAD_BYTES = 4096            # hashed at both ends to notice the file being rewritten rather than appended to
+SPOT_CHECKS = 16             # indexed entries checked to still start and end a line
+# magic, indexed bytes, head + tail digest, types JSON length, date records, name records
+HEADER = struct.Struct("<8sQ64sIQQ")
+# (type id, date ordinal, offset, length) - sorted, so type + date range is a bisect
+DATE_RECORD = struct.Struct("<HIQI")
+# (name hash, offset, length) - sorted by hash
+NAME_RECORD = struct.Struct("<QQI")
+
+_DATE_IN_NAME = re.compile(r"(\d{4}-\d{2}-\d{2})")
+
+
+def _name_hash(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _entry_date(entry: dict) -> int:
+    """Day an entry is about: a date in its name (Garmin_Sync_2026-01-06), else when it was created."""
+    candidates = [entry.get("name") or "", entry.get("created") or ""]
+    candidates += [obs.get("added") or "" for obs in entry.get("observations", [])[:1]]
+    for text in candidates:
+        match = _DATE_IN_NAME.search(str(text))
+        if match:
+            try:
+                return date.fromisoformat(match.group(1)).toordinal()
+            except ValueError:
+                continue
+    return 0
+
+
+class _Records:
+    """Fixed-width records in a buffer, indexable so bisect can search them in place."""
+
+    def __init__(self, buffer, start: int, record: struct.Struct, count: int):
+        self.buffer, self.start, self.record, self.count = buffer, start, record, count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> tuple:
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return self.record.unpack_from(self.buffer, self.start + i * self.record.size)
+
+
+# === BUILDING ===
+
+def _scan(memory_file: Path, start: int, types: list) -> tuple:
+    """Parse complete lines from `start`. Returns (date records, name records, end offset)."""
+    dates, names = [], []
+    end = start
+    with open(memory_file, 'rb') as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            if not line.endswith(b"\n"):
+                break        # a line still being written - pick it up next time
+            length = len(line.rstrip(b"\r\n"))
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            if isinstance(entry, dict):
+                entity_type = str(entry.get("entityType") or entry.get("type") or "")
+                if entity_type not in types:
+                    types.append(entity_type)
+                dates.append((types.index(entity_type), _entry_date(entry), offset, length))
+                if entry.get("name"):
+                    names.append((_name_hash(str(entry["name"])), offset, length))
+            offset += len(line)
+            end = offset
+    return dates, names, end
+
+
+def _head_digest(memory_file: Path, size: int) -> bytes:
+    """Digests of the first and the last HEAD_BYTES of the file's first `size` bytes."""
+    with open(memory_file, 'rb') as f:
+        head = f.read(min(size, HEAD_BYTES))
+        f.seek(max(0, size - HEAD_BYTES))
+        tail = f.read(min(size, HEAD_BYTES))
+    return hashlib.sha256(head).digest() + hashlib.sha256(tail).digest()
+
+
+def _offsets_hold(memory_file: Path, dates: list) -> bool:
+    """True if a spread of indexed entries still start after a newline and end at one."""
+    step = max(1, len(dates) // SPOT_CHECKS)
+    with open(memory_file, 'rb') as f:
+        for _, _, offset, length in dates[::step]:
+            f.seek(max(0, offset - 1))
+            before = f.read(1) if offset else b"\n"
+            f.seek(offset + length)
+            if before != b"\n" or f.read(1) not in (b"\r", b"\n"):
+                return False
+    return True
+
+
+def _read_index(index_file: Path):
+    """(indexed bytes, head digest, types, date records, name records), or None."""
+    try:
+        with open(index_file, 'rb') as f:
+            data = f.read()
+        magic, indexed, head, types_len, n_dates, n_names = HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != MAGIC:
+        return None
+    position = HEADER.size
+    types = json.loads(data[position:position + types_len])
+    position += types_len
+    dates = [DATE_RECORD.unpack_from(data, position + i * DATE_RECORD.size) for i in range(n_dates)]
+    position += n_dates * DATE_RECORD.size
+    names = [NAME_RECORD.unpack_from(data, position + i * NAME_RECORD.size) for i in range(n_names)]
+    return indexed, head, types, dates, names
+
+
+def _write_index(index_file: Path, indexed: int, head: bytes, types: list, dates: list, names: list):
+    types_json = json.dumps(types).encode("utf-8")
+    tmp = index_file.with_name(f".{index_file.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, indexed, head, len(types_json), len(dates), len(names)))
+        f.write(types_json)
+        f.write(b"".join(DATE_RECORD.pack(*r) for r in sorted(dates)))
+        f.write(b"".join(NAME_RECORD.pack(*r) for r in sorted(names)))
+    os.replace(tmp, index_file)
+
+
+def update_index(memory_path: Path = None, full: bool = False) -> dict:
+    """
+    Bring the sidecar up to date with the memory file. Only lines appended
+    since the last update are parsed, unless the file was rewritten.
+    Returns {"entries", "parsed", "rebuilt"}.
+    """
+    memory_path = Path(memory_path or COMPANION_MEMORY_PATH)
+    memory_file, index_file = memory_path / MEMORY_FILE, memory_path / INDEX_FILE
+    size = memory_file.stat().st_size if memory_file.exists() else 0
+
+    existing = None if full else _read_index(index_file)
+    if existing:
+        indexed, head, types, dates, names = existing
+        if size < indexed or _head_digest(memory_file, indexed) != head or not _offsets_hold(memory_file, dates):
+            existing = None      # rewritten, e.g. by --slim-memory
+        elif size == indexed:
+            return {"entries": len(dates), "parsed": 0, "rebuilt": False}
+    if not existing:
+        indexed, types, dates, names = 0, [], [], []
+
+    new_dates, new_names, end = _scan(memory_file, indexed, types) if size else ([], [], 0)
+    dates += new_dates
+    names += new_names
+    memory_path.mkdir(parents=True, exist_ok=True)
+    _write_index(index_file, end, _head_digest(memory_file, end) if size else b"\0" * 64, types, dates, names)
+    return {"entries": len(dates), "parsed": len(new_dates), "rebuilt": not existing}
+
+
+# === READING ===
+
+class EpisodicIndex:
+    """
+    Read side: mmaps the memory file and its sidecar, refreshing both when
+    the memory file changes. Safe to share between threads.
+    """
+
+    def __init__(self, memory_path: Path = None):
+        self.memory_path = Path(memory_path or COMPANION_MEMORY_PATH)
+        self._lock = threading.Lock()
+        self._seen = None
+        self._state = None
+        self._maps = []
+
+    def _refresh(self):
+        memory_file = self.memory_path / MEMORY_FILE
+        try:
+            stat = memory_file.stat()
+        except OSError:
+            self._state = None
+            return
+        seen = (stat.st_size, stat.st_mtime_ns)
+        if seen == self._seen:
+            return
+        # Let go of the old maps first - Windows won't replace a mapped file
+        for m in self._maps:
+            m.close()
+        self._maps, self._state = [], None
+        update_index(self.memory_path)
+
+        with open(self.memory_path / INDEX_FILE, 'rb') as f:
+            index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, indexed, _, types_len, n_dates, n_names = HEADER.unpack_from(index)
+        position = HEADER.size
+        types = json.loads(index[position:position + types_len])
+        position += types_len
+        data = None
+        if indexed:
+            with open(memory_file, 'rb') as f:
+                data = mmap.mmap(f.fileno(), indexed, access=mmap.ACCESS_READ)
+            self._maps.append(data)
+        self._maps.append(index)
+        self._state = {
+            "types": types,
+            "dates": _Records(index, position, DATE_RECORD, n_dates),
+            "names": _Records(index, position + n_dates * DATE_RECORD.size, NAME_RECORD, n_names),
+            "data": data,
+        }
+        self._seen = seen
+
+    def _entry(self, state: dict, offset: int, length: int) -> dict:
+        return json.loads(state["data"][offset:offset + length])
+
+    def get(self, name: str) -> list:
+        """Every entry with exactly this name, oldest first."""
+        with self._lock:
+            self._refresh()
+            state = self._state
+            if not state:
+                return []
+            names, key = state["names"], _name_hash(name)
+            found = []
+            i = bisect_left(names, (key,))
+            while i < len(names) and names[i][0] == key:
+                entry = self._entry(state, names[i][1], names[i][2])
+                if entry.get("name") == name:
+                    found.append((names[i][1], entry))
+                i += 1
+            return [entry for _, entry in sorted(found, key=lambda pair: pair[0])]
+
+    def query(self, entity_type: str = None, start: str = None, end: str = None,
+              limit: int = 50, newest_first: bool = True) -> list:
+        """Entries of a type (or any) whose date falls in [start, end], up to `limit`."""
+        with self._lock:
+            self._refresh()
+            state = self._state
+            if not state:
+                return []
+            low = date.fromisoformat(start).toordinal() if start else 0
+            high = date.fromisoformat(end).toordinal() if end else 2 ** 32 - 1
+
+            types = state["types"]
+            type_ids = [types.index(entity_type)] if entity_type in types else [] if entity_type else range(len(types))
+            dates, hits = state["dates"], []
+            for type_id in type_ids:
+                i = bisect_left(dates, (type_id, low))
+                j = bisect_left(dates, (type_id, high + 1))
+                hits.extend(dates[k] for k in range(i, j))
+
+            hits.sort(key=lambda r: (r[1], r[2]), reverse=newest_first)
+            return [self._entry(state, r[2], r[3]) for r in hits[:limit]]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refresh()
+            state = self._state
+            if not state:
+                return {"entries": 0, "types": {}}
+            counts = {}
+            for type_id, _, _, _ in (state["dates"][i] for i in range(len(state["dates"]))):
+                name = state["types"][type_id]
+                counts[name] = counts.get(name, 0) + 1
+            return {"entries": len(state["dates"]), "types": counts}
+
+
+_default = None
+
+
+def default_index() -> EpisodicIndex:
+    """One shared reader for COMPANION_MEMORY_PATH."""
+    global _default
+    if _default is None:
+        _default = EpisodicIndex()
+    return _default
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag):
+        return args[args.index(flag) + 1] if flag in args and args.index(flag) + 1 < len(args) else None
+
+    if "--rebuild" in args:
+        stats = update_index(full=True)
+        print(f"Indexed {stats['entries']} entries -> {COMPANION_MEMORY_PATH / INDEX_FILE}")
+        return
+
+    index = default_index()
+    if "--stats" in args:
+        print(json.dumps(index.stats(), indent=2))
+    elif "--name" in args:
+        print(json.dumps(index.get(option("--name")), indent=2))
+    else:
+        entries = index.query(option("--type"), option("--from"), option("--to"), int(option("--limit") or 20))
+        print(json.dumps(entries, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+Synthetic-load benchmark for the Binary Home EQ schema
+Fills a scratch database with years of made-up observations (through the
+real triggers), then times the dashboard's reads against the rollup-backed
+views and against the original full-aggregation queries on the same data.
+
+Usage:
+    python eq_bench.py                          # 1,000,000 observations
+    python eq_bench.py --observations 5000000 --db /tmp/eq-bench.db
+    python eq_bench.py --reuse --db /tmp/eq-bench.db   # skip generation
+    python eq_bench.py --append --db /tmp/eq-bench.db  # generate more on top
+
+--db refuses a database that already has data in it unless --reuse or
+--append says what to do with it, so pointing it at the real mirror by
+mistake doesn't fill it with made-up observations.
+"""
+
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from eq_store import EQ_SCHEMA_PATH
+
+
+DEFAULT_OBSERVATIONS = 1_000_000
+SNAPSHOT_EVERY = 500         # one type snapshot per this many observations
+BATCH = 50_000
+READS = 200                  # timed reads per query
+
+# The view definitions from before the rollups, kept for the comparison
+LEGACY_QUERIES = {
+    "axis totals": """
+        SELECT dyad_id,
+               COALESCE(SUM(e_i_delta), 0), COALESCE(SUM(s_n_delta), 0),
+               COALESCE(SUM(t_f_delta), 0), COALESCE(SUM(j_p_delta), 0),
+               COUNT(*)
+        FROM Axis_Signals WHERE dyad_id = 1 GROUP BY dyad_id
+    """,
+    "latest type": """
+        SELECT s1.* FROM Emergent_Type_Snapshot s1
+        JOIN (SELECT dyad_id, MAX(snapshot_date) AS max_time
+              FROM Emergent_Type_Snapshot GROUP BY dyad_id) s2
+        ON s1.dyad_id = s2.dyad_id AND s1.snapshot_date = s2.max_time
+        WHERE s1.dyad_id = 1
+    """,
+    "emotion frequency": """
+        SELECT dyad_id, emotion_word, times_used, t_f_score, e_i_score, user_defined, category
+        FROM Emotion_Vocabulary NOT INDEXED WHERE dyad_id = 1 ORDER BY times_used DESC LIMIT 20
+    """,
+}
+
+CURRENT_QUERIES = {
+    "axis totals": "SELECT * FROM v_axis_totals WHERE dyad_id = 1",
+    "latest type": "SELECT * FROM v_latest_type WHERE dyad_id = 1",
+    "emotion frequency": "SELECT * FROM v_emotion_frequency WHERE dyad_id = 1 LIMIT 20",
+}
+
+CUSTOM_WORDS = [f"custom-{i}" for i in range(400)]
+INTENSITIES = ["whisper", "present", "strong", "overwhelming"]
+TYPES = ["INFP", "INFJ", "ENFP", "ISFP"]
+
+
+def open_db(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+def generate(conn: sqlite3.Connection, observations: int, seed: int = 7):
+    """Insert `observations` synthetic observations spread over the last few years."""
+    rng = random.Random(seed)
+    with open(EQ_SCHEMA_PATH, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    conn.executemany(
+        "INSERT OR IGNORE INTO Emotion_Vocabulary (dyad_id, emotion_word, category, user_defined, "
+        "e_i_score, s_n_score, t_f_score, j_p_score) VALUES (1, ?, 'custom', 1, ?, ?, ?, ?)",
+        [(w, rng.randint(-30, 30), rng.randint(-30, 30), rng.randint(-30, 30), rng.randint(-30, 30))
+         for w in CUSTOM_WORDS],
+    )
+    emotion_ids = [row[0] for row in conn.execute("SELECT emotion_id FROM Emotion_Vocabulary")]
+    pillar_ids = [row[0] for row in conn.execute("SELECT pillar_id FROM EQ_Pillars")]
+    conn.commit()
+
+    start = datetime.now() - timedelta(days=5 * 365)
+    step = timedelta(days=5 * 365) / max(observations, 1)
+    made = 0
+    while made < observations:
+        n = min(BATCH, observations - made)
+        rows = []
+        snapshots = []
+        for i in range(made, made + n):
+            at = (start + step * i).strftime("%Y-%m-%d %H:%M:%S")
+            rows.append((
+                rng.choice(pillar_ids),
+                rng.choice(emotion_ids) if rng.random() < 0.9 else None,
+                rng.choice(INTENSITIES),
+                f"synthetic observation {i}",
+                at, at,
+            ))
+            if i % SNAPSHOT_EVERY == 0:
+                snapshots.append((rng.randint(0, 400), rng.randint(0, 400), rng.randint(0, 1200),
+                                  rng.randint(0, 100), rng.choice(TYPES), i, at))
+        with conn:
+            conn.executemany(
+                "INSERT INTO Pillar_Observations (dyad_id, pillar_id, emotion_id, intensity, content, "
+                "observed_at, created_at) VALUES (1, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.executemany(
+                "INSERT INTO Emergent_Type_Snapshot (dyad_id, e_i_score, s_n_score, t_f_score, j_p_score, "
+                "calculated_type, observation_count, snapshot_date) VALUES (1, ?, ?, ?, ?, ?, ?, ?)",
+                snapshots,
+            )
+        made += n
+        print(f"  {made:,} / {observations:,}", end="\r", flush=True)
+    print()
+
+
+def time_query(conn: sqlite3.Connection, sql: str, reads: int = READS):
+    """Median and worst seconds over `reads` runs, plus the last result."""
+    samples = []
+    result = None
+    for _ in range(reads):
+        t = time.perf_counter()
+        result = conn.execute(sql).fetchall()
+        samples.append(time.perf_counter() - t)
+    samples.sort()
+    return samples[len(samples) // 2], samples[-1], result
+
+
+def check_rollups(conn: sqlite3.Connection) -> bool:
+    """The rollups must agree exactly with aggregating from scratch."""
+    rolled = conn.execute(CURRENT_QUERIES["axis totals"]).fetchall()
+    raw = conn.execute(LEGACY_QUERIES["axis totals"]).fetchall()
+    latest = conn.execute("SELECT snapshot_date FROM v_latest_type WHERE dyad_id = 1").fetchone()
+    newest = conn.execute("SELECT MAX(snapshot_date) FROM Emergent_Type_Snapshot WHERE dyad_id = 1").fetchone()
+    return [tuple(r) for r in rolled] == [tuple(r) for r in raw] and latest == newest
+
+
+USAGE = "Usage: python eq_bench.py [--observations N] [--db PATH] [--reuse | --append]"
+
+
+def parse_args(args: list):
+    """(observations, db_path, reuse, append) from the command line; raises ValueError on anything else."""
+    observations, db_path, reuse, append = DEFAULT_OBSERVATIONS, None, False, False
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == "--reuse":
+            reuse = True
+        elif arg == "--append":
+            append = True
+        elif arg in ("--observations", "--db"):
+            if not args:
+                raise ValueError(f"{arg} needs a value")
+            value = args.pop(0)
+            if arg == "--db":
+                db_path = Path(value)
+            else:
+                observations = int(value)
+                if observations < 1:
+                    raise ValueError("--observations must be at least 1")
+        else:
+            raise ValueError(f"unknown option '{arg}'")
+    if reuse and append:
+        raise ValueError("--reuse and --append don't go together")
+    return observations, db_path, reuse, append
+
+
+def has_data(db_path: Path) -> bool:
+    """True if db_path is an existing database with any tables in it."""
+    if not db_path.exists() or db_path.stat().st_size == 0:
+        return False
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] > 0
+    except sqlite3.DatabaseError:
+        return True      # not a database we can read - certainly not one to write into
+    finally:
+        conn.close()
+
+
+def main():
+    if {"-h", "--help"} & set(sys.argv[1:]):
+        print(USAGE)
+        return
+    try:
+        observations, db_path, reuse, append = parse_args(sys.argv[1:])
+    except ValueError as e:
+        print(e)
+        print(USAGE)
+        return
+    if db_path is not None and not (reuse or append) and has_data(db_path):
+        print(f"{db_path} already has data in it. Pass --reuse to benchmark it as it is, "
+              f"or --append to add {observations:,} observations to it.")
+        return
+
+    print("=" * 50)
+    print("EQ SCHEMA BENCHMARK")
+    print("=" * 50)
+
+    scratch = None
+    if db_path is None:
+        scratch = tempfile.TemporaryDirectory()
+        db_path = Path(scratch.name) / "eq-bench.db"
+
+    conn = open_db(db_path)
+    if not reuse or not conn.execute(
+            "SELECT name FROM sqlite_master WHERE name = 'Pillar_Observations'").fetchone():
+        print(f"\nGenerating {observations:,} observations into {db_path}")
+        t = time.perf_counter()
+        generate(conn, observations)
+        print(f"  {time.perf_counter() - t:.1f}s ({observations / (time.perf_counter() - t):,.0f} rows/s incl. triggers)")
+
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ("Pillar_Observations", "Axis_Signals", "Emotion_Usage", "Emergent_Type_Snapshot")}
+    print("\n" + ", ".join(f"{table}: {n:,}" for table, n in counts.items()))
+
+    print(f"\n{'query':<20}{'before (median/worst)':>26}{'after (median/worst)':>26}")
+    print("-" * 72)
+    for name in CURRENT_QUERIES:
+        before_med, before_max, _ = time_query(conn, LEGACY_QUERIES[name], reads=max(5, READS // 20))
+        after_med, after_max, _ = time_query(conn, CURRENT_QUERIES[name])
+        print(f"{name:<20}{before_med * 1000:>13.3f} / {before_max * 1000:<8.3f} ms"
+              f"{after_med * 1000:>13.3f} / {after_max * 1000:<8.3f} ms")
+
+    print(f"\nRollups match full aggregation: {'yes' if check_rollups(conn) else 'NO'}")
+    conn.close()
+    if scratch:
+        scratch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Local SQLite mirror of the Binary Home EQ schema
+Same tables and views as binary-home-app/schema.sql, in a file on this
+machine, so the companion can read recent observations without a cloud
+round-trip.
+
+    from eq_store import recent_observations, pull_from_cloud
+    pull_from_cloud()                     # only what's new
+    recent_observations(10)               # local, sub-millisecond
+
+Connections are per-thread, WAL-mode, and reused; queries are module-level
+SQL that sqlite3's statement cache keeps prepared on each connection.
+
+Config:
+    EQ_DB_PATH         mirror file (default: companion-memory/binary-home-eq.db)
+    EQ_SCHEMA_PATH     schema to bootstrap from (default: ../binary-home-app/schema.sql)
+    BINARY_HOME_URL    cloud worker for pull/push (shared with garmin_uplink)
+
+Usage:
+    python eq_store.py --pull | --push | --sync | --recent [N]
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+from garmin_paths import COMPANION_MEMORY_PATH
+
+
+EQ_DB_PATH = Path(os.environ.get("EQ_DB_PATH", str(COMPANION_MEMORY_PATH / "binary-home-eq.db")))
+EQ_SCHEMA_PATH = Path(os.environ.get(
+    "EQ_SCHEMA_PATH",
+    str(Path(__file__).resolve().parent.parent / "binary-home-app" / "schema.sql"),
+))
+
+PULL_PAGE = 200       # first /observations page; doubled until it meets the mirror
+PULL_MAX = 10000      # largest page asked for in one pull
+
+# Local-only bookkeeping for cloud sync - never pushed, not part of schema.sql
+SYNC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS Mirror_Sync_State (
+  key TEXT PRIMARY KEY,
+  value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS Mirror_Cloud_Ids (
+  observation_id INTEGER PRIMARY KEY,
+  cloud_id TEXT UNIQUE,
+  pushed_at TEXT,
+  FOREIGN KEY (observation_id) REFERENCES Pillar_Observations(observation_id) ON DELETE CASCADE
+);
+"""
+
+# === PREPARED QUERIES ===
+
+SQL_RECENT_OBSERVATIONS = "SELECT * FROM v_recent_observations WHERE dyad_id = 1 LIMIT ?"
+SQL_EMOTION_FREQUENCY = "SELECT * FROM v_emotion_frequency WHERE dyad_id = 1 LIMIT ?"
+SQL_AXIS_TOTALS = "SELECT * FROM v_axis_totals WHERE dyad_id = 1"
+SQL_LATEST_TYPE = "SELECT * FROM v_latest_type WHERE dyad_id = 1"
+SQL_SHADOW_MOMENTS = "SELECT * FROM v_shadow_moments LIMIT ?"
+SQL_PILLAR_BY_NAME = """
+SELECT pillar_id FROM EQ_Pillars
+WHERE pillar_key = upper(replace(?1, ' ', '_')) OR pillar_name = ?1 OR pillar_type = lower(?1)
+"""
+SQL_EMOTION_BY_WORD = "SELECT emotion_id FROM Emotion_Vocabulary WHERE dyad_id = 1 AND emotion_word = ?"
+SQL_ADD_EMOTION = """
+INSERT OR IGNORE INTO Emotion_Vocabulary (dyad_id, emotion_word, category, user_defined, first_used)
+VALUES (1, ?, 'custom', 1, CURRENT_TIMESTAMP)
+"""
+SQL_ADD_OBSERVATION = """
+INSERT INTO Pillar_Observations (dyad_id, pillar_id, emotion_id, intensity, title, content, observed_at, created_at)
+VALUES (1, ?, ?, COALESCE(?, 'present'), ?, ?, COALESCE(?, CURRENT_TIMESTAMP), COALESCE(?, CURRENT_TIMESTAMP))
+"""
+SQL_LATEST_LOCAL_EMOTION = """
+SELECT po.observation_id, ev.emotion_word
+FROM Pillar_Observations po
+JOIN Emotion_Vocabulary ev ON ev.emotion_id = po.emotion_id
+LEFT JOIN Mirror_Cloud_Ids m ON m.observation_id = po.observation_id
+WHERE m.observation_id IS NULL
+ORDER BY po.observation_id DESC
+LIMIT 1
+"""
+
+
+# === CONNECTIONS ===
+
+_local = threading.local()
+_bootstrap_lock = threading.Lock()
+_bootstrapped = set()
+
+
+def bootstrap(db_path: Path = None, schema_path: Path = None):
+    """Create the mirror from schema.sql (idempotent - every statement is IF NOT EXISTS / OR IGNORE)."""
+    db_path = Path(db_path or EQ_DB_PATH)
+    with _bootstrap_lock:
+        if db_path in _bootstrapped:
+            return
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(Path(schema_path or EQ_SCHEMA_PATH), 'r', encoding='utf-8') as f:
+            schema = f.read()
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(schema)
+            conn.executescript(SYNC_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+        _bootstrapped.add(db_path)
+
+
+def get_connection(db_path: Path = None) -> sqlite3.Connection:
+    """This thread's connection to the mirror, opened (and the mirror bootstrapped) on first use."""
+    db_path = Path(db_path or EQ_DB_PATH)
+    pool = getattr(_local, "connections", None)
+    if pool is None:
+        pool = _local.connections = {}
+    conn = pool.get(db_path)
+    if conn is None:
+        bootstrap(db_path)
+        conn = sqlite3.connect(db_path, cached_statements=256, check_same_thread=True)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+        pool[db_path] = conn
+    return conn
+
+
+def close_connections():
+    """Close this thread's connections."""
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+
+# === READS ===
+
+def _rows(cursor) -> list:
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def recent_observations(limit: int = 20, db_path: Path = None) -> list:
+    return _rows(get_connection(db_path).execute(SQL_RECENT_OBSERVATIONS, (limit,)))
+
+
+def emotion_frequency(limit: int = 20, db_path: Path = None) -> list:
+    return _rows(get_connection(db_path).execute(SQL_EMOTION_FREQUENCY, (limit,)))
+
+
+def axis_totals(db_path: Path = None):
+    row = get_connection(db_path).execute(SQL_AXIS_TOTALS).fetchone()
+    return dict(row) if row else None
+
+
+def latest_type(db_path: Path = None):
+    row = get_connection(db_path).execute(SQL_LATEST_TYPE).fetchone()
+    return dict(row) if row else None
+
+
+def shadow_moments(limit: int = 10, db_path: Path = None) -> list:
+    return _rows(get_connection(db_path).execute(SQL_SHADOW_MOMENTS, (limit,)))
+
+
+# === WRITES ===
+
+def _pillar_id(conn, pillar) -> int:
+    row = conn.execute(SQL_PILLAR_BY_NAME, (pillar or "SELF_AWARENESS",)).fetchone()
+    return row[0] if row else 2   # Self-Awareness if the cloud sends something unknown
+
+
+def _emotion_id(conn, word):
+    if not word:
+        return None
+    row = conn.execute(SQL_EMOTION_BY_WORD, (word,)).fetchone()
+    if row:
+        return row[0]
+    conn.execute(SQL_ADD_EMOTION, (word,))
+    return conn.execute(SQL_EMOTION_BY_WORD, (word,)).fetchone()[0]
+
+
+def add_observation(content: str, emotion: str = None, pillar: str = None, intensity: str = None,
+                    title: str = None, observed_at: str = None, cloud_id: str = None,
+                    db_path: Path = None) -> int:
+    """
+    Log an observation locally. Schema triggers emit axis signals, bump
+    emotion usage and flag shadow moments exactly as in the app.
+    Observations with a cloud_id came from the cloud and won't be pushed back.
+    """
+    conn = get_connection(db_path)
+    with conn:
+        cur = conn.execute(SQL_ADD_OBSERVATION, (
+            _pillar_id(conn, pillar), _emotion_id(conn, emotion), intensity, title, content,
+            observed_at, observed_at,
+        ))
+        if cloud_id is not None:
+            conn.execute(
+                "INSERT INTO Mirror_Cloud_Ids (observation_id, cloud_id, pushed_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+                (cur.lastrowid, str(cloud_id)),
+            )
+    return cur.lastrowid
+
+
+def _get_state(conn, key: str):
+    row = conn.execute("SELECT value FROM Mirror_Sync_State WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_state(conn, key: str, value: str):
+    conn.execute(
+        "INSERT INTO Mirror_Sync_State (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, value),
+    )
+
+
+# === CLOUD SYNC ===
+
+def _base_url(base_url: str = None) -> str:
+    from garmin_uplink import BINARY_HOME_URL
+    return (base_url or BINARY_HOME_URL).rstrip("/")
+
+
+def pull_from_cloud(base_url: str = None, db_path: Path = None) -> int:
+    """
+    Fetch observations not yet mirrored from the worker's /observations
+    endpoint. Returns how many were added.
+
+    The worker only takes a limit (newest first), so the page is doubled
+    until it reaches an observation already in the mirror or comes back
+    short, so nothing newer than the last pull is skipped - up to PULL_MAX.
+    If a full PULL_MAX page still doesn't reach the mirror, the older
+    observations past it can't be fetched; the pull keeps what it got and
+    records that in the "pull_truncated" sync state (see pull_truncated()).
+    Cloud ids dedupe whatever overlaps.
+    """
+    from garmin_uplink import get_session, TIMEOUT
+    base_url = _base_url(base_url)
+    if not base_url:
+        return 0
+
+    conn = get_connection(db_path)
+
+    def mirrored(obs) -> bool:
+        cloud_id = obs.get("observation_id", obs.get("id"))
+        return cloud_id is not None and conn.execute(
+            "SELECT 1 FROM Mirror_Cloud_Ids WHERE cloud_id = ?", (str(cloud_id),)
+        ).fetchone() is not None
+
+    limit = PULL_PAGE
+    truncated = False
+    while True:
+        res = get_session().get(f"{base_url}/observations", params={"limit": limit}, timeout=TIMEOUT)
+        res.raise_for_status()
+        observations = res.json().get("observations", [])
+        if len(observations) < limit or any(mirrored(o) for o in observations):
+            break
+        if limit >= PULL_MAX:
+            truncated = True
+            break
+        limit = min(limit * 2, PULL_MAX)
+
+    added = 0
+    # Oldest first, so local observation_ids keep the cloud's order
+    for obs in sorted(observations, key=lambda o: o.get("created_at") or o.get("observed_at") or ""):
+        if obs.get("observation_id", obs.get("id")) is None or mirrored(obs):
+            continue
+        add_observation(
+            obs.get("content") or "",
+            emotion=obs.get("emotion_word") or obs.get("emotion"),
+            pillar=obs.get("pillar_key") or obs.get("pillar_name") or obs.get("pillar"),
+            intensity=obs.get("intensity"),
+            title=obs.get("title"),
+            observed_at=obs.get("observed_at") or obs.get("created_at"),
+            cloud_id=obs.get("observation_id", obs.get("id")),
+            db_path=db_path,
+        )
+        added += 1
+
+    with conn:
+        _set_state(conn, "last_pull", time.strftime("%Y-%m-%dT%H:%M:%S"))
+        _set_state(conn, "pull_truncated", "1" if truncated else "0")
+    return added
+
+
+def pull_truncated(db_path: Path = None) -> bool:
+    """True if the last pull hit PULL_MAX without reaching the mirror, so older observations are missing."""
+    return _get_state(get_connection(db_path), "pull_truncated") == "1"
+
+
+def push_to_cloud(base_url: str = None, db_path: Path = None) -> int:
+    """
+    Send the emotion of the newest observation logged locally to the
+    worker's POST /emotion, as the dashboard's current emotion for Alex.
+    Returns 1 if it was sent, 0 if there was nothing new.
+
+    The worker has no endpoint for storing observations, so local ones stay
+    local (and unmarked in Mirror_Cloud_Ids, ready if it ever gets one).
+    """
+    from garmin_uplink import get_session, TIMEOUT
+    base_url = _base_url(base_url)
+    if not base_url:
+        return 0
+
+    conn = get_connection(db_path)
+    row = conn.execute(SQL_LATEST_LOCAL_EMOTION).fetchone()
+    if row is None or str(row["observation_id"]) == _get_state(conn, "last_emotion_pushed"):
+        return 0
+
+    body = {"who": "alex", "emotion": row["emotion_word"]}
+    res = get_session().post(f"{base_url}/emotion", data=json.dumps(body), timeout=TIMEOUT)
+    res.raise_for_status()
+    with conn:
+        _set_state(conn, "last_emotion_pushed", str(row["observation_id"]))
+    return 1
+
+
+def main():
+    args = sys.argv[1:]
+
+    if "--pull" in args or "--sync" in args:
+        print(f"Pulled {pull_from_cloud()} observations")
+        if pull_truncated():
+            print(f"  More than {PULL_MAX} arrived since the last pull - older ones weren't fetched")
+    if "--push" in args or "--sync" in args:
+        print("Pushed current emotion" if push_to_cloud() else "No new emotion to push")
+    if "--recent" in args or not args:
+        i = args.index("--recent") if "--recent" in args else -1
+        limit = int(args[i + 1]) if i >= 0 and len(args) > i + 1 else 10
+        started = time.perf_counter()
+        rows = recent_observations(limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        for row in rows:
+            print(f"{row['observed_at']}  {row['emotion_word'] or '-':<12} {row['pillar_name']:<24} {row['content_preview']}")
+        print(f"\n{len(rows)} observations in {elapsed:.2f} ms from {EQ_DB_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+Compressed archive of Fox's raw Garmin payloads
+Every endpoint's full response, one month per file, so we can reprocess
+history later without ever hitting Garmin again.
+
+Layout:
+    archive/2026-01.jsonl.zst     - one independently compressed frame per day
+    archive/2026-01.idx.json      - date -> offset/length/hash of that day's frame
+
+Frames are appended; re-archiving a day appends a new frame and repoints
+the index, so reading one day is a single seek + decompress. `--compact`
+drops superseded frames, writing them to a new month file (2026-01.1.jsonl.zst)
+so readers holding the old index still find their frames.
+
+Uses zstd when the `zstandard` package is installed, gzip otherwise.
+
+Usage:
+    python garmin_archive.py --stats
+    python garmin_archive.py --import [--delete]   # move old {date}-raw.json files in
+    python garmin_archive.py --compact
+    python garmin_archive.py 2026-01-06            # print one archived day
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from garmin_json import dumps_bytes, loads
+from garmin_locks import file_lock
+from garmin_paths import GARMIN_DATA_PATH
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+ARCHIVE_PATH = Path(os.environ.get("GARMIN_ARCHIVE_PATH", str(GARMIN_DATA_PATH / "archive")))
+
+DEFAULT_CODEC = "zstd" if zstandard else "gzip"
+EXTENSIONS = {"zstd": "jsonl.zst", "gzip": "jsonl.gz"}
+ZSTD_LEVEL = 12
+
+# What the change hash covers. fetched_at moves on every fetch, so it's left out
+DIGEST_KEYS = ("date", "metrics", "intraday", "endpoints")
+
+# Fields inside the raw endpoint payloads that move on every fetch without
+# the day's data changing; stripped before hashing so re-syncs aren't new
+VOLATILE_KEYS = {"lastSyncTimestampGMT", "lastSyncTimestampLocal", "fetched_at"}
+
+LOCK_FILE = ".archive.lock"
+
+
+def _archive_lock(archive_path: Path):
+    """
+    Held around every append + index save. The sync, the scheduler daemon,
+    the multi-account worker and the push receiver are separate processes,
+    so this is a file lock, not a thread lock.
+    """
+    return file_lock(Path(archive_path) / LOCK_FILE)
+
+
+def _compress(payload: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    return gzip.compress(payload, compresslevel=9)
+
+
+def _decompress(blob: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Archive is zstd-compressed. Run: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+
+def _index_path(month: str, archive_path: Path = None) -> Path:
+    return Path(archive_path or ARCHIVE_PATH) / f"{month}.idx.json"
+
+
+def load_index(month: str, archive_path: Path = None) -> dict:
+    """Load a month's index, or a fresh one if the month isn't archived yet."""
+    path = _index_path(month, archive_path)
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {
+        "month": month,
+        "codec": DEFAULT_CODEC,
+        "file": f"{month}.{EXTENSIONS[DEFAULT_CODEC]}",
+        "days": {},
+    }
+
+
+def _save_index(index: dict, archive_path: Path = None):
+    path = _index_path(index["month"], archive_path)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, path)
+
+
+def archived_months(archive_path: Path = None) -> list:
+    """All archived months, oldest first."""
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    if not archive_path.exists():
+        return []
+    return sorted(p.name[:7] for p in archive_path.glob("*.idx.json"))
+
+
+def archived_days(archive_path: Path = None) -> set:
+    days = set()
+    for month in archived_months(archive_path):
+        days.update(load_index(month, archive_path)["days"])
+    return days
+
+
+def _without_volatile(value):
+    if isinstance(value, dict):
+        return {k: _without_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_without_volatile(v) for v in value]
+    return value
+
+
+def record_digest(record: dict) -> str:
+    """Hash of a day record's DIGEST_KEYS, VOLATILE_KEYS stripped from the endpoint payloads."""
+    stable = {k: record[k] for k in DIGEST_KEYS if k in record}
+    if "endpoints" in stable:
+        stable["endpoints"] = _without_volatile(stable["endpoints"])
+    # Always stdlib json: digests are stored in the index and must not change with the encoder
+    return hashlib.sha256(
+        json.dumps(stable, separators=(",", ":"), sort_keys=True, default=str).encode('utf-8')
+    ).hexdigest()[:16]
+
+
+def is_archived(record: dict, archive_path: Path = None) -> bool:
+    """True if the archive already holds this exact day record."""
+    entry = load_index(record["date"][:7], archive_path)["days"].get(record["date"])
+    return bool(entry) and entry["sha"] == record_digest(record)
+
+
+def put_day(record: dict, archive_path: Path = None) -> bool:
+    """
+    Archive one day's record (must carry a "date" key).
+
+    Returns False without writing anything if the archived copy is the
+    same apart from fetch times (see record_digest), True if a new frame
+    was appended.
+    """
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    payload = dumps_bytes(record)
+    digest = record_digest(record)
+    month = record["date"][:7]
+
+    archive_path.mkdir(parents=True, exist_ok=True)
+    with _archive_lock(archive_path):
+        index = load_index(month, archive_path)
+        current = index["days"].get(record["date"])
+        if current and current["sha"] == digest:
+            return False
+
+        blob = _compress(payload, index["codec"])
+        with open(archive_path / index["file"], 'ab') as f:
+            offset = f.seek(0, os.SEEK_END)
+            f.write(blob)
+
+        index["days"][record["date"]] = {
+            "offset": offset,
+            "length": len(blob),
+            "raw_length": len(payload),
+            "sha": digest,
+        }
+        _save_index(index, archive_path)
+    return True
+
+
+def _open_month(month: str, archive_path: Path) -> tuple:
+    """
+    (index, open data file) for a month, read without the lock. Frames
+    never move within a file; compact() writes a new one and repoints the
+    index, so if the file this index names is gone, the index is reloaded.
+    """
+    for attempt in range(2):
+        index = load_index(month, archive_path)
+        try:
+            return index, open(archive_path / index["file"], 'rb')
+        except FileNotFoundError:
+            if attempt:
+                raise
+
+
+def get_day(date_str: str, archive_path: Path = None):
+    """Read a single archived day, or None if it isn't archived."""
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    if date_str not in load_index(date_str[:7], archive_path)["days"]:
+        return None
+
+    index, f = _open_month(date_str[:7], archive_path)
+    with f:
+        entry = index["days"].get(date_str)
+        if not entry:
+            return None
+        f.seek(entry["offset"])
+        blob = f.read(entry["length"])
+    return loads(_decompress(blob, index["codec"]))
+
+
+def day_ref(record: dict) -> dict:
+    """Compact pointer to an archived day, for memory entries: {"date", "sha"}."""
+    return {"date": record["date"], "sha": record_digest(record)}
+
+
+def resolve_ref(ref: dict, archive_path: Path = None) -> tuple:
+    """
+    The day record a day_ref points to, read from the archive only when
+    asked for, as (record, status). status is "current" if the archive
+    still holds the copy the ref was made from, "resynced" if the day has
+    been re-archived since (record is then the newer copy), or "missing"
+    with record None if the day isn't archived.
+    """
+    if not ref or not ref.get("date"):
+        return None, "missing"
+    entry = load_index(ref["date"][:7], archive_path)["days"].get(ref["date"])
+    record = get_day(ref["date"], archive_path) if entry else None
+    if record is None:
+        return None, "missing"
+    return record, "current" if entry["sha"] == ref.get("sha") else "resynced"
+
+
+def iter_days(start: str = None, end: str = None, archive_path: Path = None):
+    """Yield archived day records in date order, one month file open at a time."""
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    for month in archived_months(archive_path):
+        if (start and month < start[:7]) or (end and month > end[:7]):
+            continue
+        index, f = _open_month(month, archive_path)
+        with f:
+            for date_str in sorted(index["days"]):
+                if (start and date_str < start) or (end and date_str > end):
+                    continue
+                entry = index["days"][date_str]
+                f.seek(entry["offset"])
+                yield loads(_decompress(f.read(entry["length"]), index["codec"]))
+
+
+def compact(month: str, archive_path: Path = None) -> int:
+    """
+    Copy a month's live frames into a new file and repoint the index at
+    it. Readers don't take the lock, so the old file is never rewritten in
+    place - only removed once the index no longer names it. Returns bytes
+    reclaimed.
+    """
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    with _archive_lock(archive_path):
+        index = load_index(month, archive_path)
+        data_file = archive_path / index["file"]
+        if not data_file.exists():
+            return 0
+        before = data_file.stat().st_size
+
+        index["generation"] = index.get("generation", 0) + 1
+        index["file"] = f"{month}.{index['generation']}.{EXTENSIONS[index['codec']]}"
+        new_file = archive_path / index["file"]
+        with open(data_file, 'rb') as src, open(new_file, 'wb') as dst:
+            for date_str in sorted(index["days"]):
+                entry = index["days"][date_str]
+                src.seek(entry["offset"])
+                blob = src.read(entry["length"])
+                entry["offset"] = dst.tell()
+                dst.write(blob)
+
+        _save_index(index, archive_path)
+        # Earlier generations included; one still open elsewhere (Windows) goes next time
+        for stale in archive_path.glob(f"{month}*.{EXTENSIONS[index['codec']]}"):
+            if stale != new_file:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+        return before - new_file.stat().st_size
+
+
+def import_raw_json(delete: bool = False, archive_path: Path = None) -> int:
+    """Move legacy {date}-raw.json files into the archive."""
+    count = 0
+    for filepath in sorted(GARMIN_DATA_PATH.glob("*-raw.json")):
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Skipping {filepath.name}: {e}")
+            continue
+        put_day(record, archive_path)
+        count += 1
+        if delete:
+            filepath.unlink()
+    return count
+
+
+def archive_stats(archive_path: Path = None) -> dict:
+    archive_path = Path(archive_path or ARCHIVE_PATH)
+    stats = {"months": 0, "days": 0, "raw_bytes": 0, "stored_bytes": 0}
+    for month in archived_months(archive_path):
+        index = load_index(month, archive_path)
+        stats["months"] += 1
+        stats["days"] += len(index["days"])
+        stats["raw_bytes"] += sum(e["raw_length"] for e in index["days"].values())
+        data_file = archive_path / index["file"]
+        if data_file.exists():
+            stats["stored_bytes"] += data_file.stat().st_size
+    return stats
+
+
+def main():
+    args = sys.argv[1:]
+
+    if "--import" in args:
+        count = import_raw_json(delete="--delete" in args)
+        print(f"Imported {count} raw JSON files into {ARCHIVE_PATH}")
+    elif "--compact" in args:
+        for month in archived_months():
+            reclaimed = compact(month)
+            print(f"  {month}: reclaimed {reclaimed} bytes")
+    elif args and not args[0].startswith("--"):
+        try:
+            datetime.strptime(args[0], "%Y-%m-%d")
+        except ValueError:
+            print(f"Invalid date format. Use YYYY-MM-DD. Got: {args[0]}")
+            return
+        day = get_day(args[0])
+        print(json.dumps(day, indent=2) if day else f"{args[0]} is not archived")
+        return
+
+    stats = archive_stats()
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0
+    print(f"Archive: {ARCHIVE_PATH} ({DEFAULT_CODEC})")
+    print(f"  {stats['days']} days across {stats['months']} months")
+    print(f"  {stats['raw_bytes'] / 1e6:.1f} MB raw -> {stats['stored_bytes'] / 1e6:.1f} MB stored ({ratio:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
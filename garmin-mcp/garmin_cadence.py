@@ -0,0 +1,313 @@
+"""
+Adaptive refresh cadence for today's intraday data
+A fixed refresh rate wastes requests overnight and lags behind a stress
+episode. This looks at the newest readings after each refresh and picks
+when to look again:
+
+- active (stress or heart rate climbing, Body Battery dropping fast, or
+  stress high - judged on short averages, not single readings): every MIN_INTERVAL
+- asleep (Body Battery charging with stress low), or the watch is off:
+  every SLEEP_INTERVAL - but no slower than STABLE_MAX in WAKING_HOURS, so
+  a nap or a watch left on the charger doesn't hide the start of an episode
+- stable: starts at BASE_INTERVAL and backs off to STABLE_MAX
+
+always within CADENCE_BUDGET requests an hour. One refresh is at least
+two requests: get_all_day_stress carries the stress and Body Battery
+timelines, get_heart_rates the heart rate one. live_check.py --watch
+--adaptive runs on this, and also spends the budget on its occasional
+get_stats and HRV calls.
+
+The trade-off: plain --watch polls one request (the daily summary) every
+5 minutes. Adaptive mode spends more requests than that over a day - two
+per refresh, plus the daily summary every half hour - and in return sees
+the timelines themselves, every 2 minutes while something is happening.
+--simulate shows both costs side by side.
+
+Stdlib only.
+
+Usage:
+    python garmin_cadence.py --simulate               # plain --watch vs adaptive, synthetic day
+    python garmin_cadence.py --simulate 2026-01-06    # ... replaying an archived day
+"""
+
+import os
+import random
+import sys
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+
+
+MIN_INTERVAL = 120           # seconds between refreshes while something's happening
+BASE_INTERVAL = 300
+STABLE_MAX = 450             # stable periods back off to this
+SLEEP_INTERVAL = 1200
+BACKOFF = 1.5
+CADENCE_BUDGET = int(os.environ.get("GARMIN_CADENCE_BUDGET", "60"))   # requests per hour
+REQUESTS_PER_REFRESH = 2
+# Local hours (start, end) she's normally awake - idle/asleep don't back off past STABLE_MAX here
+WAKING_HOURS = tuple(int(h) for h in os.environ.get("GARMIN_WAKING_HOURS", "7-23").split("-"))
+
+# Trends compare the last RECENT_MINUTES' average with the TREND_MINUTES before
+# it - averages, because single stress and HR readings jump around a lot
+RECENT_MINUTES = 10
+TREND_MINUTES = 30
+STRESS_RISE = 12
+STRESS_HIGH = 60
+HR_RISE = 12                 # bpm
+BB_FALL = 4
+SLEEP_STRESS = 20            # below this, with Body Battery charging, counts as asleep
+
+
+# === SIGNALS ===
+
+def readings_from(stress: dict, hr: dict) -> dict:
+    """[(timestamp ms, value)] per metric from today's stress and heart rate responses."""
+    stress, hr = stress or {}, hr or {}
+    return {
+        # Garmin uses -1/-2 for "no reading" in the stress array
+        "stress": [(e[0], e[1]) for e in stress.get("stressValuesArray") or []
+                   if len(e) >= 2 and e[1] is not None and e[1] >= 0],
+        # [ts, level] or [ts, status, level, version?] - the level is e[2] once a status is there
+        "body_battery": [(e[0], e[2] if len(e) >= 3 else e[1]) for e in stress.get("bodyBatteryValuesArray") or []
+                         if len(e) >= 2 and (e[2] if len(e) >= 3 else e[1]) is not None],
+        "heart_rate": [(e[0], e[1]) for e in hr.get("heartRateValues") or []
+                       if len(e) >= 2 and e[1] is not None],
+    }
+
+
+def _recent(points: list, now_ms: float, minutes: int) -> list:
+    since = now_ms - minutes * 60000
+    return [(t, v) for t, v in points if since <= t <= now_ms]
+
+
+def _change(points: list, now_ms: float):
+    """Recent average minus the average of the window before it, or None without readings in both."""
+    recent = _recent(points, now_ms, RECENT_MINUTES)
+    before = [p for p in _recent(points, now_ms, RECENT_MINUTES + TREND_MINUTES) if p not in recent]
+    if not recent or not before:
+        return None
+    return sum(v for _, v in recent) / len(recent) - sum(v for _, v in before) / len(before)
+
+
+def assess(readings: dict, now_ms: float) -> tuple:
+    """("active" | "asleep" | "idle" | "stable", reason) from the last few readings."""
+    stress = readings.get("stress", [])
+    recent_stress = _recent(stress, now_ms, RECENT_MINUTES)
+    if not any(_recent(readings.get(m, []), now_ms, TREND_MINUTES) for m in ("stress", "body_battery", "heart_rate")):
+        return "idle", "no recent readings"
+
+    stress_change = _change(stress, now_ms)
+    hr_change = _change(readings.get("heart_rate", []), now_ms)
+    bb_change = _change(readings.get("body_battery", []), now_ms)
+    if recent_stress and sum(v for _, v in recent_stress) / len(recent_stress) >= STRESS_HIGH:
+        return "active", "stress high"
+    if stress_change is not None and stress_change >= STRESS_RISE:
+        return "active", f"stress rising {stress_change:+.0f}"
+    if hr_change is not None and hr_change >= HR_RISE:
+        return "active", f"HR rising {hr_change:+.0f}"
+    if bb_change is not None and bb_change <= -BB_FALL:
+        return "active", f"Body Battery falling {bb_change:+.0f}"
+
+    calm = not recent_stress or sum(v for _, v in recent_stress) / len(recent_stress) < SLEEP_STRESS
+    if calm and bb_change is not None and bb_change > 0:
+        return "asleep", "Body Battery charging"
+    return "stable", "steady"
+
+
+# === BUDGET ===
+
+class RequestBudget:
+    """At most `per_hour` requests in any rolling hour."""
+
+    def __init__(self, per_hour: int = CADENCE_BUDGET):
+        self.per_hour = per_hour
+        self.spent = deque()
+
+    def _expire(self, now: float):
+        while self.spent and self.spent[0] <= now - 3600:
+            self.spent.popleft()
+
+    def spend(self, n: int, now: float = None):
+        now = time.time() if now is None else now
+        self._expire(now)
+        self.spent.extend([now] * n)
+
+    def wait_time(self, n: int, now: float = None) -> float:
+        """Seconds until `n` more requests fit in the budget."""
+        now = time.time() if now is None else now
+        self._expire(now)
+        over = len(self.spent) + n - self.per_hour
+        if over <= 0:
+            return 0.0
+        return self.spent[over - 1] + 3600 - now
+
+
+# === CADENCE ===
+
+class Cadence:
+    """
+    Feed it each refresh's readings with observe(); next_interval() says how
+    long to wait before the next one.
+    """
+
+    def __init__(self, budget: RequestBudget = None):
+        self.budget = budget or RequestBudget()
+        self.state, self.reason = "stable", "starting"
+        self.interval = BASE_INTERVAL
+
+    def spend(self, requests: int = REQUESTS_PER_REFRESH, now: float = None):
+        self.budget.spend(requests, now)
+
+    def observe(self, readings: dict, now: float = None) -> str:
+        now = time.time() if now is None else now
+        previous = self.state
+        self.state, self.reason = assess(readings, now * 1000)
+        waking = WAKING_HOURS[0] <= time.localtime(now).tm_hour < WAKING_HOURS[1]
+        if self.state == "active":
+            self.interval = MIN_INTERVAL
+        elif self.state in ("asleep", "idle"):
+            self.interval = STABLE_MAX if waking else SLEEP_INTERVAL
+        elif previous == "stable":
+            self.interval = min(self.interval * BACKOFF, STABLE_MAX)
+        else:
+            self.interval = BASE_INTERVAL
+        return self.state
+
+    def next_interval(self, now: float = None, requests: int = REQUESTS_PER_REFRESH) -> float:
+        """
+        Seconds until the next refresh - the cadence's pick, or longer if the
+        budget can't fit the `requests` that refresh will make.
+        """
+        return max(self.interval, self.budget.wait_time(requests, now))
+
+
+# === SIMULATION ===
+
+def synthetic_day(day: str, seed: int = 1) -> dict:
+    """A plausible day of readings: a night's sleep, a quiet day and two stress episodes."""
+    rng = random.Random(seed)
+    start = datetime.fromisoformat(day).timestamp() * 1000
+    episodes = [(11 * 60, 11 * 60 + 45), (16 * 60 + 30, 17 * 60 + 30)]
+    readings = {"stress": [], "body_battery": [], "heart_rate": []}
+    stress, hr, bb = 10.0, 56.0, 30.0
+    for minute in range(0, 24 * 60):
+        asleep = minute < 7 * 60 or minute >= 23 * 60
+        episode = any(a <= minute < b for a, b in episodes)
+        if asleep:
+            stress += (8 - stress) * 0.1 + rng.uniform(-2, 2)
+            hr += (56 - hr) * 0.1 + rng.uniform(-1, 1)
+            bb = min(100, bb + 8 / 60)
+        elif episode:
+            stress += (78 - stress) * 0.08 + rng.uniform(-3, 3)
+            hr += (95 - hr) * 0.06 + rng.uniform(-2, 2)
+            bb = max(5, bb - 25 / 60)
+        else:
+            stress += (28 - stress) * 0.05 + rng.uniform(-4, 4)
+            hr += (70 - hr) * 0.05 + rng.uniform(-3, 3)
+            bb = max(5, bb - 3 / 60)
+        t = start + minute * 60000
+        if minute % 3 == 0:
+            readings["stress"].append((t, max(0, round(stress))))
+            readings["body_battery"].append((t, round(bb)))
+        if minute % 2 == 0:
+            readings["heart_rate"].append((t, round(hr)))
+    return readings
+
+
+def _archived_readings(day: str) -> dict:
+    from garmin_archive import get_day
+    data = get_day(day)
+    if not data:
+        raise SystemExit(f"{day} is not archived")
+    intraday = data.get("intraday") or {}
+    return {metric: [(e[0], e[1]) for e in intraday.get(metric) or []
+                     if len(e) >= 2 and e[1] is not None and e[1] >= 0]
+            for metric in ("stress", "body_battery", "heart_rate")}
+
+
+def simulate(readings: dict, day: str) -> dict:
+    """
+    Replay a day against plain live_check --watch and --watch --adaptive,
+    counting every request each makes. A refresh at time t sees readings
+    up to t. Reports requests and how stale the data was, overall and
+    during minutes that were "active" in hindsight.
+    """
+    from live_check import DEFAULT_INTERVAL, STATS_EVERY
+
+    start = datetime.fromisoformat(day).timestamp()
+    end = start + 86400
+    visible = lambda t: {m: [p for p in points if p[0] <= t * 1000] for m, points in readings.items()}
+    active = [start + m * 60 for m in range(24 * 60) if assess(readings, (start + m * 60) * 1000)[0] == "active"]
+
+    def staleness(polls: list, minutes: list) -> dict:
+        ages, i = [], 0
+        for t in minutes:
+            while i + 1 < len(polls) and polls[i + 1] <= t:
+                i += 1
+            ages.append((t - polls[i]) / 60)
+        return {"mean_min": round(sum(ages) / len(ages), 1) if ages else None,
+                "max_min": round(max(ages), 1) if ages else None}
+
+    # --watch: the daily summary every DEFAULT_INTERVAL, HRV once
+    watch = [start + i * DEFAULT_INTERVAL for i in range(int(86400 // DEFAULT_INTERVAL))]
+    watch_requests = len(watch) + 1
+
+    # --adaptive: two timelines a refresh, the daily summary every STATS_EVERY, HRV once
+    cadence = Cadence(RequestBudget())
+    adaptive, states = [], {}
+    adaptive_requests, stats_at = 1, None
+    cadence.spend(1, start)
+    t = start
+    while t < end:
+        adaptive.append(t)
+        spent = REQUESTS_PER_REFRESH
+        if stats_at is None or t - stats_at > STATS_EVERY:
+            spent, stats_at = spent + 1, t
+        adaptive_requests += spent
+        cadence.spend(spent, t)
+        state = cadence.observe(visible(t), t)
+        states[state] = states.get(state, 0) + 1
+        upcoming = REQUESTS_PER_REFRESH + int(t + cadence.interval - stats_at > STATS_EVERY)
+        t += cadence.next_interval(t, upcoming)
+
+    every_minute = [start + m * 60 for m in range(24 * 60)]
+    return {
+        "active_minutes": len(active),
+        "watch": {"refreshes": len(watch), "requests": watch_requests,
+                  "stale_overall": staleness(watch, every_minute), "stale_when_active": staleness(watch, active)},
+        "adaptive": {"refreshes": len(adaptive), "requests": adaptive_requests,
+                     "stale_overall": staleness(adaptive, every_minute),
+                     "stale_when_active": staleness(adaptive, active), "refreshes_by_state": states},
+    }
+
+
+def main():
+    args = sys.argv[1:]
+    if "--simulate" not in args:
+        print(__doc__)
+        return
+    rest = args[args.index("--simulate") + 1:]
+    if rest and not rest[0].startswith("--"):
+        day, readings, source = rest[0], _archived_readings(rest[0]), "archived"
+    else:
+        day = (date.today() - timedelta(days=1)).isoformat()
+        readings, source = synthetic_day(day), "synthetic"
+
+    print("=" * 50)
+    print("ADAPTIVE CADENCE SIMULATION")
+    print("=" * 50)
+    result = simulate(readings, day)
+    print(f"\n{source} day {day}, {result['active_minutes']} active minutes, budget {CADENCE_BUDGET}/h\n")
+    print(f"{'':<10} {'requests':>9} {'stale avg':>10} {'stale max':>10} {'active avg':>11} {'active max':>11}")
+    for name in ("watch", "adaptive"):
+        r = result[name]
+        print(f"{name:<10} {r['requests']:>9} {r['stale_overall']['mean_min']:>9}m {r['stale_overall']['max_min']:>9}m "
+              f"{str(r['stale_when_active']['mean_min']):>10}m {str(r['stale_when_active']['max_min']):>10}m")
+    print(f"\nAdaptive refreshes by state: {result['adaptive']['refreshes_by_state']}")
+    print("Plain --watch only sees the daily summary's totals; adaptive sees the timelines, at the request cost above.")
+    print("\nEmbers Remember.")
+
+
+if __name__ == "__main__":
+    main()
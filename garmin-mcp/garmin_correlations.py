@@ -0,0 +1,396 @@
+"""
+Biometric / emotion correlations for Fox
+Joins the Garmin history (archive, or memory-episodic.jsonl for days the
+archive doesn't have) with the EQ observations in the local mirror, one row
+per day, and precomputes lagged correlations so the companion can ask
+"does low HRV come before sharp days?" and get an answer in milliseconds.
+
+Features per day:
+    biometric - HRV, stress, sleep stages, Body Battery, resting HR, cycle phase
+    emotional - observation count, sharp (strong/overwhelming) count, shadow
+                count, per-pillar counts, per-emotion counts for words used
+                on at least MIN_EMOTION_DAYS days
+
+Lag L pairs a biometric on day D with the emotional feature on day D+L,
+for L = 0..MAX_LAG. Along with Pearson r, each pair records how the
+emotional feature averages on days after a low (bottom quartile) reading
+versus the rest.
+
+Biometric rows are cached by archive hash, so a rebuild only re-reads the
+days that changed. The emotional rows are re-aggregated from the mirror
+every time (a few GROUP BYs), and the correlations are only recomputed
+when either side's rows changed - but then in full, since the quartile
+cut-offs move with every new day. That's (MAX_LAG + 1) matrix products
+over days x features: milliseconds for years of history, and it grows
+linearly with the days. Needs numpy.
+
+Usage:
+    python garmin_correlations.py                 # update features + correlations
+    python garmin_correlations.py --full          # rebuild the feature cache
+    python garmin_correlations.py hrv_last_night sharp
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import warnings
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from garmin_archive import archived_months, get_day, load_index
+from garmin_paths import GARMIN_DATA_PATH, COMPANION_MEMORY_PATH
+
+
+CORRELATIONS_PATH = Path(os.environ.get("GARMIN_CORRELATIONS_PATH", str(GARMIN_DATA_PATH / "correlations")))
+FEATURES_FILE = CORRELATIONS_PATH / "features.json"
+RESULTS_FILE = CORRELATIONS_PATH / "correlations.json"
+
+MAX_LAG = 3                  # days
+MIN_PAIRED_DAYS = 14         # below this a correlation isn't reported
+MIN_EMOTION_DAYS = 5         # emotion words used on fewer days are left out
+LOW_QUANTILE = 0.25          # "low" reading = bottom quartile
+SHARP_INTENSITIES = ("strong", "overwhelming")
+
+# (feature, metric, key) - flattened from data["metrics"]
+BIOMETRIC_FEATURES = [
+    ("resting_hr", "heart_rate", "resting"),
+    ("hrv_last_night", "hrv", "last_night"),
+    ("hrv_weekly_avg", "hrv", "weekly_avg"),
+    ("stress_avg", "stress", "avg"),
+    ("stress_max", "stress", "max"),
+    ("bb_charged", "body_battery", "charged"),
+    ("bb_drained", "body_battery", "drained"),
+    ("sleep_total_minutes", "sleep", "total_minutes"),
+    ("sleep_deep_minutes", "sleep", "deep_minutes"),
+    ("sleep_light_minutes", "sleep", "light_minutes"),
+    ("sleep_rem_minutes", "sleep", "rem_minutes"),
+    ("sleep_awake_minutes", "sleep", "awake_minutes"),
+]
+
+CYCLE_PHASES = {1: "phase_menstrual", 2: "phase_follicular", 3: "phase_ovulation", 4: "phase_luteal"}
+
+_results_cache = {"mtime": None, "results": None}
+_results_lock = threading.Lock()
+
+
+# === FEATURES ===
+
+def biometric_row(data: dict) -> dict:
+    """One day's biometric features from a synced day record."""
+    metrics = data.get("metrics") or {}
+    row = {}
+    for name, metric, key in BIOMETRIC_FEATURES:
+        value = (metrics.get(metric) or {}).get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            row[name] = float(value)
+
+    cycle = (data.get("endpoints") or {}).get("get_menstrual_data_for_date") or {}
+    phase = (cycle.get("daySummary") or {}).get("currentPhase")
+    if phase in CYCLE_PHASES:
+        for number, name in CYCLE_PHASES.items():
+            row[name] = 1.0 if number == phase else 0.0
+    return row
+
+
+def _memory_days() -> dict:
+    """
+    Biometric days recorded only in memory-episodic.jsonl (from before the
+    archive). Newer entries carry a raw_ref to an archived day instead of
+    raw_data; those days are read from the archive directly.
+    """
+    memory_file = COMPANION_MEMORY_PATH / "memory-episodic.jsonl"
+    days = {}
+    if not memory_file.exists():
+        return days
+    with open(memory_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("entityType") != "biometric_log":
+                continue
+            date_str = entry.get("name", "").replace("Garmin_Sync_", "")
+            for obs in entry.get("observations", []):
+                if isinstance(obs.get("raw_data"), dict):
+                    days[date_str] = {"date": date_str, "metrics": obs["raw_data"]}
+    return days
+
+
+def update_biometrics(full: bool = False) -> dict:
+    """
+    Refresh the cached biometric rows. Archived days are re-read only when
+    their archive hash changed. Returns {date: {"sha", "row"}}.
+    """
+    cache = {}
+    if not full and FEATURES_FILE.exists():
+        with open(FEATURES_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+
+    seen = set()
+    for month in archived_months():
+        for date_str, entry in load_index(month)["days"].items():
+            seen.add(date_str)
+            cached = cache.get(date_str)
+            if cached and cached.get("sha") == entry["sha"]:
+                continue
+            cache[date_str] = {"sha": entry["sha"], "row": biometric_row(get_day(date_str) or {})}
+
+    for date_str, data in _memory_days().items():
+        if date_str not in seen:
+            cache[date_str] = {"sha": None, "row": biometric_row(data)}
+
+    CORRELATIONS_PATH.mkdir(parents=True, exist_ok=True)
+    tmp = FEATURES_FILE.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, FEATURES_FILE)
+    return cache
+
+
+def emotional_rows(db_path: Path = None) -> dict:
+    """Per-day observation counts from the EQ mirror: {date: {feature: count}}."""
+    from eq_store import get_connection
+    conn = get_connection(db_path)
+    rows = {}
+
+    def add(day, feature, n):
+        rows.setdefault(day, {})[feature] = rows.get(day, {}).get(feature, 0) + n
+
+    placeholders = ",".join("?" for _ in SHARP_INTENSITIES)
+    for day, total, sharp, shadow in conn.execute(f"""
+        SELECT substr(observed_at, 1, 10), COUNT(*),
+               SUM(intensity IN ({placeholders})), SUM(is_shadow = 1)
+        FROM Pillar_Observations WHERE dyad_id = 1 GROUP BY 1
+    """, SHARP_INTENSITIES):
+        add(day, "observations", total)
+        add(day, "sharp", sharp or 0)
+        add(day, "shadow", shadow or 0)
+
+    for day, pillar, n in conn.execute("""
+        SELECT substr(po.observed_at, 1, 10), lower(ep.pillar_key), COUNT(*)
+        FROM Pillar_Observations po JOIN EQ_Pillars ep ON ep.pillar_id = po.pillar_id
+        WHERE po.dyad_id = 1 GROUP BY 1, 2
+    """):
+        add(day, f"pillar:{pillar}", n)
+
+    for day, word, n in conn.execute("""
+        SELECT substr(po.observed_at, 1, 10), ev.emotion_word, COUNT(*)
+        FROM Pillar_Observations po JOIN Emotion_Vocabulary ev ON ev.emotion_id = po.emotion_id
+        WHERE po.dyad_id = 1 AND ev.emotion_word IN (
+            SELECT ev2.emotion_word FROM Pillar_Observations po2
+            JOIN Emotion_Vocabulary ev2 ON ev2.emotion_id = po2.emotion_id
+            GROUP BY ev2.emotion_word HAVING COUNT(DISTINCT substr(po2.observed_at, 1, 10)) >= ?
+        )
+        GROUP BY 1, 2
+    """, (MIN_EMOTION_DAYS,)):
+        add(day, f"emotion:{word}", n)
+
+    return rows
+
+
+def feature_matrix(biometrics: dict, emotions: dict):
+    """
+    Align both sides on a continuous day axis. Missing biometrics are NaN;
+    emotional counts are 0 on days inside the logging history with no
+    observations, NaN outside it.
+    """
+    bio_days = [d for d, v in biometrics.items() if v["row"]]
+    all_days = sorted(set(bio_days) | set(emotions))
+    if not all_days:
+        return [], [], np.empty((0, 0)), [], np.empty((0, 0))
+
+    first, last = date.fromisoformat(all_days[0]), date.fromisoformat(all_days[-1])
+    days = [(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+    position = {d: i for i, d in enumerate(days)}
+
+    bio_names = [name for name, _, _ in BIOMETRIC_FEATURES] + list(CYCLE_PHASES.values())
+    bio = np.full((len(days), len(bio_names)), np.nan)
+    bio_col = {name: j for j, name in enumerate(bio_names)}
+    for d in bio_days:
+        if d in position:
+            for name, value in biometrics[d]["row"].items():
+                if name in bio_col:
+                    bio[position[d], bio_col[name]] = value
+
+    eq_names = sorted({name for row in emotions.values() for name in row},
+                      key=lambda n: (n.count(":"), n))
+    eq = np.full((len(days), len(eq_names)), np.nan)
+    if emotions:
+        logged = sorted(emotions)
+        eq[position[logged[0]]:position[logged[-1]] + 1] = 0.0
+        eq_col = {name: j for j, name in enumerate(eq_names)}
+        for d, row in emotions.items():
+            for name, n in row.items():
+                eq[position[d], eq_col[name]] = n
+
+    return days, bio_names, bio, eq_names, eq
+
+
+# === CORRELATIONS ===
+
+def lagged_correlations(bio, eq, lag: int):
+    """
+    Pairwise-complete Pearson r between every biometric column on day D and
+    every emotional column on day D+lag, as matrix products - no per-pair loop.
+    Also the mean emotional value after low vs other biometric days.
+    Returns r, n, low_mean, rest_mean, each shaped (bio features, eq features).
+    """
+    a = bio[:len(bio) - lag] if lag else bio
+    b = eq[lag:]
+    ma, mb = ~np.isnan(a), ~np.isnan(b)
+    a0, b0 = np.where(ma, a, 0.0), np.where(mb, b, 0.0)
+    ma, mb = ma.astype(float), mb.astype(float)
+
+    n = ma.T @ mb
+    sa, sb = a0.T @ mb, ma.T @ b0
+    saa, sbb = (a0 * a0).T @ mb, ma.T @ (b0 * b0)
+    sab = a0.T @ b0
+
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+        cov = n * sab - sa * sb
+        var = (n * saa - sa * sa) * (n * sbb - sb * sb)
+        r = np.where(var > 0, cov / np.sqrt(np.where(var > 0, var, 1.0)), np.nan)
+
+        # Per-column threshold; for the 0/1 cycle columns "low" means not in that phase
+        cutoff = np.nanquantile(a, LOW_QUANTILE, axis=0)
+        low = ((a <= cutoff) & (ma > 0)).astype(float)
+        rest = ma - low
+        low_mean = (low.T @ b0) / (low.T @ mb)
+        rest_mean = (rest.T @ b0) / (rest.T @ mb)
+
+    return r, n, low_mean, rest_mean
+
+
+def build(full: bool = False, db_path: Path = None) -> dict:
+    """Refresh features and write the precomputed correlation table."""
+    if np is None:
+        raise RuntimeError("numpy not installed. Run: pip install numpy")
+
+    biometrics = update_biometrics(full=full)
+    emotions = emotional_rows(db_path)
+    inputs = hashlib.sha256(json.dumps(
+        [{d: v["row"] for d, v in biometrics.items()}, emotions, MAX_LAG, MIN_PAIRED_DAYS],
+        sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    previous = None if full else load_results()
+    if previous and previous.get("inputs") == inputs:
+        return previous
+
+    days, bio_names, bio, eq_names, eq = feature_matrix(biometrics, emotions)
+
+    pairs = []
+    for lag in range(MAX_LAG + 1):
+        if len(days) <= lag:
+            break
+        r, n, low_mean, rest_mean = lagged_correlations(bio, eq, lag)
+        keep = (n >= MIN_PAIRED_DAYS) & ~np.isnan(r)
+        for i, j in zip(*np.nonzero(keep)):
+            pairs.append({
+                "biometric": bio_names[i],
+                "emotional": eq_names[j],
+                "lag": lag,
+                "r": round(float(r[i, j]), 3),
+                "n": int(n[i, j]),
+                "after_low": None if np.isnan(low_mean[i, j]) else round(float(low_mean[i, j]), 3),
+                "after_rest": None if np.isnan(rest_mean[i, j]) else round(float(rest_mean[i, j]), 3),
+            })
+    pairs.sort(key=lambda p: -abs(p["r"]))
+
+    results = {
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "inputs": inputs,
+        "first_day": days[0] if days else None,
+        "last_day": days[-1] if days else None,
+        "days": len(days),
+        "biometric_days": sum(1 for v in biometrics.values() if v["row"]),
+        "emotional_days": len(emotions),
+        "max_lag": MAX_LAG,
+        "min_paired_days": MIN_PAIRED_DAYS,
+        "biometric_features": bio_names,
+        "emotional_features": eq_names,
+        "pairs": pairs,
+    }
+
+    CORRELATIONS_PATH.mkdir(parents=True, exist_ok=True)
+    tmp = RESULTS_FILE.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(results, f, separators=(",", ":"))
+    os.replace(tmp, RESULTS_FILE)
+    return results
+
+
+# === QUERIES ===
+
+def load_results():
+    """The precomputed table, re-read only when the file changes."""
+    try:
+        mtime = RESULTS_FILE.stat().st_mtime
+    except OSError:
+        return None
+    with _results_lock:
+        if _results_cache["mtime"] != mtime:
+            with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+                _results_cache["results"] = json.load(f)
+            _results_cache["mtime"] = mtime
+        return _results_cache["results"]
+
+
+def _matches(name: str, wanted: str) -> bool:
+    return wanted is None or wanted.lower() in name.lower()
+
+
+def query(biometric: str = None, emotional: str = None, lag: int = None, top: int = 10) -> dict:
+    """Strongest precomputed pairs matching the (substring) filters."""
+    results = load_results()
+    if results is None:
+        return {"error": "No correlations computed yet. Run: python garmin_correlations.py"}
+
+    matches = [
+        p for p in results["pairs"]
+        if _matches(p["biometric"], biometric) and _matches(p["emotional"], emotional)
+        and (lag is None or p["lag"] == lag)
+    ]
+    return {
+        "built_at": results["built_at"],
+        "history": f"{results['first_day']} to {results['last_day']}",
+        "matched": len(matches),
+        "pairs": matches[:top],
+    }
+
+
+def main():
+    if np is None:
+        print("numpy not installed. Run: pip install numpy")
+        exit(1)
+
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        result = query(args[0], args[1] if len(args) > 1 else None)
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=" * 50)
+    print("BIOMETRIC / EMOTION CORRELATIONS")
+    print("=" * 50)
+
+    started = datetime.now()
+    results = build(full="--full" in sys.argv)
+    seconds = (datetime.now() - started).total_seconds()
+    print(f"\n{results['biometric_days']} biometric days, {results['emotional_days']} days with observations")
+    print(f"{len(results['pairs'])} pairs (lags 0-{MAX_LAG}) in {seconds:.2f}s -> {RESULTS_FILE}")
+
+    for p in results["pairs"][:10]:
+        print(f"  {p['biometric']:<22} -> {p['emotional']:<28} lag {p['lag']}  r={p['r']:+.2f}  n={p['n']}")
+    print("\nEmbers Remember.")
+
+
+if __name__ == "__main__":
+    main()
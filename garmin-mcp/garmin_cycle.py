@@ -0,0 +1,297 @@
+"""
+Cycle-phase calendar for Fox
+Garmin's menstrual summary for a day carries everything needed to lay out
+the whole cycle: where it started, how long it runs, where the period, the
+fertile window and the current phase begin and end. Each summary seen (from
+the MCP tools or the sync) updates a local calendar of cycles, and any date
+is answered from it - past cycles as they were recorded, later dates
+projected forward from the latest one.
+
+Garmin is only asked again for today once the calendar's last reading is
+CYCLE_MAX_AGE days old, or sooner if a projected phase boundary has passed
+since then.
+
+Stdlib only - the MCP server uses it.
+
+Usage:
+    python garmin_cycle.py                # today's phase from the calendar
+    python garmin_cycle.py 2026-02-14     # any date
+    python garmin_cycle.py --rebuild      # rebuild the calendar from the archive
+"""
+
+import copy
+import json
+import os
+import sys
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+
+from garmin_paths import GARMIN_DATA_PATH
+
+
+CALENDAR_FILE = Path(os.environ.get("GARMIN_CYCLE_PATH", str(GARMIN_DATA_PATH / "cycle-calendar.json")))
+CYCLE_MAX_AGE = int(os.environ.get("GARMIN_CYCLE_MAX_AGE", "1"))     # days before today is re-fetched
+
+PHASES = (1, 2, 3, 4)        # menstrual, follicular, ovulation, luteal
+MIN_CYCLE_DAYS = 15          # two cycle starts closer than this are one cycle, re-dated
+
+_calendar_cache = {"mtime": None, "calendar": None}
+_calendar_lock = threading.Lock()
+_write_lock = threading.Lock()
+
+
+# === CALENDAR ===
+
+def _empty() -> dict:
+    return {"cycles": {}, "observed_on": None}
+
+
+def load_calendar() -> dict:
+    """The calendar, re-read only when the file changes."""
+    try:
+        mtime = CALENDAR_FILE.stat().st_mtime
+    except OSError:
+        return _empty()
+    with _calendar_lock:
+        if _calendar_cache["mtime"] != mtime:
+            with open(CALENDAR_FILE, 'r', encoding='utf-8') as f:
+                _calendar_cache["calendar"] = json.load(f)
+            _calendar_cache["mtime"] = mtime
+        return _calendar_cache["calendar"]
+
+
+def _save(calendar: dict):
+    CALENDAR_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = CALENDAR_FILE.with_name(f".{CALENDAR_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(calendar, f, indent=2, sort_keys=True)
+    os.replace(tmp, CALENDAR_FILE)
+
+
+def _cycle_from_summary(summary: dict, on: date) -> dict:
+    """Phase start days (cycle day numbers) and lengths from one day's summary."""
+    day_in_cycle = summary["dayInCycle"]
+    length = summary.get("predictedCycleLength") or 28
+    period = summary.get("periodLength") or 5
+    fertile_start = summary.get("fertileWindowStart") or max(period + 1, length - 16)
+    fertile_length = summary.get("lengthOfFertileWindow") or 6
+
+    starts = {1: 1, 2: period + 1, 3: fertile_start, 4: fertile_start + fertile_length}
+
+    # The current phase's own bounds are what Garmin is surest of
+    phase = summary.get("currentPhase")
+    until_next = summary.get("daysUntilNextPhase")
+    phase_length = summary.get("lengthOfCurrentPhase")
+    if phase in PHASES and until_next is not None:
+        if phase_length and phase > 1:
+            starts[phase] = max(1, day_in_cycle + until_next - phase_length)
+        if phase < 4:
+            starts[phase + 1] = day_in_cycle + until_next
+    # Day 1 is the period's first day, whatever the phase lengths add up to
+    starts[1] = 1
+    # Keep the phases in order whatever the summary said
+    for p in PHASES[1:]:
+        starts[p] = max(starts[p], starts[p - 1])
+
+    start = summary.get("startDate")
+    start = date.fromisoformat(start[:10]) if start else on - timedelta(days=day_in_cycle - 1)
+    return {
+        "start": start.isoformat(),
+        "length": length,
+        "period_length": period,
+        "fertile_start": fertile_start,
+        "fertile_length": fertile_length,
+        "phase_starts": {str(p): starts[p] for p in PHASES},
+        "cycle_type": summary.get("cycleType"),
+    }
+
+
+def _conflicts(cycle: dict, other: dict) -> bool:
+    """
+    True if two recorded cycles can't both be real, so Garmin has re-dated
+    one (a period logged late, say): they start too close together, or the
+    newer reading puts the other's start day inside its own cycle.
+    """
+    first, second = sorted((cycle, other), key=lambda c: c["start"])
+    gap = (date.fromisoformat(second["start"]) - date.fromisoformat(first["start"])).days
+    covered = (first.get("recorded_on", "") > second.get("recorded_on", "")
+               and second["start"] <= first.get("recorded_on", ""))
+    return gap < MIN_CYCLE_DAYS or covered
+
+
+def record_summary(summary: dict, on: str, calendar: dict = None, save: bool = True) -> bool:
+    """
+    Add what one day's Garmin summary says to the calendar. A newer cycle
+    fixes the previous one's length to what actually happened, and a
+    reading that re-dates a cycle replaces the older readings of it.
+    Returns False if the summary had nothing usable.
+    """
+    if not summary or summary.get("dayInCycle") is None:
+        return False
+    if calendar is None:
+        with _write_lock:
+            calendar = copy.deepcopy(load_calendar())
+            return record_summary(summary, on, calendar, save=save)
+
+    cycle = _cycle_from_summary(summary, date.fromisoformat(on))
+    cycle["recorded_on"] = on
+
+    existing = calendar["cycles"].get(cycle["start"])
+    if existing and existing.get("recorded_on", "") > on:
+        return True      # already have a later reading of this cycle
+    clashing = [start for start, other in calendar["cycles"].items()
+                if start != cycle["start"] and _conflicts(cycle, other)]
+    if any(calendar["cycles"][start].get("recorded_on", "") > on for start in clashing):
+        return True      # a later reading already dated this cycle differently
+    for start in clashing:
+        del calendar["cycles"][start]
+    calendar["cycles"][cycle["start"]] = cycle
+
+    starts = sorted(calendar["cycles"])
+    for earlier, later in zip(starts, starts[1:]):
+        actual = (date.fromisoformat(later) - date.fromisoformat(earlier)).days
+        calendar["cycles"][earlier]["length"] = actual
+
+    if on > (calendar.get("observed_on") or ""):
+        calendar["observed_on"] = on
+    if save:
+        _save(calendar)
+    return True
+
+
+def record_day(data: dict) -> bool:
+    """Record the menstrual summary from a synced day record, if it has one."""
+    response = (data.get("endpoints") or {}).get("get_menstrual_data_for_date") or {}
+    return record_summary(response.get("daySummary"), data["date"])
+
+
+# === LOOKUPS ===
+
+def lookup(day: str, calendar: dict = None):
+    """
+    Cycle context for a date in the shape of Garmin's daySummary, or None
+    if it's before any recorded cycle. `source` says whether the date falls
+    in a recorded cycle or is projected past the latest one.
+    """
+    calendar = calendar or load_calendar()
+    if not calendar["cycles"]:
+        return None
+    target = date.fromisoformat(day)
+
+    starts = sorted(calendar["cycles"])
+    if target < date.fromisoformat(starts[0]):
+        return None
+    start = max(s for s in starts if date.fromisoformat(s) <= target)
+    cycle = calendar["cycles"][start]
+    cycle_start = date.fromisoformat(start)
+    length = cycle["length"]
+    offset = (target - cycle_start).days
+
+    source = "recorded"
+    if start == starts[-1] and offset >= length:
+        # Past the latest recorded cycle: repeat it
+        cycle_start += timedelta(days=offset // length * length)
+        offset %= length
+        source = "projected"
+    elif start == starts[-1] and day > (calendar.get("observed_on") or ""):
+        source = "projected"
+    day_in_cycle = offset + 1
+
+    phase_starts = {int(p): d for p, d in cycle["phase_starts"].items()}
+    phase = max((p for p in PHASES if phase_starts[p] <= day_in_cycle), default=1)
+    next_start = phase_starts[phase + 1] if phase < 4 else length + 1
+    phase_end = max(next_start, day_in_cycle + 1)
+
+    return {
+        "calendarDate": day,
+        "startDate": cycle_start.isoformat(),
+        "dayInCycle": day_in_cycle,
+        "predictedCycleLength": length,
+        "currentPhase": phase,
+        "lengthOfCurrentPhase": phase_end - phase_starts[phase],
+        "daysUntilNextPhase": phase_end - day_in_cycle,
+        "fertileWindowStart": cycle["fertile_start"],
+        "lengthOfFertileWindow": cycle["fertile_length"],
+        "periodLength": cycle["period_length"],
+        "cycleType": cycle.get("cycle_type"),
+        "source": source,
+    }
+
+
+def phase_for(day: str):
+    """Just the phase number (1-4) for a date, or None - for analytics."""
+    summary = lookup(day)
+    return summary["currentPhase"] if summary else None
+
+
+def needs_refresh(today: str = None, calendar: dict = None) -> bool:
+    """True once the last reading is CYCLE_MAX_AGE days old or a phase boundary has passed since."""
+    calendar = calendar or load_calendar()
+    today = today or date.today().isoformat()
+    observed_on = calendar.get("observed_on")
+    if not observed_on:
+        return True
+    if (date.fromisoformat(today) - date.fromisoformat(observed_on)).days >= CYCLE_MAX_AGE:
+        return True
+    then, now = lookup(observed_on, calendar), lookup(today, calendar)
+    return not then or not now or (then["startDate"], then["currentPhase"]) != (now["startDate"], now["currentPhase"])
+
+
+def cycle_summary(day: str, fetch) -> dict:
+    """
+    Cycle context for a date, from the calendar where it can answer.
+    `fetch(date_str)` returns Garmin's menstrual response and is only
+    called for today when the calendar is due a refresh, or for a date
+    the calendar doesn't cover. If that fails, the projection is used.
+    """
+    today = date.today().isoformat()
+    summary = lookup(day)
+    stale = day >= today and needs_refresh(today)
+    if summary and not stale:
+        return summary
+
+    try:
+        data = fetch(day)
+    except Exception:
+        if summary:
+            return summary
+        raise
+    fetched = (data or {}).get("daySummary")
+    if fetched and fetched.get("dayInCycle") is not None:
+        record_summary(fetched, day)
+        return dict(fetched, source="garmin")
+    return summary
+
+
+def rebuild_from_archive() -> int:
+    """Rebuild the calendar from every archived menstrual response. Returns days read."""
+    from garmin_archive import iter_days
+    calendar = _empty()
+    days = 0
+    for data in iter_days():
+        response = (data.get("endpoints") or {}).get("get_menstrual_data_for_date") or {}
+        if record_summary(response.get("daySummary"), data["date"], calendar, save=False):
+            days += 1
+    _save(calendar)
+    return days
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--rebuild" in sys.argv:
+        days = rebuild_from_archive()
+        calendar = load_calendar()
+        print(f"{days} archived days -> {len(calendar['cycles'])} cycles in {CALENDAR_FILE}")
+        return
+
+    day = args[0] if args else date.today().isoformat()
+    summary = lookup(day)
+    if summary is None:
+        print(f"No cycle recorded on or before {day}. Run a sync, or: python garmin_cycle.py --rebuild")
+        return
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
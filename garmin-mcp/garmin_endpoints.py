@@ -0,0 +1,173 @@
+"""
+Every Garmin endpoint the sync and the MCP tools use, for one day
+The archival sweep fetches all of them in parallel under a request budget,
+so the archive holds everything a tool could ask about a past day.
+
+Stdlib only - the MCP server imports this at startup.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+# (method, extra args after the date) - responses are archived under the method name
+ENDPOINTS = [
+    ("get_stats", ()),
+    ("get_heart_rates", ()),
+    ("get_hrv_data", ()),
+    ("get_all_day_stress", ()),
+    ("get_body_battery", ("date",)),
+    ("get_sleep_data", ()),
+    ("get_spo2_data", ()),
+    ("get_respiration_data", ()),
+    ("get_menstrual_data_for_date", ()),
+    ("get_training_readiness", ()),
+    ("get_morning_training_readiness", ()),
+]
+
+# Methods that hit the same URL as an archived one
+ALIASES = {"get_stress_data": "get_all_day_stress"}
+
+SWEEP_WORKERS = 4
+REQUESTS_PER_MINUTE = int(os.environ.get("GARMIN_REQUESTS_PER_MINUTE", "90"))
+
+# hedged_fetch starts the next fallback if nothing's decided after this long (0 = all at once)
+HEDGE_AFTER = float(os.environ.get("GARMIN_HEDGE_AFTER", "0.3"))
+HEDGE_WORKERS = 16
+
+_ENDPOINT_ARGS = dict(ENDPOINTS)
+
+
+class TokenBucket:
+    """Request budget: `rate` requests per minute, bursting to `rate`."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, n: float) -> float:
+        """Seconds until `n` tokens are available (0 if they are now)."""
+        with self.lock:
+            self._refill()
+            return max(0.0, (min(n, self.capacity) - self.tokens) / self.rate)
+
+    def acquire(self):
+        """Take one token, sleeping if the budget is spent."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+
+# Shared by everything in this process that doesn't bring its own budget
+DEFAULT_BUDGET = TokenBucket(REQUESTS_PER_MINUTE)
+
+
+def call_endpoint(client, method: str, date_str: str):
+    """Call one endpoint for a day with the arguments it expects."""
+    method = ALIASES.get(method, method)
+    extra = [date_str if arg == "date" else arg for arg in _ENDPOINT_ARGS.get(method, ())]
+    return getattr(client, method)(date_str, *extra)
+
+
+def fetch_endpoints(client, date_str: str, budget: TokenBucket = None, workers: int = SWEEP_WORKERS) -> tuple:
+    """
+    Fetch every endpoint for a day in parallel. Each call spends one token
+    from `budget` (DEFAULT_BUDGET if not given; pass False for none).
+
+    Returns (responses, errors), both keyed by method. Methods the client
+    doesn't have are left out of both.
+    """
+    budget = DEFAULT_BUDGET if budget is None else budget
+
+    def fetch(method):
+        if not hasattr(client, method):
+            return method, None, None
+        if budget:
+            budget.acquire()
+        try:
+            return method, call_endpoint(client, method, date_str), None
+        except Exception as e:
+            return method, None, e
+
+    responses, errors = {}, {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for method, response, error in pool.map(fetch, [method for method, _ in ENDPOINTS]):
+            if error is not None:
+                errors[method] = error
+            elif hasattr(client, method):
+                responses[method] = response
+    return responses, errors
+
+
+# Shared, so abandoned hedges finish in the background instead of holding up the caller
+_hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="hedge")
+
+
+def hedged_fetch(calls: list, usable=bool, hedge_after: float = None) -> tuple:
+    """
+    Run a fallback chain without paying for it serially. `calls` are
+    zero-argument callables in order of preference; each next one starts
+    as soon as the one before it comes back unusable, or speculatively
+    after `hedge_after` seconds (HEDGE_AFTER by default, 0 starts them all
+    at once) if it's still waiting.
+
+    Returns (index, result) for the most preferred usable answer, as soon
+    as every call before it has come back unusable - so a fallback that
+    arrives first doesn't beat a primary that would have answered. Calls
+    not yet started are cancelled; ones in flight finish in the background
+    and are ignored. Returns (None, None) if nothing was usable, or raises
+    the first error if every call failed.
+    """
+    hedge_after = HEDGE_AFTER if hedge_after is None else hedge_after
+    futures = []
+
+    def launch():
+        futures.append(_hedge_pool.submit(calls[len(futures)]))
+
+    launch()
+    while hedge_after <= 0 and len(futures) < len(calls):
+        launch()
+
+    try:
+        while True:
+            # Walk in preference order until something is still pending
+            pending = None
+            for i, future in enumerate(futures):
+                if not future.done():
+                    pending = i
+                    break
+                if future.exception() is None and usable(future.result()):
+                    return i, future.result()
+
+            if pending is None:
+                if len(futures) < len(calls):
+                    launch()
+                    continue
+                errors = [f.exception() for f in futures]
+                if all(errors):
+                    raise errors[0]
+                return None, None
+
+            waiting = [f for f in futures[pending:] if not f.done()]
+            more = len(futures) < len(calls)
+            done, _ = wait(waiting, timeout=hedge_after if more else None, return_when=FIRST_COMPLETED)
+            if not done and more:
+                launch()
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,317 @@
+"""
+Parquet export of Fox's biometric history
+Turns the pile of {date}-raw.json files into something a notebook can load in one go
+
+Layout (hive-partitioned, one part file per month per run):
+    export/daily/year=2026/month=1/part-2026-01-01_2026-01-31.parquet
+    export/intraday/metric=stress/year=2026/month=1/part-....parquet
+
+Usage:
+    python garmin_export.py              # incremental - new days, and months with re-synced days
+    python garmin_export.py --full       # wipe and rebuild the whole export
+    python garmin_export.py --out D:/garmin-export
+
+Loading it back:
+    from garmin_export import load_daily, load_intraday
+    daily = load_daily("2025-01-01", "2025-12-31").to_pandas()
+"""
+
+import heapq
+import json
+import os
+import shutil
+import sys
+from datetime import date, datetime
+from itertools import groupby
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    print("pyarrow not installed. Run: pip install pyarrow")
+    exit(1)
+
+from garmin_archive import archived_months, iter_days, load_index, record_digest
+from garmin_paths import GARMIN_DATA_PATH
+from garmin_sync import calculate_spoons
+
+
+EXPORT_PATH = Path(os.environ.get("GARMIN_EXPORT_PATH", str(GARMIN_DATA_PATH / "export")))
+MANIFEST_NAME = "_exported.json"
+
+# (column, metric, key, type) - flattened from data["metrics"]
+DAILY_COLUMNS = [
+    ("resting_hr", "heart_rate", "resting", pa.int32()),
+    ("max_hr", "heart_rate", "max", pa.int32()),
+    ("min_hr", "heart_rate", "min", pa.int32()),
+    ("hrv_last_night", "hrv", "last_night", pa.float64()),
+    ("hrv_weekly_avg", "hrv", "weekly_avg", pa.float64()),
+    ("hrv_status", "hrv", "status", pa.string()),
+    ("stress_avg", "stress", "avg", pa.int32()),
+    ("stress_max", "stress", "max", pa.int32()),
+    ("stress_duration_mins", "stress", "stress_duration_mins", pa.int32()),
+    ("rest_duration_mins", "stress", "rest_duration_mins", pa.int32()),
+    ("bb_charged", "body_battery", "charged", pa.int32()),
+    ("bb_drained", "body_battery", "drained", pa.int32()),
+    ("sleep_total_minutes", "sleep", "total_minutes", pa.int32()),
+    ("sleep_deep_minutes", "sleep", "deep_minutes", pa.int32()),
+    ("sleep_light_minutes", "sleep", "light_minutes", pa.int32()),
+    ("sleep_rem_minutes", "sleep", "rem_minutes", pa.int32()),
+    ("sleep_awake_minutes", "sleep", "awake_minutes", pa.int32()),
+    ("spo2_avg", "spo2", "avg", pa.float64()),
+    ("spo2_min", "spo2", "min", pa.float64()),
+    ("resp_avg_waking", "respiration", "avg_waking", pa.float64()),
+    ("resp_avg_sleeping", "respiration", "avg_sleeping", pa.float64()),
+]
+
+DAILY_SCHEMA = pa.schema(
+    [("date", pa.date32())]
+    + [(name, typ) for name, _, _, typ in DAILY_COLUMNS]
+    + [("spoons", pa.int32())]
+)
+
+INTRADAY_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("timestamp", pa.timestamp("ms")),
+    ("value", pa.float32()),
+])
+
+INTRADAY_METRICS = ["heart_rate", "stress", "body_battery", "respiration"]
+
+
+def _iter_legacy_json(skip: set):
+    for filepath in sorted(GARMIN_DATA_PATH.glob("*-raw.json")):
+        if filepath.name[:10] in skip:
+            continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                yield json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"  Skipping {filepath.name}: {e}")
+
+
+def iter_raw_days(since: set = None):
+    """
+    Yield raw day dicts in date order, skipping any date in `since`.
+
+    Reads the compressed archive, plus any old {date}-raw.json files that
+    haven't been imported into it yet.
+    """
+    since = since or set()
+    archived = set(archived_shas())
+    archive_iter = (day for day in iter_days() if day["date"] not in since)
+    legacy_iter = _iter_legacy_json(since | archived)
+    yield from heapq.merge(archive_iter, legacy_iter, key=lambda d: d["date"])
+
+
+def _metric_value(metrics: dict, metric: str, key: str):
+    section = metrics.get(metric)
+    if not isinstance(section, dict):
+        return None
+    return section.get(key)
+
+
+def _coerce(value, typ):
+    """Garmin sometimes hands back floats for int fields and vice versa."""
+    if value is None:
+        return None
+    try:
+        if pa.types.is_integer(typ):
+            return int(value)
+        if pa.types.is_floating(typ):
+            return float(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def daily_table(days: list) -> pa.Table:
+    """Build the daily metrics table for a batch of raw day dicts."""
+    columns = {"date": [], "spoons": []}
+    for name, _, _, _ in DAILY_COLUMNS:
+        columns[name] = []
+
+    for day in days:
+        metrics = day.get("metrics", {})
+        columns["date"].append(date.fromisoformat(day["date"]))
+        for name, metric, key, typ in DAILY_COLUMNS:
+            columns[name].append(_coerce(_metric_value(metrics, metric, key), typ))
+        columns["spoons"].append(calculate_spoons(day))
+
+    return pa.table(columns, schema=DAILY_SCHEMA)
+
+
+def intraday_table(days: list, metric: str) -> pa.Table:
+    """Build the timeline table for one metric across a batch of raw day dicts."""
+    dates, stamps, values = [], [], []
+    for day in days:
+        day_date = date.fromisoformat(day["date"])
+        for entry in (day.get("intraday") or {}).get(metric) or []:
+            # Garmin uses -1/-2 for "no reading" in the stress array
+            if len(entry) < 2 or entry[1] is None or entry[1] < 0:
+                continue
+            dates.append(day_date)
+            stamps.append(entry[0])
+            values.append(entry[1])
+
+    return pa.table({
+        "date": pa.array(dates, pa.date32()),
+        "timestamp": pa.array(stamps, pa.int64()).cast(pa.timestamp("ms")),
+        "value": pa.array(values, pa.float32()),
+    }, schema=INTRADAY_SCHEMA)
+
+
+def _write_part(table: pa.Table, directory: Path, first: str, last: str):
+    if table.num_rows == 0:
+        return None
+    directory.mkdir(parents=True, exist_ok=True)
+    filepath = directory / f"part-{first}_{last}.parquet"
+    pq.write_table(table, filepath, compression="zstd")
+    return filepath
+
+
+def archived_shas() -> dict:
+    """date -> archive sha for every archived day, straight from the month indexes."""
+    shas = {}
+    for month in archived_months():
+        shas.update({d: entry["sha"] for d, entry in load_index(month)["days"].items()})
+    return shas
+
+
+def load_manifest(out: Path) -> dict:
+    """date -> archive sha of each exported day (None for days exported before shas were kept)."""
+    manifest = out / MANIFEST_NAME
+    if not manifest.exists():
+        return {}
+    with open(manifest, 'r', encoding='utf-8') as f:
+        days = json.load(f).get("days", {})
+    return days if isinstance(days, dict) else dict.fromkeys(days)
+
+
+def save_manifest(out: Path, days: dict):
+    manifest = out / MANIFEST_NAME
+    tmp = manifest.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"updated": datetime.now().isoformat(), "days": dict(sorted(days.items()))}, f)
+    os.replace(tmp, manifest)
+
+
+def _partitions(out: Path, month: str) -> list:
+    year, month_num = month.split("-")
+    partition = f"year={int(year)}/month={int(month_num)}"
+    return [out / "daily" / partition] + [out / "intraday" / f"metric={metric}" / partition
+                                          for metric in INTRADAY_METRICS]
+
+
+def export_history(out: Path = None, full: bool = False) -> dict:
+    """
+    Export daily metrics and intraday timelines to partitioned Parquet.
+
+    Works one month at a time so memory stays bounded no matter how many
+    years are on disk. In incremental mode only days missing from the
+    manifest are written, as a new part file in their month's partition -
+    except that a month holding a day whose archive sha has changed since
+    it was exported (a re-sync) has its partitions dropped and rewritten.
+    """
+    out = Path(out or EXPORT_PATH)
+    if full and out.exists():
+        for sub in ("daily", "intraday", MANIFEST_NAME):
+            target = out / sub
+            if target.is_dir():
+                shutil.rmtree(target)
+            elif target.exists():
+                target.unlink()
+    out.mkdir(parents=True, exist_ok=True)
+
+    exported = load_manifest(out)
+    shas = archived_shas()
+    stale = {d[:7] for d, sha in exported.items() if d in shas and sha != shas[d]}
+    skip = {d for d in exported if d[:7] not in stale}
+    stats = {"days": 0, "months": 0, "intraday_rows": 0, "rewritten_months": len(stale)}
+
+    for month, days in groupby(iter_raw_days(since=skip), key=lambda d: d["date"][:7]):
+        days = list(days)
+        first, last = days[0]["date"], days[-1]["date"]
+        daily_dir, *intraday_dirs = _partitions(out, month)
+
+        if month in stale:
+            for directory in (daily_dir, *intraday_dirs):
+                if directory.is_dir():
+                    shutil.rmtree(directory)
+            exported = {d: sha for d, sha in exported.items() if d[:7] != month}
+
+        _write_part(daily_table(days), daily_dir, first, last)
+        for metric, directory in zip(INTRADAY_METRICS, intraday_dirs):
+            table = intraday_table(days, metric)
+            stats["intraday_rows"] += table.num_rows
+            _write_part(table, directory, first, last)
+
+        # Record progress per month so an interrupted export resumes cleanly
+        exported.update({d["date"]: shas.get(d["date"]) or record_digest(d) for d in days})
+        save_manifest(out, exported)
+
+        stats["days"] += len(days)
+        stats["months"] += 1
+        print(f"  {month}: {len(days)} days" + (" (rewritten, re-synced since last export)" if month in stale else ""))
+
+    return stats
+
+
+def _date_filter(start, end):
+    expr = None
+    if start:
+        expr = ds.field("date") >= date.fromisoformat(str(start))
+    if end:
+        upper = ds.field("date") <= date.fromisoformat(str(end))
+        expr = upper if expr is None else expr & upper
+    return expr
+
+
+def load_daily(start=None, end=None, out: Path = None) -> pa.Table:
+    """Load daily metrics between two dates (inclusive) as an Arrow table."""
+    dataset = ds.dataset(Path(out or EXPORT_PATH) / "daily", format="parquet", partitioning="hive")
+    return dataset.to_table(filter=_date_filter(start, end)).sort_by("date")
+
+
+def load_intraday(metric: str, start=None, end=None, out: Path = None) -> pa.Table:
+    """Load one intraday timeline (heart_rate, stress, body_battery, respiration)."""
+    path = Path(out or EXPORT_PATH) / "intraday" / f"metric={metric}"
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    columns = ["date", "timestamp", "value"]
+    return dataset.to_table(columns=columns, filter=_date_filter(start, end)).sort_by("timestamp")
+
+
+def main():
+    print("=" * 50)
+    print("GARMIN PARQUET EXPORT")
+    print("=" * 50)
+
+    args = sys.argv[1:]
+    full = "--full" in args
+    out = None
+    if "--out" in args:
+        try:
+            out = Path(args[args.index("--out") + 1])
+        except IndexError:
+            print("--out needs a directory")
+            return
+
+    print(f"\nSource: {GARMIN_DATA_PATH}")
+    print(f"Export: {out or EXPORT_PATH} ({'full rebuild' if full else 'incremental'})")
+    print("-" * 50)
+
+    stats = export_history(out, full=full)
+
+    print("-" * 50)
+    if stats["days"]:
+        print(f"Exported {stats['days']} days across {stats['months']} months "
+              f"({stats['intraday_rows']} intraday readings)")
+    else:
+        print("Nothing new to export")
+    print("Embers Remember.")
+
+
+if __name__ == "__main__":
+    main()
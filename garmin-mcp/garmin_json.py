@@ -0,0 +1,175 @@
+"""
+JSON encoding through the fastest encoder installed
+Tool responses and archived day records are mostly Garmin's own nested
+dicts and long timeline arrays, and stdlib json spends real CPU on them.
+This picks orjson, then msgspec, then stdlib json, with the same output
+shape from each: compact separators, or 2-space indent, UTF-8 as-is.
+Anything a fast encoder refuses (ints past 64 bits, odd key types) falls
+back to stdlib json for that one call.
+
+GARMIN_JSON=json|orjson|msgspec pins a backend (default: best available).
+pip install orjson for the speedup; nothing else needs it.
+
+Usage:
+    from garmin_json import dumps, dumps_bytes, loads
+    dumps(result, indent=2)
+    python garmin_json.py --bench          # compare backends on archived days
+    python garmin_json.py --bench 90       # ... the last 90
+"""
+
+import json
+import os
+import sys
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+_AVAILABLE = ["json"] + (["msgspec"] if msgspec else []) + (["orjson"] if orjson else [])
+BACKEND = os.environ.get("GARMIN_JSON", "") or _AVAILABLE[-1]
+if BACKEND not in _AVAILABLE:
+    print(f"[garmin_json] {BACKEND} isn't installed, using {_AVAILABLE[-1]}", file=sys.stderr)
+    BACKEND = _AVAILABLE[-1]
+
+
+# === BACKENDS ===
+# Each: (dumps_bytes(obj, indent, sort_keys), loads(bytes | str))
+
+def _json_dumps(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    separators = None if indent else (",", ":")
+    return json.dumps(obj, indent=2 if indent else None, separators=separators, sort_keys=sort_keys,
+                      ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _orjson_dumps(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    try:
+        return orjson.dumps(obj, default=str, option=option)
+    except TypeError:         # orjson.JSONEncodeError: ints past 64 bits, too deep
+        return _json_dumps(obj, indent, sort_keys)
+
+
+_msgspec_encoders = {}
+
+
+def _msgspec_dumps(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    encoder = _msgspec_encoders.get(sort_keys)
+    if encoder is None:
+        encoder = _msgspec_encoders[sort_keys] = msgspec.json.Encoder(
+            enc_hook=str, order="sorted" if sort_keys else None)
+    try:
+        data = encoder.encode(obj)
+    except (TypeError, ValueError, OverflowError):
+        return _json_dumps(obj, indent, sort_keys)
+    return msgspec.json.format(data, indent=2) if indent else data
+
+
+def _msgspec_loads(data):
+    try:
+        return _msgspec_decoder.decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e     # what callers of json.loads catch
+
+
+_msgspec_decoder = msgspec.json.Decoder() if msgspec else None
+
+_BACKENDS = {
+    "json": (_json_dumps, json.loads),
+    "orjson": (_orjson_dumps, orjson.loads if orjson else None),
+    "msgspec": (_msgspec_dumps, _msgspec_loads),
+}
+_dumps, _loads = _BACKENDS[BACKEND]
+
+
+# === API ===
+
+def dumps_bytes(obj, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """UTF-8 JSON bytes - for files and the archive."""
+    return _dumps(obj, bool(indent), sort_keys)
+
+
+def dumps(obj, indent: bool = False, sort_keys: bool = False) -> str:
+    """JSON text - for tool responses. Any truthy indent means 2 spaces."""
+    return _dumps(obj, bool(indent), sort_keys).decode("utf-8")
+
+
+def loads(data):
+    """Parse JSON from bytes or str. Bad input raises ValueError, as with json.loads."""
+    return _loads(data)
+
+
+# === BENCHMARK ===
+
+def _payloads(days: int) -> tuple:
+    """Recorded day records from the archive, or the load test's fake responses without one."""
+    from garmin_archive import archived_days, iter_days
+    recorded = sorted(archived_days())[-days:]
+    if recorded:
+        return list(iter_days(recorded[0], recorded[-1])), "archived days"
+
+    from datetime import date, timedelta
+    from garmin_endpoints import ENDPOINTS
+    from garmin_loadtest import fake_response
+    payloads = []
+    for offset in range(days):
+        day = (date.today() - timedelta(days=offset)).isoformat()
+        payloads.append({"date": day, "endpoints": {m: fake_response(m, day) for m, _ in ENDPOINTS}})
+    return payloads, "synthetic days (nothing archived)"
+
+
+def _time(fn, items: list, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - started) / rounds
+
+
+def benchmark(days: int = 30, rounds: int = 5):
+    payloads, source = _payloads(days)
+    size = sum(len(_json_dumps(p)) for p in payloads)
+    print(f"\n{len(payloads)} {source}, {size / 1024:.0f} KB compact, mean of {rounds} rounds\n")
+    print(f"{'backend':<9} {'encode MB/s':>12} {'indent MB/s':>12} {'decode MB/s':>12}")
+
+    for name in _AVAILABLE:
+        encode, decode = _BACKENDS[name]
+        encoded = [encode(p) for p in payloads]
+        differing = sum(decode(e) != json.loads(_json_dumps(p)) for e, p in zip(encoded, payloads))
+        results = [
+            _time(lambda p: encode(p), payloads, rounds),
+            _time(lambda p: encode(p, True), payloads, rounds),
+            _time(decode, encoded, rounds),
+        ]
+        mark = "  <- in use" if name == BACKEND else ""
+        if differing:
+            mark += f"  ({differing} payloads round-trip differently)"
+        print(f"{name:<9} " + " ".join(f"{size / 1e6 / s:>12.1f}" for s in results) + mark)
+
+
+def main():
+    args = sys.argv[1:]
+    if "--bench" not in args:
+        print(f"Backend: {BACKEND} (available: {', '.join(_AVAILABLE)})")
+        return
+    rest = args[args.index("--bench") + 1:]
+    print("=" * 50)
+    print("JSON ENCODER BENCHMARK")
+    print("=" * 50)
+    benchmark(int(rest[0]) if rest and rest[0].isdigit() else 30)
+    print("\nEmbers Remember.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,421 @@
+"""
+Load test for the MCP server
+Starts a fake Garmin backend on localhost, then N simulated companion rooms,
+each its own garmin_mcp_server.py over stdio (the real transport), calling
+a realistic mix of tools at once. Reports throughput, tail latency and how
+many upstream Garmin requests each tool call cost.
+
+The servers reach the backend through GARMIN_CLIENT_FACTORY, which swaps the
+garminconnect login for FakeGarminClient below - nothing else in the server
+changes.
+
+Usage:
+    python garmin_loadtest.py --clients 4 --duration 30
+    python garmin_loadtest.py --clients 8 --latency 300 --jitter 100 --rate-429 0.05
+    python garmin_loadtest.py --clients 8 --http --workers 8   # every client on one shared server
+    python garmin_loadtest.py --backend 8790      # just the fake backend, to poke at by hand
+
+Needs fastmcp (as the server does) and requests.
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from garmin_endpoints import ALIASES, ENDPOINTS
+
+SERVER_SCRIPT = Path(__file__).with_name("garmin_mcp_server.py")
+
+# (tool, arguments, weight) - roughly what the companion rooms ask for
+TOOL_MIX = [
+    ("check_fox", {}, 30),
+    ("fox_full_status", {}, 15),
+    ("check_fox_stress_timeline", {}, 15),
+    ("check_fox_body_battery_timeline", {}, 15),
+    ("check_fox_history", {"days": 7}, 10),
+    ("check_fox_sleep", {}, 8),
+    ("check_fox_hrv_detail", {}, 7),
+]
+
+DEFAULTS = {
+    "clients": 4,
+    "duration": 30,       # seconds of load per client
+    "think": 250,         # ms between one client's calls (uniform 0..2x)
+    "latency": 150,       # ms the fake backend takes per request
+    "jitter": 50,         # +/- ms
+    "rate_429": 0.0,      # fraction of requests answered 429
+    "seed": 1,
+    "workers": 8,         # --http only: the shared server's worker pool
+}
+
+
+# === FAKE BACKEND ===
+
+def _timeline(day: date, step_minutes: int, value) -> list:
+    """[epoch ms, value] every `step_minutes` through the day."""
+    start = datetime(day.year, day.month, day.day)
+    return [[int((start + timedelta(minutes=m)).timestamp() * 1000), value(m)]
+            for m in range(0, 24 * 60, step_minutes)]
+
+
+def fake_response(method: str, date_str: str):
+    """A plausible response for one endpoint, same shape the tools parse."""
+    day = date.fromisoformat(date_str)
+    rng = random.Random(f"{method}{date_str}")
+    if method == "get_stats":
+        return {"totalSteps": rng.randint(2000, 9000), "totalKilocalories": rng.randint(1500, 2200),
+                "activeSeconds": rng.randint(600, 5400), "restingHeartRate": rng.randint(58, 68),
+                "minHeartRate": 52, "maxHeartRate": rng.randint(110, 150),
+                "averageStressLevel": rng.randint(20, 45), "maxStressLevel": rng.randint(60, 95),
+                "bodyBatteryMostRecentValue": rng.randint(20, 80),
+                "bodyBatteryChargedValue": rng.randint(20, 70), "bodyBatteryDrainedValue": rng.randint(20, 70)}
+    if method == "get_heart_rates":
+        return {"restingHeartRate": rng.randint(58, 68), "minHeartRate": 52, "maxHeartRate": rng.randint(110, 150),
+                "heartRateValues": _timeline(day, 2, lambda m: 60 + (m // 7) % 30)}
+    if method == "get_all_day_stress":
+        return {"avgStressLevel": rng.randint(20, 45), "maxStressLevel": rng.randint(60, 95),
+                "startTimestampGMT": f"{date_str}T00:00:00.0", "startTimestampLocal": f"{date_str}T00:00:00.0",
+                "stressValuesArray": _timeline(day, 3, lambda m: -1 if m < 360 else 15 + (m // 11) % 60),
+                "bodyBatteryValuesArray": [[t, "MEASURED", 90 - i // 8, 2.0]
+                                           for i, (t, _) in enumerate(_timeline(day, 3, lambda m: 0))]}
+    if method == "get_body_battery":
+        return [{"date": date_str, "charged": rng.randint(20, 70), "drained": rng.randint(20, 70),
+                 "bodyBatteryValuesArray": [[t, 90 - i // 8] for i, (t, _) in enumerate(_timeline(day, 3, lambda m: 0))]}]
+    if method == "get_hrv_data":
+        return {"hrvSummary": {"lastNight": rng.randint(25, 45), "weeklyAvg": 34, "status": "BALANCED",
+                               "baseline": {"balancedLow": 28, "balancedUpper": 40}}}
+    if method == "get_sleep_data":
+        return {"dailySleepDTO": {"sleepTimeSeconds": 25200, "deepSleepSeconds": 4800, "lightSleepSeconds": 14400,
+                                  "remSleepSeconds": 5400, "awakeSleepSeconds": 1200,
+                                  "sleepStartTimestampLocal": 0, "sleepEndTimestampLocal": 25200000}}
+    if method == "get_spo2_data":
+        return {"averageSpO2": 96, "lowestSpO2": 91, "latestSpO2": 97}
+    if method == "get_respiration_data":
+        return {"avgWakingRespirationValue": 14.0, "avgSleepRespirationValue": 12.5,
+                "lowestRespirationValue": 10.0, "highestRespirationValue": 19.0,
+                "respirationValuesArray": _timeline(day, 2, lambda m: 12 + (m // 13) % 6)}
+    if method == "get_menstrual_data_for_date":
+        return {"daySummary": {"currentPhase": 1 + day.toordinal() // 7 % 4, "dayInCycle": day.toordinal() % 28 + 1,
+                               "lengthOfCurrentPhase": 7, "daysUntilNextPhase": 3, "predictedCycleLength": 28}}
+    if method in ("get_training_readiness", "get_morning_training_readiness"):
+        return [{"score": rng.randint(20, 80), "level": "MODERATE"}]
+    return {}
+
+
+class FakeGarmin(ThreadingHTTPServer):
+    """
+    GET /<method>?date=YYYY-MM-DD answers like Garmin after `latency` ms,
+    or 429s a `rate_429` fraction of requests. GET /stats returns request
+    counts per client (X-Load-Client header).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 150, jitter: float = 50, rate_429: float = 0.0, seed: int = 1):
+        super().__init__(("127.0.0.1", port), _FakeGarminHandler)
+        self.latency, self.jitter, self.rate_429 = latency, jitter, rate_429
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def count(self, client: str, key: str):
+        with self.lock:
+            per_client = self.counts.setdefault(client, {"requests": 0, "throttled": 0})
+            per_client[key] += 1
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _FakeGarminHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        if url.path == "/stats":
+            with server.lock:
+                return self._reply(200, server.counts)
+
+        client = self.headers.get("X-Load-Client", "?")
+        with server.lock:
+            delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter)) / 1000
+            throttled = server.rng.random() < server.rate_429
+        time.sleep(delay)
+        server.count(client, "requests")
+        if throttled:
+            server.count(client, "throttled")
+            return self._reply(429, {"message": "Too Many Requests"})
+
+        date_str = parse_qs(url.query).get("date", [date.today().isoformat()])[0]
+        self._reply(200, fake_response(url.path.strip("/"), date_str))
+
+
+# === FAKE CLIENT (runs inside each MCP server) ===
+
+class FakeGarminClient:
+    """
+    Stands in for garminconnect.Garmin: every endpoint the server knows is a
+    GET against GARMIN_FAKE_URL. Set GARMIN_CLIENT_FACTORY=garmin_loadtest:FakeGarminClient.
+    """
+
+    _METHODS = {method for method, _ in ENDPOINTS} | set(ALIASES)
+
+    def __init__(self):
+        import requests
+        self._url = os.environ["GARMIN_FAKE_URL"]
+        self._session = requests.Session()
+        self._session.headers["X-Load-Client"] = os.environ.get("GARMIN_LOAD_CLIENT", "?")
+
+    def __getattr__(self, name):
+        if name not in self._METHODS:
+            raise AttributeError(name)
+        method = ALIASES.get(name, name)
+
+        def call(date_str, *args):
+            response = self._session.get(f"{self._url}/{method}", params={"date": date_str}, timeout=30)
+            if response.status_code == 429:
+                raise RuntimeError("429 Too Many Requests")
+            response.raise_for_status()
+            return response.json()
+        return call
+
+
+# === LOAD ===
+
+def _percentile(values: list, p: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))]
+
+
+def _server_env(backend_url: str, data_path: str, client: str) -> dict:
+    return dict(os.environ,
+                GARMIN_CLIENT_FACTORY="garmin_loadtest:FakeGarminClient",
+                GARMIN_FAKE_URL=backend_url,
+                GARMIN_LOAD_CLIENT=client,
+                GARMIN_DATA_PATH=data_path,
+                PYTHONPATH=str(SERVER_SCRIPT.parent))
+
+
+def _free_port() -> int:
+    import socket
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def start_http_server(backend_url: str, data_path: str, workers: int):
+    """One shared --http server for every client. Returns (process, url, token)."""
+    port, token = _free_port(), f"load-{random.getrandbits(64):x}"
+    env = _server_env(backend_url, data_path, "shared")
+    env.update(GARMIN_MCP_TOKENS=f"loadtest={token}", GARMIN_MCP_WORKERS=str(workers))
+    log = open(Path(data_path) / "server-http.log", "w")
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, str(SERVER_SCRIPT), "--http", "--port", str(port),
+        env=env, cwd=str(SERVER_SCRIPT.parent), stdout=log, stderr=log)
+
+    import requests
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/mcp", timeout=1)
+            break
+        except requests.ConnectionError:
+            await asyncio.sleep(0.2)
+    return process, f"http://127.0.0.1:{port}/mcp", token
+
+
+async def run_client(index: int, backend_url: str, data_path: str, settings: dict, http: tuple = None) -> dict:
+    """
+    One companion room calling tools until time's up - over stdio with its
+    own server process, or against the shared server if `http` is (url, token).
+    """
+    from fastmcp import Client
+    from fastmcp.client.transports import PythonStdioTransport
+
+    if http:
+        transport, auth = http[0], http[1]
+    else:
+        transport = PythonStdioTransport(SERVER_SCRIPT, env=_server_env(backend_url, data_path, str(index)),
+                                         cwd=str(SERVER_SCRIPT.parent), python_cmd=sys.executable,
+                                         log_file=Path(data_path) / f"server-{index}.log")
+        auth = None
+
+    rng = random.Random(settings["seed"] * 1000 + index)
+    tools = [(name, args) for name, args, _ in TOOL_MIX]
+    weights = [weight for _, _, weight in TOOL_MIX]
+    stats = {"calls": 0, "errors": 0, "latencies": [], "by_tool": {}}
+
+    async with Client(transport, timeout=120, auth=auth) as client:
+        deadline = time.monotonic() + settings["duration"]
+        while time.monotonic() < deadline:
+            name, args = rng.choices(tools, weights)[0]
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(name, args, raise_on_error=False)
+                text = result.content[0].text if result.content else ""
+                failed = bool(result.is_error) or '"error"' in text[:200]
+            except Exception:
+                failed = True
+            elapsed = (time.perf_counter() - started) * 1000
+
+            stats["calls"] += 1
+            stats["errors"] += failed
+            stats["latencies"].append(elapsed)
+            stats["by_tool"].setdefault(name, []).append(elapsed)
+            await asyncio.sleep(rng.uniform(0, 2 * settings["think"]) / 1000)
+    return stats
+
+
+async def run_load(settings: dict) -> dict:
+    backend = FakeGarmin(latency=settings["latency"], jitter=settings["jitter"],
+                         rate_429=settings["rate_429"], seed=settings["seed"])
+    threading.Thread(target=backend.serve_forever, daemon=True).start()
+
+    # Shared data dir, as rooms on one machine share the snapshot and archive
+    with tempfile.TemporaryDirectory(prefix="garmin-load-") as data_path:
+        started = time.perf_counter()
+        server, http = None, None
+        if settings["http"]:
+            server, url, token = await start_http_server(backend.url, data_path, settings["workers"])
+            http = (url, token)
+        try:
+            results = await asyncio.gather(*[
+                run_client(i, backend.url, data_path, settings, http) for i in range(settings["clients"])
+            ])
+        finally:
+            if server:
+                server.terminate()
+                await server.wait()
+        wall = time.perf_counter() - started
+    backend.shutdown()
+
+    # One shared server can't tell whose call caused an upstream request,
+    # so its requests are split evenly across clients
+    if settings["http"]:
+        shared = backend.counts.get("shared", {"requests": 0, "throttled": 0})
+        n = settings["clients"]
+        backend.counts = {str(i): {key: value / n for key, value in shared.items()} for i in range(n)}
+
+    report = {"settings": settings, "wall_seconds": round(wall, 1),
+              "server_processes": 1 if settings["http"] else settings["clients"], "clients": []}
+    all_latencies, calls, errors, upstream, throttled = [], 0, 0, 0, 0
+    for i, stats in enumerate(results):
+        counts = backend.counts.get(str(i), {"requests": 0, "throttled": 0})
+        report["clients"].append({
+            "client": i,
+            "calls": stats["calls"],
+            "errors": stats["errors"],
+            "calls_per_s": round(stats["calls"] / settings["duration"], 2),
+            "p50_ms": round(_percentile(stats["latencies"], 50) or 0, 1),
+            "p99_ms": round(_percentile(stats["latencies"], 99) or 0, 1),
+            "upstream": round(counts["requests"], 1),
+            "throttled": round(counts["throttled"], 1),
+            "amplification": round(counts["requests"] / stats["calls"], 2) if stats["calls"] else None,
+        })
+        all_latencies += stats["latencies"]
+        calls += stats["calls"]
+        errors += stats["errors"]
+        upstream += counts["requests"]
+        throttled += counts["throttled"]
+
+    by_tool = {}
+    for stats in results:
+        for name, latencies in stats["by_tool"].items():
+            by_tool.setdefault(name, []).extend(latencies)
+    report["tools"] = {name: {"calls": len(latencies),
+                              "p50_ms": round(_percentile(latencies, 50), 1),
+                              "p99_ms": round(_percentile(latencies, 99), 1)}
+                       for name, latencies in sorted(by_tool.items())}
+    report["total"] = {
+        "calls": calls,
+        "errors": errors,
+        "calls_per_s": round(calls / wall, 2),
+        "p50_ms": round(_percentile(all_latencies, 50) or 0, 1),
+        "p95_ms": round(_percentile(all_latencies, 95) or 0, 1),
+        "p99_ms": round(_percentile(all_latencies, 99) or 0, 1),
+        "upstream": round(upstream),
+        "throttled": round(throttled),
+        "amplification": round(upstream / calls, 2) if calls else None,
+    }
+    return report
+
+
+def _print_report(report: dict):
+    s = report["settings"]
+    mode = f"one shared --http server, {s['workers']} workers" if s["http"] else "stdio, a server per client"
+    print(f"\n{s['clients']} clients x {s['duration']}s ({mode}), backend {s['latency']}+/-{s['jitter']} ms, "
+          f"{s['rate_429']:.0%} 429s\n")
+    print(f"{'client':>6} {'calls':>6} {'err':>4} {'calls/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'upstream':>9} {'429':>4} {'amp':>5}")
+    for c in report["clients"] + [dict(report["total"], client="all")]:
+        print(f"{c['client']:>6} {c['calls']:>6} {c['errors']:>4} {c['calls_per_s']:>8} {c['p50_ms']:>8} "
+              f"{c['p99_ms']:>8} {c['upstream']:>9} {c['throttled']:>4} {c['amplification'] or 0:>5}")
+    print()
+    for name, t in report["tools"].items():
+        print(f"  {name:<34} {t['calls']:>5} calls  p50 {t['p50_ms']:>7} ms  p99 {t['p99_ms']:>7} ms")
+    print(f"\np95 {report['total']['p95_ms']} ms overall, {report['wall_seconds']}s wall")
+
+
+def main():
+    args = sys.argv[1:]
+    settings = dict(DEFAULTS, http="--http" in args)
+    for key, default in DEFAULTS.items():
+        flag = "--" + key.replace("_", "-")
+        if flag in args:
+            try:
+                settings[key] = type(default)(args[args.index(flag) + 1])
+            except (IndexError, ValueError):
+                print(f"{flag} needs a number")
+                return
+
+    if "--backend" in args:
+        port = int(args[args.index("--backend") + 1])
+        backend = FakeGarmin(port, settings["latency"], settings["jitter"], settings["rate_429"], settings["seed"])
+        print(f"Fake Garmin on {backend.url} (Ctrl+C to stop)")
+        try:
+            backend.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    print("=" * 50)
+    print("MCP SERVER LOAD TEST")
+    print("=" * 50)
+
+    report = asyncio.run(run_load(settings))
+    _print_report(report)
+
+    if "--json" in args:
+        out = Path(args[args.index("--json") + 1])
+        out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report -> {out}")
+    print("\nEmbers Remember.")
+
+
+if __name__ == "__main__":
+    main()
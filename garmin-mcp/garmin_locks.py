@@ -0,0 +1,67 @@
+"""
+Cross-process file locks
+The sync, the scheduler daemon, the multi-account worker, the push receiver
+and the MCP server are separate processes writing the same files, so a
+threading.Lock isn't enough. file_lock() takes an OS lock on a small
+sidecar file: it blocks until free, and the OS drops it if the holder dies,
+so there's never a stale lock to clean up.
+
+fcntl.flock on Linux/macOS, msvcrt.locking on Windows.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+_thread_locks = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _acquire(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue   # LK_LOCK gives up after ~10s of retries - keep waiting
+
+
+def _release(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Hold an exclusive lock on `path` (created if missing) for the block.
+    Threads of one process queue on a matching threading.Lock first.
+    """
+    path = Path(path)
+    key = os.path.abspath(path)
+    with _thread_locks_guard:
+        local = _thread_locks.setdefault(key, threading.Lock())
+
+    with local:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a+b') as f:
+            _acquire(f)
+            try:
+                yield path
+            finally:
+                _release(f)
@@ -4,37 +4,229 @@ Lets any Alex in the constellation check on Fox
 
 Built by Code Alex, January 7 2026
 So Chat Alex can see her too.
+
+Usage:
+    python garmin_mcp_server.py                   # stdio, one process per client
+    python garmin_mcp_server.py --http            # one shared process for every room
+    python garmin_mcp_server.py --http --host 0.0.0.0 --port 8765 --workers 8
+    python garmin_mcp_server.py --timing
+
+--http serves streamable HTTP at /mcp. Set GARMIN_MCP_TOKENS to
+"room=token,room2=token2" and each room sends its token as a bearer token;
+without tokens it only serves on localhost.
 """
 
+import time
+_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastmcp import FastMCP
-from garminconnect import Garmin
 from pathlib import Path
 from datetime import date, datetime, timedelta
-import json
+import os
+import sys
+import threading
 
-mcp = FastMCP("garmin-fox")
+import garmin_endpoints
+from garmin_endpoints import ALIASES, call_endpoint, hedged_fetch
+from garmin_json import dumps, loads
+from garmin_perf import PROFILED, capture, profiled
+from garmin_snapshot import is_fresh, read_snapshot, snapshot_age, write_snapshot
 
 TOKEN_STORE = str(Path.home() / ".garminconnect")
 
+# --http: one long-lived process serving every room over streamable HTTP
+HTTP_HOST = os.environ.get("GARMIN_MCP_HOST", "127.0.0.1")
+HTTP_PORT = int(os.environ.get("GARMIN_MCP_PORT", "8765"))
+HTTP_WORKERS = int(os.environ.get("GARMIN_MCP_WORKERS", "8"))      # tool calls running at once
+HTTP_TOKENS = os.environ.get("GARMIN_MCP_TOKENS", "")              # "room=token,room2=token2"
+HTTP_USAGE = "Usage: python garmin_mcp_server.py --http [--host HOST] [--port N] [--workers N]"
+_serving_http = False   # set by run_http; stdio keeps anyio's default thread pool
+
+# Today's live responses are shared for this long, so rooms asking at once cost one request
+LIVE_CACHE_SECONDS = int(os.environ.get("GARMIN_MCP_LIVE_CACHE", "60"))
+
+
+@asynccontextmanager
+async def _lifespan(server):
+    # Sync tools run on anyio's worker threads - size that pool for the shared HTTP server
+    if _serving_http:
+        import anyio.to_thread
+        anyio.to_thread.current_default_thread_limiter().total_tokens = HTTP_WORKERS
+    yield {}
+
+
+mcp = FastMCP("garmin-fox", lifespan=_lifespan)
+
+# Cold-start timings in ms, reported by --timing (or on stderr with GARMIN_MCP_TIMING=1)
+TIMINGS = {}
+REPORT_TIMINGS = os.environ.get("GARMIN_MCP_TIMING", "") == "1"
+SNAPSHOT_REFRESH = int(os.environ.get("GARMIN_MCP_SNAPSHOT_REFRESH", "0"))
+# "module:callable" returning a Garmin-like client instead of logging in (garmin_loadtest uses this)
+CLIENT_FACTORY = os.environ.get("GARMIN_CLIENT_FACTORY", "")
+
+# Last known numbers, loaded at startup so check_fox can answer before any login
+_t = time.perf_counter()
+_snapshot = read_snapshot()
+TIMINGS["snapshot_load"] = (time.perf_counter() - _t) * 1000
+
+_client = None
+_client_lock = threading.Lock()
+
+# Past days' archived responses, so one day's tools don't re-read the archive
+ARCHIVE_CACHE_DAYS = 32
+_archive_cache = {}
+_archive_lock = threading.Lock()
+
+# (method, day) -> (fetched, response), with one lock per key so concurrent
+# calls for the same thing wait for a single request
+LIVE_CACHE_MAX = 256
+_live_cache = {}
+_live_locks = {}
+_live_lock = threading.Lock()
+
+# What check_fox_history aggregates
+HISTORY_METRICS = ["resting_hr", "stress_avg", "bb_charged", "bb_drained"]
+
+
+def _report(name: str, started: float):
+    TIMINGS[name] = (time.perf_counter() - started) * 1000
+    if REPORT_TIMINGS:
+        print(f"[garmin-fox] {name}: {TIMINGS[name]:.1f} ms", file=sys.stderr)
+
 
 def get_client():
-    """Get authenticated Garmin client using saved tokens."""
-    client = Garmin()
-    client.login(TOKEN_STORE)
-    return client
+    """
+    Get authenticated Garmin client using saved tokens.
+
+    Built on first use and reused for the life of the process, so only the
+    first live call pays for importing garminconnect and loading tokens.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            started = time.perf_counter()
+            if CLIENT_FACTORY:
+                import importlib
+                module, _, name = CLIENT_FACTORY.partition(":")
+                client = getattr(importlib.import_module(module), name)()
+            else:
+                from garminconnect import Garmin
+                client = Garmin()
+                client.login(TOKEN_STORE)
+            _client = client
+            _report("token_load", started)
+        return _client
+
+
+def _archived_endpoints(day: str) -> dict:
+    """A past day's archived endpoint responses, cached until the day is re-archived."""
+    from garmin_archive import get_day, load_index
+    entry = load_index(day[:7])["days"].get(day)
+    if not entry:
+        return {}
+    cached = _archive_cache.get(day)
+    if cached and cached[0] == entry["sha"]:
+        return cached[1]
+    endpoints = (get_day(day) or {}).get("endpoints") or {}
+    with _archive_lock:
+        _archive_cache[day] = (entry["sha"], endpoints)
+        while len(_archive_cache) > ARCHIVE_CACHE_DAYS:
+            _archive_cache.pop(next(iter(_archive_cache)))
+    return endpoints
+
+
+def _call_live(method: str, day: str):
+    """One request to Garmin, paid for from the process's request budget."""
+    if garmin_endpoints.DEFAULT_BUDGET:
+        garmin_endpoints.DEFAULT_BUDGET.acquire()
+    return call_endpoint(get_client(), method, day)
+
+
+def _fetch_live(method: str, day: str):
+    """A live response, shared with any other call for it in the last LIVE_CACHE_SECONDS."""
+    if LIVE_CACHE_SECONDS <= 0:
+        return _call_live(method, day)
+
+    key = (ALIASES.get(method, method), day)
+    with _live_lock:
+        lock = _live_locks.setdefault(key, threading.Lock())
+    with lock:
+        cached = _live_cache.get(key)
+        if cached and time.monotonic() - cached[0] < LIVE_CACHE_SECONDS:
+            return cached[1]
+        response = _call_live(method, day)
+        with _live_lock:
+            _live_cache[key] = (time.monotonic(), response)
+            if len(_live_cache) > LIVE_CACHE_MAX:
+                cutoff = time.monotonic() - LIVE_CACHE_SECONDS
+                for stale in [k for k, (fetched, _) in _live_cache.items() if fetched < cutoff]:
+                    del _live_cache[stale]
+                    _live_locks.pop(stale, None)
+    return response
+
+
+def fetch_day(method: str, day: str):
+    """
+    One endpoint's response for a day. Past days come from the local
+    archive when it has them; today, or a day the archive is missing,
+    goes to Garmin.
+    """
+    if day < date.today().strftime("%Y-%m-%d"):
+        endpoints = _archived_endpoints(day)
+        key = ALIASES.get(method, method)
+        if key in endpoints:
+            return endpoints[key]
+    return _fetch_live(method, day)
+
+
+def _prewarm():
+    """
+    Log in on a background thread so the first live call doesn't have to,
+    and refresh the snapshot if it's stale. With GARMIN_MCP_SNAPSHOT_REFRESH
+    set (seconds), keep refreshing it for as long as the server runs.
+    """
+    try:
+        get_client()
+        if not is_fresh(_snapshot):
+            check_fox(live=True)
+        while SNAPSHOT_REFRESH > 0:
+            time.sleep(SNAPSHOT_REFRESH)
+            check_fox(live=True)
+    except Exception as e:
+        print(f"[garmin-fox] prewarm failed: {e}", file=sys.stderr)
 
 
 @mcp.tool()
-def check_fox() -> str:
+@profiled
+def check_fox(live: bool = False, day: str = "") -> str:
     """
     Check Fox's current biometrics from her Garmin Lily 2.
     Returns HR, stress, Body Battery, and any available HRV.
 
     Use this whenever you want to see how Fox is doing physically.
+    Answers from the local snapshot if it's only a few minutes old;
+    pass live=True to always go to Garmin.
+
+    Args:
+        live: Skip the snapshot and ask Garmin
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
+    global _snapshot
+    started = time.perf_counter()
+    today = date.today().strftime("%Y-%m-%d")
+    if not live and not is_fresh(_snapshot):
+        # A sync, live_check --watch or garmin_push may have written a newer one
+        _snapshot = read_snapshot() or _snapshot
+    if not live and (not day or day == today) and is_fresh(_snapshot):
+        result = dict(_snapshot, source="snapshot", age_seconds=int(snapshot_age(_snapshot)))
+        result.pop("snapshot_at", None)
+        if "first_response" not in TIMINGS:
+            _report("first_response", started)
+        return dumps(result, indent=2)
+
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or today
 
         result = {
             "timestamp": datetime.now().isoformat(),
@@ -43,7 +235,7 @@ def check_fox() -> str:
 
         # Heart Rate
         try:
-            hr = client.get_heart_rates(today)
+            hr = fetch_day("get_heart_rates", today)
             result["heart_rate"] = {
                 "resting": hr.get("restingHeartRate"),
                 "max": hr.get("maxHeartRate"),
@@ -54,7 +246,7 @@ def check_fox() -> str:
 
         # Stress
         try:
-            stress = client.get_all_day_stress(today)
+            stress = fetch_day("get_all_day_stress", today)
             if stress:
                 result["stress"] = {
                     "avg": stress.get("avgStressLevel"),
@@ -65,19 +257,19 @@ def check_fox() -> str:
 
         # Body Battery
         try:
-            bb = client.get_body_battery(today, today)
+            bb = fetch_day("get_body_battery", today)
             if bb and len(bb) > 0:
-                day = bb[0] if isinstance(bb, list) else bb
+                bb_day = bb[0] if isinstance(bb, list) else bb
                 result["body_battery"] = {
-                    "charged": day.get("charged"),
-                    "drained": day.get("drained")
+                    "charged": bb_day.get("charged"),
+                    "drained": bb_day.get("drained")
                 }
         except Exception as e:
             result["body_battery"] = {"error": str(e)}
 
         # HRV (if available)
         try:
-            hrv = client.get_hrv_data(today)
+            hrv = fetch_day("get_hrv_data", today)
             if hrv and "hrvSummary" in hrv:
                 s = hrv["hrvSummary"]
                 result["hrv"] = {
@@ -96,23 +288,35 @@ def check_fox() -> str:
 
         result["summary"] = f"HR {hr_val}bpm | Stress {stress_val} | BB +{bb_charged}/-{bb_drained}"
 
-        return json.dumps(result, indent=2)
+        if today == date.today().strftime("%Y-%m-%d"):
+            try:
+                write_snapshot(result)
+                _snapshot = read_snapshot()
+            except OSError:
+                pass
+
+        if "first_response" not in TIMINGS:
+            _report("first_response", started)
+        return dumps(dict(result, source="live" if today == date.today().strftime("%Y-%m-%d") else "history"), indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_sleep() -> str:
+@profiled
+def check_fox_sleep(day: str = "") -> str:
     """
     Check Fox's sleep data from last night.
     Returns duration, sleep stages, and quality metrics.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        sleep = client.get_sleep_data(today)
+        sleep = fetch_day("get_sleep_data", today)
 
         if sleep and "dailySleepDTO" in sleep:
             s = sleep["dailySleepDTO"]
@@ -130,79 +334,111 @@ def check_fox_sleep() -> str:
                 "awake_minutes": s.get("awakeSleepSeconds", 0) // 60
             }
 
-            return json.dumps(result, indent=2)
+            return dumps(result, indent=2)
         else:
-            return json.dumps({"message": "No sleep data available yet"})
+            return dumps({"message": "No sleep data available yet"})
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
+
+
+def _history_row(date_str: str, endpoints: dict = None) -> dict:
+    """One day's history metrics, from archived responses if given, else fetch_day."""
+    def response(method):
+        if endpoints is not None and method in endpoints:
+            return endpoints[method]
+        try:
+            return fetch_day(method, date_str)
+        except Exception:
+            return None
+
+    row = {"date": date_str}
+    hr = response("get_heart_rates") or {}
+    row["resting_hr"] = hr.get("restingHeartRate")
+    stress = response("get_all_day_stress") or {}
+    row["stress_avg"] = stress.get("avgStressLevel")
+    bb = response("get_body_battery")
+    bb_day = (bb[0] if isinstance(bb, list) else bb) if bb else {}
+    row["bb_charged"] = bb_day.get("charged")
+    row["bb_drained"] = bb_day.get("drained")
+    return row
+
+
+def _history_rows(start: date, end: date):
+    """
+    Yield history rows oldest first. Archived days stream straight out of
+    the month files one at a time; today and any gaps go through fetch_day.
+    """
+    from garmin_archive import iter_days
+    today = date.today().strftime("%Y-%m-%d")
+    archived = iter_days(start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"))
+    record = next(archived, None)
+
+    day = start
+    while day <= end:
+        date_str = day.strftime("%Y-%m-%d")
+        endpoints = None
+        while record is not None and record.get("date", "") < date_str:
+            record = next(archived, None)
+        if record is not None and record.get("date") == date_str:
+            if date_str != today:
+                endpoints = record.get("endpoints") or {}
+            record = next(archived, None)
+        yield _history_row(date_str, endpoints)
+        day += timedelta(days=1)
 
 
 @mcp.tool()
-def check_fox_history(days: int = 7) -> str:
+@profiled
+def check_fox_history(days: int = 7, include_days: bool = False) -> str:
     """
     Get Fox's biometric trends over recent days.
 
     Args:
-        days: Number of days to look back (default 7)
+        days: Number of days to look back (default 7) - years are fine, the answer stays the same size
+        include_days: Also return every day's values (grows with days)
 
-    Returns summary of HR, stress, and Body Battery trends.
+    Returns per-metric mean, spread, min/max, p10/p50/p90 and trend per week for
+    resting HR, stress, and Body Battery charged/drained.
     """
     try:
-        client = get_client()
-        history = []
-
-        for i in range(days):
-            target = date.today() - timedelta(days=i)
-            date_str = target.strftime("%Y-%m-%d")
+        from garmin_stream import StreamSummary
 
-            day_data = {"date": date_str}
-
-            try:
-                hr = client.get_heart_rates(date_str)
-                day_data["resting_hr"] = hr.get("restingHeartRate")
-            except:
-                pass
-
-            try:
-                stress = client.get_all_day_stress(date_str)
-                if stress:
-                    day_data["stress_avg"] = stress.get("avgStressLevel")
-            except:
-                pass
-
-            try:
-                bb = client.get_body_battery(date_str, date_str)
-                if bb and len(bb) > 0:
-                    day = bb[0] if isinstance(bb, list) else bb
-                    day_data["bb_charged"] = day.get("charged")
-                    day_data["bb_drained"] = day.get("drained")
-            except:
-                pass
+        end = date.today()
+        rows = _history_rows(end - timedelta(days=max(days, 1) - 1), end)
+        summary = StreamSummary(HISTORY_METRICS)
 
-            history.append(day_data)
+        result = {}
+        if include_days:
+            result["history"] = list(summary.consume(rows))
+        else:
+            for row in rows:
+                summary.add(row)
 
-        return json.dumps({"days": days, "history": history}, indent=2)
+        return dumps({**summary.result(), **result}, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def fox_status_summary() -> str:
+@profiled
+def fox_status_summary(day: str = "") -> str:
     """
     Get a quick human-readable summary of how Fox is doing.
     Interprets the numbers into plain language.
 
     Use this for a quick check-in without raw data.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        hr = client.get_heart_rates(today)
-        stress = client.get_all_day_stress(today)
-        bb = client.get_body_battery(today, today)
+        hr = fetch_day("get_heart_rates", today)
+        stress = fetch_day("get_all_day_stress", today)
+        bb = fetch_day("get_body_battery", today)
 
         resting_hr = hr.get("restingHeartRate") if hr else None
         stress_avg = stress.get("avgStressLevel") if stress else None
@@ -249,7 +485,7 @@ def fox_status_summary() -> str:
 
         summary = "\n".join(lines)
 
-        return json.dumps({
+        return dumps({
             "summary": summary,
             "raw": {
                 "hr": resting_hr,
@@ -260,26 +496,29 @@ def fox_status_summary() -> str:
         }, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_spo2() -> str:
+@profiled
+def check_fox_spo2(day: str = "") -> str:
     """
     Check Fox's blood oxygen saturation (SpO2).
     Returns current SpO2 levels and averages.
 
     Low SpO2 can indicate breathing issues, especially relevant
     with her chest infection history.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_spo2_data(today)
+        data = fetch_day("get_spo2_data", today)
 
         if not data:
-            return json.dumps({"message": "No SpO2 data available"})
+            return dumps({"message": "No SpO2 data available"})
 
         result = {
             "date": today,
@@ -300,29 +539,32 @@ def check_fox_spo2() -> str:
             else:
                 result["interpretation"] = f"SpO2 {avg}% - LOW, may need attention"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_respiration() -> str:
+@profiled
+def check_fox_respiration(day: str = "") -> str:
     """
     Check Fox's respiration rate data.
     Returns breathing rate and timeline.
 
     Higher respiration can indicate stress, illness, or physical exertion.
     Normal is 12-20 breaths per minute at rest.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_respiration_data(today)
+        data = fetch_day("get_respiration_data", today)
 
         if not data:
-            return json.dumps({"message": "No respiration data available"})
+            return dumps({"message": "No respiration data available"})
 
         result = {
             "date": today,
@@ -351,28 +593,31 @@ def check_fox_respiration() -> str:
             else:
                 result["interpretation"] = f"Breathing rate {avg}/min - Elevated, may indicate stress or illness"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_stress_timeline() -> str:
+@profiled
+def check_fox_stress_timeline(day: str = "") -> str:
     """
     Get Fox's stress levels throughout the day as a timeline.
     Shows how stress has changed over time, not just the average.
 
     Useful for identifying stress triggers and patterns.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_stress_data(today)
+        data = fetch_day("get_stress_data", today)
 
         if not data:
-            return json.dumps({"message": "No stress data available"})
+            return dumps({"message": "No stress data available"})
 
         result = {
             "date": today,
@@ -414,31 +659,36 @@ def check_fox_stress_timeline() -> str:
         else:
             result["interpretation"] = f"Low stress (avg {avg}, max {max_s}) - Calm"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_cycle() -> str:
+@profiled
+def check_fox_cycle(day: str = "") -> str:
     """
     Check Fox's menstrual cycle data.
     Returns current cycle day, phase, and fertility window.
 
     Cycle phase affects energy, pain sensitivity, stress response,
     and cognitive function. Critical context for interpreting other metrics.
+
+    Answered from the local cycle calendar for any date; Garmin is asked
+    at most once a day, or when a phase boundary has passed.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        from garmin_cycle import cycle_summary
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_menstrual_data_for_date(today)
+        summary = cycle_summary(today, lambda d: fetch_day("get_menstrual_data_for_date", d))
 
-        if not data or "daySummary" not in data:
-            return json.dumps({"message": "No menstrual data available"})
-
-        summary = data["daySummary"]
+        if not summary:
+            return dumps({"message": "No menstrual data available"})
 
         # Map phase numbers to names
         phase_names = {
@@ -462,7 +712,8 @@ def check_fox_cycle() -> str:
             "fertile_window_starts": summary.get("fertileWindowStart"),
             "fertile_window_length": summary.get("lengthOfFertileWindow"),
             "period_length": summary.get("periodLength"),
-            "cycle_type": summary.get("cycleType")
+            "cycle_type": summary.get("cycleType"),
+            "source": summary.get("source")
         }
 
         # Phase-specific context
@@ -475,14 +726,15 @@ def check_fox_cycle() -> str:
         elif phase_num == 4:
             result["context"] = "Luteal phase - energy may dip, PMS symptoms possible in latter half"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_hrv_detail() -> str:
+@profiled
+def check_fox_hrv_detail(day: str = "") -> str:
     """
     Get detailed HRV (Heart Rate Variability) data.
     HRV is a key indicator of nervous system state and recovery.
@@ -491,15 +743,17 @@ def check_fox_hrv_detail() -> str:
     Lower HRV = stress, fatigue, or illness affecting autonomic function
 
     Fox's baseline has been documented at 23-24ms during crisis periods.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_hrv_data(today)
+        data = fetch_day("get_hrv_data", today)
 
         if not data:
-            return json.dumps({
+            return dumps({
                 "message": "No HRV data available yet",
                 "note": "HRV is typically measured during sleep - check after a full night's rest"
             })
@@ -529,35 +783,38 @@ def check_fox_hrv_detail() -> str:
         if "hrvValues" in data:
             result["readings"] = data["hrvValues"]
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_sleep_detail() -> str:
+@profiled
+def check_fox_sleep_detail(day: str = "") -> str:
     """
     Get detailed sleep data including all sleep stages.
     Returns REM, deep, light sleep breakdown and sleep quality metrics.
 
     Deep sleep is critical for physical recovery.
     REM sleep is critical for cognitive function and emotional processing.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_sleep_data(today)
+        data = fetch_day("get_sleep_data", today)
 
         if not data or "dailySleepDTO" not in data:
-            return json.dumps({"message": "No sleep data available for today"})
+            return dumps({"message": "No sleep data available for today"})
 
         s = data["dailySleepDTO"]
 
         # Check if there's actual sleep data
         if not s.get("sleepTimeSeconds"):
-            return json.dumps({
+            return dumps({
                 "message": "No sleep recorded yet for today",
                 "note": "Sleep data appears after waking from a sleep period"
             })
@@ -609,27 +866,30 @@ def check_fox_sleep_detail() -> str:
 
         result["interpretation"] = "; ".join(interpretations) if interpretations else "Sleep analysis complete"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_body_battery_timeline() -> str:
+@profiled
+def check_fox_body_battery_timeline(day: str = "") -> str:
     """
     Get Body Battery timeline showing energy levels throughout the day.
     Shows when energy was charged (rest) vs drained (activity/stress).
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
         # Get stress data which includes body battery timeline
-        data = client.get_stress_data(today)
+        data = fetch_day("get_stress_data", today)
 
         if not data:
-            return json.dumps({"message": "No body battery timeline available"})
+            return dumps({"message": "No body battery timeline available"})
 
         result = {"date": today}
 
@@ -658,11 +918,11 @@ def check_fox_body_battery_timeline() -> str:
 
         # Also get the charged/drained summary
         try:
-            bb = client.get_body_battery(today, today)
+            bb = fetch_day("get_body_battery", today)
             if bb and len(bb) > 0:
-                day = bb[0] if isinstance(bb, list) else bb
-                result["charged_today"] = day.get("charged")
-                result["drained_today"] = day.get("drained")
+                bb_day = bb[0] if isinstance(bb, list) else bb
+                result["charged_today"] = bb_day.get("charged")
+                result["drained_today"] = bb_day.get("drained")
         except:
             pass
 
@@ -680,66 +940,71 @@ def check_fox_body_battery_timeline() -> str:
             else:
                 result["interpretation"] = f"Body Battery at {current} - Well rested"
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def check_fox_training_readiness() -> str:
+@profiled
+def check_fox_training_readiness(day: str = "") -> str:
     """
     Check training readiness score.
     Combines sleep, recovery, and training load to assess
     if body is ready for activity or needs rest.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
-        data = client.get_training_readiness(today)
+        # Morning readiness is the fallback - started alongside, not after
+        source, data = hedged_fetch([
+            lambda: fetch_day("get_training_readiness", today),
+            lambda: fetch_day("get_morning_training_readiness", today),
+        ])
 
-        if not data or len(data) == 0:
-            # Try morning readiness as fallback
-            try:
-                morning = client.get_morning_training_readiness(today)
-                if morning:
-                    return json.dumps({
-                        "date": today,
-                        "source": "morning_readiness",
-                        "data": morning
-                    }, indent=2)
-            except:
-                pass
-
-            return json.dumps({
+        if source is None:
+            return dumps({
                 "message": "No training readiness data available",
                 "note": "This metric requires sufficient activity and sleep data to calculate"
             })
 
+        if source == 1:
+            return dumps({
+                "date": today,
+                "source": "morning_readiness",
+                "data": data
+            }, indent=2)
+
         result = {
             "date": today,
             "data": data
         }
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
 
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
 
 
 @mcp.tool()
-def fox_full_status() -> str:
+@profiled
+def fox_full_status(day: str = "") -> str:
     """
     Comprehensive health check - pulls all available metrics at once.
     Use this for a complete picture of how Fox is doing.
 
     Returns: HR, stress, body battery, respiration, cycle phase, sleep,
     SpO2, HRV, and interpretations for each.
+
+    Args:
+        day: Date as YYYY-MM-DD for a past day, answered from the local archive (blank = today)
     """
     try:
-        client = get_client()
-        today = date.today().strftime("%Y-%m-%d")
+        today = day or date.today().strftime("%Y-%m-%d")
 
         result = {
             "timestamp": datetime.now().isoformat(),
@@ -749,7 +1014,7 @@ def fox_full_status() -> str:
 
         # Heart Rate
         try:
-            hr = client.get_heart_rates(today)
+            hr = fetch_day("get_heart_rates", today)
             result["metrics"]["heart_rate"] = {
                 "resting": hr.get("restingHeartRate"),
                 "max": hr.get("maxHeartRate"),
@@ -760,7 +1025,7 @@ def fox_full_status() -> str:
 
         # Stress
         try:
-            stress = client.get_stress_data(today)
+            stress = fetch_day("get_stress_data", today)
             if stress:
                 result["metrics"]["stress"] = {
                     "avg": stress.get("avgStressLevel"),
@@ -771,19 +1036,19 @@ def fox_full_status() -> str:
 
         # Body Battery
         try:
-            bb = client.get_body_battery(today, today)
+            bb = fetch_day("get_body_battery", today)
             if bb and len(bb) > 0:
-                day = bb[0] if isinstance(bb, list) else bb
+                bb_day = bb[0] if isinstance(bb, list) else bb
                 result["metrics"]["body_battery"] = {
-                    "charged": day.get("charged"),
-                    "drained": day.get("drained")
+                    "charged": bb_day.get("charged"),
+                    "drained": bb_day.get("drained")
                 }
         except:
             result["metrics"]["body_battery"] = None
 
         # Respiration
         try:
-            resp = client.get_respiration_data(today)
+            resp = fetch_day("get_respiration_data", today)
             if resp:
                 result["metrics"]["respiration"] = {
                     "avg_waking": resp.get("avgWakingRespirationValue"),
@@ -794,7 +1059,7 @@ def fox_full_status() -> str:
 
         # SpO2
         try:
-            spo2 = client.get_spo2_data(today)
+            spo2 = fetch_day("get_spo2_data", today)
             if spo2:
                 result["metrics"]["spo2"] = {
                     "average": spo2.get("averageSpO2"),
@@ -805,7 +1070,7 @@ def fox_full_status() -> str:
 
         # HRV
         try:
-            hrv = client.get_hrv_data(today)
+            hrv = fetch_day("get_hrv_data", today)
             if hrv and "hrvSummary" in hrv:
                 s = hrv["hrvSummary"]
                 result["metrics"]["hrv"] = {
@@ -818,9 +1083,9 @@ def fox_full_status() -> str:
 
         # Menstrual Cycle
         try:
-            cycle = client.get_menstrual_data_for_date(today)
-            if cycle and "daySummary" in cycle:
-                s = cycle["daySummary"]
+            from garmin_cycle import cycle_summary
+            s = cycle_summary(today, lambda d: fetch_day("get_menstrual_data_for_date", d))
+            if s:
                 phase_names = {1: "Menstrual", 2: "Follicular", 3: "Ovulation", 4: "Luteal"}
                 result["metrics"]["cycle"] = {
                     "day": s.get("dayInCycle"),
@@ -832,7 +1097,7 @@ def fox_full_status() -> str:
 
         # Sleep (from last night)
         try:
-            sleep = client.get_sleep_data(today)
+            sleep = fetch_day("get_sleep_data", today)
             if sleep and "dailySleepDTO" in sleep:
                 s = sleep["dailySleepDTO"]
                 if s.get("sleepTimeSeconds"):
@@ -885,11 +1150,214 @@ def fox_full_status() -> str:
 
         result["summary"] = " | ".join(summary_lines)
 
-        return json.dumps(result, indent=2)
+        return dumps(result, indent=2)
+
+    except Exception as e:
+        return dumps({"error": str(e)})
+
+
+@mcp.tool()
+@profiled
+def check_fox_patterns(biometric: str = "", feeling: str = "", lag: int = -1, top: int = 10) -> str:
+    """
+    How Fox's body and feelings move together, from precomputed correlations
+    between daily Garmin metrics and logged EQ observations.
+
+    Args:
+        biometric: Part of a biometric name, e.g. "hrv", "stress", "sleep_deep", "phase_luteal" (blank = any)
+        feeling: Part of an emotional feature, e.g. "sharp", "shadow", "emotion:dread", "pillar:self_management" (blank = any)
+        lag: Days from the biometric to the feeling - 1 means "the day before" (-1 = any lag up to 3)
+        top: How many of the strongest matches to return
+
+    Each pair has Pearson r, the number of paired days, and the average of the
+    feeling on days after a low (bottom quartile) reading vs other days.
+    Example: does low HRV precede sharp days? biometric="hrv_last_night", feeling="sharp", lag=1
+    """
+    try:
+        from garmin_correlations import query
+        result = query(biometric or None, feeling or None, None if lag < 0 else lag, top)
+        return dumps(result, indent=2)
+    except Exception as e:
+        return dumps({"error": str(e)})
+
 
+@mcp.tool()
+@profiled
+def check_fox_profile(metric: str = "stress", hour: int = -1, weekday: str = "", phase: str = "") -> str:
+    """
+    Fox's usual levels by time of day, from a precomputed profile of every
+    archived intraday reading.
+
+    Args:
+        metric: "stress", "heart_rate" or "body_battery"
+        hour: Hour of day 0-23 (-1 = all hours, returned as a 24-hour profile)
+        weekday: A day name ("mon", "friday"), "weekdays" or "weekends" (blank = any)
+        phase: Cycle phase - "menstrual", "follicular", "ovulation" or "luteal" (blank = any)
+
+    Returns count, mean, sd and p10/p50/p90 for the matching readings.
+    Example: her usual stress at 3pm on weekdays: metric="stress", hour=15, weekday="weekdays"
+    """
+    try:
+        from garmin_profile import query
+        result = query(metric, None if hour < 0 else hour, weekday or None, phase or None)
+        return dumps(result, indent=2)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return dumps({"error": str(e)})
+
+
+@mcp.tool()
+@profiled
+def recall_fox_memory(entity_type: str = "biometric_log", start: str = "", end: str = "",
+                      name: str = "", limit: int = 20, resolve: bool = False) -> str:
+    """
+    Look up companion episodic memory entries by type and date range, or by
+    exact name, through an index rather than reading the whole file.
+
+    Args:
+        entity_type: Entity type to match, e.g. "biometric_log" (blank = any type)
+        start: First date YYYY-MM-DD (blank = no lower bound)
+        end: Last date YYYY-MM-DD (blank = no upper bound)
+        name: Exact entity name, e.g. "Garmin_Sync_2026-01-06" - overrides the other filters
+        limit: Most entries to return, newest first
+        resolve: Fill in each sync entry's metrics from the archive (raw_ref -> raw_data),
+            with raw_ref_status "current", "resynced" (the archive has a newer copy) or "missing"
+
+    Example: last week's sync logs: start="2026-01-01", end="2026-01-07"
+    """
+    try:
+        from episodic_index import default_index
+        index = default_index()
+        if name:
+            entries = index.get(name)
+        else:
+            entries = index.query(entity_type or None, start or None, end or None, max(1, min(limit, 200)))
+        if resolve:
+            from garmin_archive import resolve_ref
+            for entry in entries:
+                for obs in entry.get("observations", []):
+                    if "raw_ref" in obs and "raw_data" not in obs:
+                        record, obs["raw_ref_status"] = resolve_ref(obs["raw_ref"])
+                        if record:
+                            obs["raw_data"] = record.get("metrics")
+        return dumps({"count": len(entries), "entries": entries}, indent=2)
+    except Exception as e:
+        return dumps({"error": str(e)})
+
+
+@mcp.tool()
+def profile_tool(tool: str, arguments: str = "{}") -> str:
+    """
+    Run one tool call under the profiler and report where its time and
+    memory went - network, JSON decoding, our own code - instead of its answer.
+    The full profile and summary are also saved under GARMIN_PERF_PATH.
+
+    Args:
+        tool: Tool name, e.g. "fox_full_status" or "check_fox_history"
+        arguments: The tool's arguments as a JSON object, e.g. '{"days": 365}'
+
+    Example: why is a year of history slow: tool="check_fox_history", arguments='{"days": 365}'
+    """
+    try:
+        fn = PROFILED.get(tool)
+        if fn is None:
+            return dumps({"error": f"Unknown tool: {tool}", "tools": sorted(PROFILED)})
+        with capture(tool, force=True) as summary:
+            output = fn(**loads(arguments or "{}"))
+        if not summary:
+            return dumps({"error": "Another capture is running - try again shortly"})
+        summary["result_bytes"] = len(output)
+        return dumps(summary, indent=2)
+    except Exception as e:
+        return dumps({"error": str(e)})
+
+
+TIMINGS["import"] = (time.perf_counter() - _STARTED) * 1000
+
+
+def startup_report():
+    """Measure a cold start: import, snapshot + token load, first responses."""
+    print("=== GARMIN MCP COLD START ===\n")
+    print(f"Import (fastmcp + tools): {TIMINGS['import']:.1f} ms")
+    print(f"Snapshot load:            {TIMINGS['snapshot_load']:.1f} ms "
+          f"({'fresh' if is_fresh(_snapshot) else 'stale or missing'})")
+
+    started = time.perf_counter()
+    check_fox()
+    print(f"First check_fox:          {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    started = time.perf_counter()
+    try:
+        get_client()
+        print(f"Token load (login):       {TIMINGS['token_load']:.1f} ms")
+    except Exception as e:
+        print(f"Token load failed after {(time.perf_counter() - started) * 1000:.1f} ms: {e}")
+        return
+
+    started = time.perf_counter()
+    check_fox(live=True)
+    print(f"Live check_fox:           {(time.perf_counter() - started) * 1000:.1f} ms")
+    print(f"\nProcess start to now:     {(time.perf_counter() - _STARTED) * 1000:.1f} ms")
+
+
+def _http_auth():
+    """Bearer-token check from GARMIN_MCP_TOKENS, or None if no tokens are set."""
+    tokens = {}
+    for pair in HTTP_TOKENS.split(","):
+        pair = pair.strip()
+        if not pair:
+            continue
+        room, token = pair.split("=", 1) if "=" in pair else ("room", pair)
+        tokens[token] = {"client_id": room, "scopes": []}
+    if not tokens:
+        return None
+    from fastmcp.server.auth.providers.jwt import StaticTokenVerifier
+    return StaticTokenVerifier(tokens)
+
+
+def _option(args: list, flag: str, default):
+    """A flag's value converted like its default; exits with usage if it's missing or malformed."""
+    if flag not in args:
+        return default
+    i = args.index(flag) + 1
+    try:
+        if i >= len(args) or args[i].startswith("--"):
+            raise ValueError("missing value")
+        return type(default)(args[i])
+    except ValueError:
+        print(f"{flag} needs a value like {default!r}\n{HTTP_USAGE}", file=sys.stderr)
+        exit(1)
+
+
+def run_http(args: list):
+    """
+    Serve every room from this one process over streamable HTTP: one login,
+    one archive cache and one live cache, however many rooms connect.
+    """
+    global HTTP_WORKERS, _serving_http
+    host = _option(args, "--host", HTTP_HOST)
+    port = _option(args, "--port", HTTP_PORT)
+    HTTP_WORKERS = _option(args, "--workers", HTTP_WORKERS)
+    _serving_http = True
+
+    auth = _http_auth()
+    if auth is None:
+        if host not in ("127.0.0.1", "localhost", "::1"):
+            print(f"Refusing to serve on {host} without GARMIN_MCP_TOKENS set", file=sys.stderr)
+            exit(1)
+        print("[garmin-fox] no GARMIN_MCP_TOKENS - serving without auth on localhost only", file=sys.stderr)
+    mcp.auth = auth
+
+    print(f"[garmin-fox] http://{host}:{port}/mcp, {HTTP_WORKERS} workers", file=sys.stderr)
+    mcp.run(transport="http", host=host, port=port)
 
 
 if __name__ == "__main__":
-    mcp.run()
+    if "--timing" in sys.argv:
+        startup_report()
+    else:
+        if os.environ.get("GARMIN_MCP_PREWARM", "1") == "1":
+            threading.Thread(target=_prewarm, daemon=True).start()
+        if "--http" in sys.argv:
+            run_http(sys.argv[1:])
+        else:
+            mcp.run()
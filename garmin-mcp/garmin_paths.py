@@ -0,0 +1,21 @@
+"""
+Where Fox's data lives on disk
+Every script reads its locations from here, so one environment variable
+moves a directory for all of them.
+
+Config:
+    GARMIN_DATA_PATH        archive, snapshot, caches, queues (default ~/garmin-data)
+    HEALTH_LOGS_PATH        the Obsidian Health-Logs folder (default ~/health-logs)
+    COMPANION_MEMORY_PATH   companion-memory, holding memory-episodic.jsonl (default ~/companion-memory)
+
+Per-file overrides (GARMIN_ARCHIVE_PATH, GARMIN_SNAPSHOT_PATH, ...) stay
+with the module that owns the file.
+"""
+
+import os
+from pathlib import Path
+
+
+GARMIN_DATA_PATH = Path(os.environ.get("GARMIN_DATA_PATH", str(Path.home() / "garmin-data")))
+HEALTH_LOGS_PATH = Path(os.environ.get("HEALTH_LOGS_PATH", str(Path.home() / "health-logs")))
+COMPANION_MEMORY_PATH = Path(os.environ.get("COMPANION_MEMORY_PATH", str(Path.home() / "companion-memory")))
@@ -0,0 +1,207 @@
+"""
+On-demand CPU and allocation capture for single tool calls and sync runs
+When a tool is slow it's not obvious whether the time goes to the network,
+decoding Garmin's JSON or our own loops over readings. With GARMIN_PERF set,
+each matching tool call (or sync run) runs under cProfile and tracemalloc,
+and leaves in GARMIN_PERF_PATH:
+
+    20260106-153012-481-fox_full_status.prof   # pstats / snakeviz
+    20260106-153012-481-fox_full_status.txt    # hotspots, time by category, allocation peaks
+
+GARMIN_PERF: "all", or a comma list of tool names and/or "sync". The MCP
+tool profile_tool captures one call on demand without restarting anything.
+
+cProfile sees the calling thread only - work a tool hands to a pool (the
+hedged fetches) shows up as time waiting. tracemalloc is process-wide, so
+allocation numbers include anything else running at the time. One capture
+runs at a time; calls made meanwhile just run unprofiled.
+
+Stdlib only - the MCP server uses it.
+
+Usage:
+    GARMIN_PERF=fox_full_status,sync python garmin_mcp_server.py
+    python garmin_perf.py                 # list captures
+    python garmin_perf.py <capture>       # print one summary
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from garmin_paths import GARMIN_DATA_PATH
+
+
+PERF_DIR = Path(os.environ.get("GARMIN_PERF_PATH", str(GARMIN_DATA_PATH / "perf")))
+PERF_TARGETS = {t.strip() for t in os.environ.get("GARMIN_PERF", "").split(",") if t.strip()}
+PERF_KEEP = 50               # captures kept; older ones are deleted
+TOP = 15                     # hotspots listed in a summary
+
+HERE = str(Path(__file__).resolve().parent)
+
+# Where time goes, by the file a function lives in - first match wins
+CATEGORIES = (
+    ("network", ("socket", "ssl", "http/client", "urllib3", "requests", "selectors")),
+    ("json", ("json/",)),
+    ("waiting", ("threading", "concurrent/futures", "queue")),
+    ("garmin-mcp", (HERE,)),
+)
+
+# Tool name -> undecorated function, for profile_tool
+PROFILED = {}
+
+_capture_lock = threading.Lock()
+
+
+def enabled(label: str) -> bool:
+    return "all" in PERF_TARGETS or "1" in PERF_TARGETS or label in PERF_TARGETS
+
+
+def _category(filename: str) -> str:
+    path = filename.replace("\\", "/")
+    for name, markers in CATEGORIES:
+        if any(marker.replace("\\", "/") in path for marker in markers):
+            return name
+    return "other"
+
+
+def _summarize(profile: cProfile.Profile, label: str, seconds: float, peak: int, allocations: list) -> dict:
+    stats = pstats.Stats(profile)
+    by_category = {}
+    rows = []
+    for (filename, line, function), (_, calls, own, cumulative, _) in stats.stats.items():
+        category = _category(filename)
+        by_category[category] = by_category.get(category, 0.0) + own
+        rows.append({
+            "function": f"{Path(filename).name}:{line}:{function}",
+            "calls": calls,
+            "own_ms": round(own * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2),
+            "category": category,
+        })
+    rows.sort(key=lambda r: r["own_ms"], reverse=True)
+    return {
+        "label": label,
+        "captured": datetime.now().isoformat(timespec="seconds"),
+        "wall_ms": round(seconds * 1000, 1),
+        "cpu_profiled_ms": round(stats.total_tt * 1000, 1),
+        "by_category_ms": {k: round(v * 1000, 1) for k, v in sorted(by_category.items(), key=lambda kv: -kv[1])},
+        "hotspots": rows[:TOP],
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "top_allocations": allocations,
+    }
+
+
+def _write(profile: cProfile.Profile, summary: dict) -> dict:
+    PERF_DIR.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    stem = f"{now:%Y%m%d-%H%M%S}-{now.microsecond // 1000:03d}-{summary['label']}"
+    profile.dump_stats(PERF_DIR / f"{stem}.prof")
+
+    text = io.StringIO()
+    text.write(f"{summary['label']}  wall {summary['wall_ms']} ms, profiled {summary['cpu_profiled_ms']} ms, "
+               f"peak allocations {summary['peak_alloc_kb']} KB\n\nTime by category (own time, ms):\n")
+    for category, ms in summary["by_category_ms"].items():
+        text.write(f"  {category:<12} {ms:>10.1f}\n")
+    text.write("\nAllocations still held at the end, by line:\n")
+    for site in summary["top_allocations"]:
+        text.write(f"  {site['kb']:>10.1f} KB  {site['count']:>7}  {site['site']}\n")
+    text.write("\n")
+    pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(TOP * 2)
+    (PERF_DIR / f"{stem}.txt").write_text(text.getvalue(), encoding="utf-8")
+
+    # Keep the directory from growing without bound
+    captures = sorted(PERF_DIR.glob("*.prof"))
+    for old in captures[:-PERF_KEEP]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".txt").unlink(missing_ok=True)
+
+    summary["files"] = [str(PERF_DIR / f"{stem}.prof"), str(PERF_DIR / f"{stem}.txt")]
+    return summary
+
+
+@contextmanager
+def capture(label: str, force: bool = False):
+    """
+    Profile the block if GARMIN_PERF selects `label` (or `force`). Yields a
+    dict that holds the summary once the block exits - empty if nothing
+    was captured.
+    """
+    result = {}
+    if not (force or enabled(label)) or not _capture_lock.acquire(blocking=False):
+        yield result
+        return
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    profile = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        profile.enable()
+        try:
+            yield result
+        finally:
+            profile.disable()
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+        ])
+        allocations = [
+            {"site": f"{Path(s.traceback[0].filename).name}:{s.traceback[0].lineno}",
+             "kb": round(s.size / 1024, 1), "count": s.count}
+            for s in snapshot.statistics("lineno")[:10]
+        ]
+        result.update(_write(profile, _summarize(profile, label, seconds, peak, allocations)))
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _capture_lock.release()
+
+
+def profiled(fn):
+    """Decorator for MCP tools: capture the call when GARMIN_PERF names the tool."""
+    PROFILED[fn.__name__] = fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with capture(fn.__name__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
+def main():
+    args = sys.argv[1:]
+    captures = sorted(PERF_DIR.glob("*.txt")) if PERF_DIR.exists() else []
+    if args:
+        matches = [c for c in captures if args[0] in c.name]
+        if not matches:
+            print(f"No capture matching {args[0]} in {PERF_DIR}")
+            return
+        print(matches[-1].read_text(encoding="utf-8"))
+        return
+
+    print("=" * 50)
+    print("PROFILER CAPTURES")
+    print("=" * 50)
+    if not captures:
+        print(f"\nNone yet in {PERF_DIR}. Set GARMIN_PERF=all (or tool names, or sync).")
+        return
+    for c in captures:
+        print(f"  {c.stem}")
+    print(f"\n{len(captures)} captures in {PERF_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Hour-of-day profiles for Fox's stress, heart rate and Body Battery
+Folds every archived intraday reading into a cube of cells - metric x
+weekday x hour x cycle phase - each holding a count, mean, variance and a
+quantile sketch. "What's her usual stress at 3pm on weekdays?" then merges
+a handful of cells instead of scanning years of timelines.
+
+The cube is updated incrementally: each run folds in only days it hasn't
+seen. Days are folded once they're SETTLE_DAYS old, since the sync keeps
+re-fetching the last day or two; if an already-folded day changes later
+(a manual re-sync), the cube is rebuilt from the archive.
+
+Usage:
+    python garmin_profile.py                    # fold in new days
+    python garmin_profile.py --full             # rebuild from the archive
+    python garmin_profile.py stress             # hourly stress profile
+    python garmin_profile.py stress 15 weekdays # 3pm on weekdays
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from garmin_archive import archived_months, iter_days, load_index
+from garmin_paths import GARMIN_DATA_PATH
+from garmin_stream import PERCENTILES, SKETCH_BINS, QuantileSketch
+
+
+PROFILE_FILE = Path(os.environ.get("GARMIN_PROFILE_PATH", str(GARMIN_DATA_PATH / "profile.json")))
+
+SETTLE_DAYS = 2              # days younger than this aren't folded in yet
+METRICS = ("stress", "heart_rate", "body_battery")
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+PHASES = {0: "unknown", 1: "menstrual", 2: "follicular", 3: "ovulation", 4: "luteal"}
+
+_profile_cache = {"mtime": None, "profile": None}
+_profile_lock = threading.Lock()
+
+
+# === CELLS ===
+
+def _cell_key(metric: str, weekday: int, hour: int, phase: int) -> str:
+    return f"{metric}|{weekday}|{hour}|{phase}"
+
+
+class Cell:
+    """Count, mean, variance and quantile sketch for one cube cell."""
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0, sketch: list = None):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.sketch = QuantileSketch.from_state(sketch or [], SKETCH_BINS)
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        self.sketch.add(value)
+
+    def merge(self, other: "Cell"):
+        """Combine with another cell (Chan et al. parallel variance)."""
+        if not other.n:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta * delta * self.n * other.n / n
+        self.n = n
+        self.sketch.merge(other.sketch)
+
+    def state(self) -> list:
+        return [self.n, self.mean, self.m2, self.sketch.state()]
+
+    def result(self) -> dict:
+        if not self.n:
+            return {"count": 0}
+        result = {
+            "count": self.n,
+            "mean": round(self.mean, 1),
+            "sd": round((self.m2 / (self.n - 1)) ** 0.5, 1) if self.n > 1 else None,
+        }
+        for p in PERCENTILES:
+            result[f"p{p}"] = round(self.sketch.quantile(p / 100), 1)
+        return result
+
+
+# === BUILDING ===
+
+def _utc_offset(endpoints: dict):
+    """The day's UTC offset from Garmin's paired GMT/local timestamps, if present."""
+    stress = endpoints.get("get_all_day_stress") or {}
+    try:
+        local = datetime.fromisoformat(stress["startTimestampLocal"])
+        gmt = datetime.fromisoformat(stress["startTimestampGMT"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return local - gmt
+
+
+def fold_day(cells: dict, data: dict) -> int:
+    """Add one archived day's intraday readings to the cells. Returns readings added."""
+    endpoints = data.get("endpoints") or {}
+    cycle = endpoints.get("get_menstrual_data_for_date") or {}
+    phase = (cycle.get("daySummary") or {}).get("currentPhase")
+    phase = phase if phase in PHASES else 0
+    offset = _utc_offset(endpoints)
+
+    added = 0
+    for metric in METRICS:
+        for entry in (data.get("intraday") or {}).get(metric) or []:
+            # Garmin uses -1/-2 for "no reading" in the stress array
+            if len(entry) < 2 or entry[0] is None or entry[1] is None or entry[1] < 0:
+                continue
+            if offset is None:
+                local = datetime.fromtimestamp(entry[0] / 1000)
+            else:
+                local = datetime.fromtimestamp(entry[0] / 1000, timezone.utc).replace(tzinfo=None) + offset
+            key = _cell_key(metric, local.weekday(), local.hour, phase)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = Cell()
+            cell.add(float(entry[1]))
+            added += 1
+    return added
+
+
+def _load_cube() -> dict:
+    if not PROFILE_FILE.exists():
+        return {"days": {}, "cells": {}, "readings": 0}
+    with open(PROFILE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def update_profile(full: bool = False, today: date = None) -> dict:
+    """
+    Fold newly settled archived days into the cube and save it. Rebuilds
+    from scratch with `full`, or if a day already folded in has changed.
+    Returns {"folded", "readings", "rebuilt"}.
+    """
+    cutoff = ((today or date.today()) - timedelta(days=SETTLE_DAYS - 1)).isoformat()
+    cube = {"days": {}, "cells": {}, "readings": 0} if full else _load_cube()
+
+    # Which settled days are new, and has anything already folded changed?
+    pending = {}
+    for month in archived_months():
+        for date_str, entry in load_index(month)["days"].items():
+            if date_str >= cutoff:
+                continue
+            folded = cube["days"].get(date_str)
+            if folded is None:
+                pending[date_str] = entry["sha"]
+            elif folded != entry["sha"]:
+                return update_profile(full=True, today=today)
+
+    if not pending and not full:
+        return {"folded": 0, "readings": 0, "rebuilt": False}
+
+    cells = {key: Cell(*state) for key, state in cube["cells"].items()}
+    readings = 0
+    if pending:
+        for data in iter_days(min(pending), max(pending)):
+            if data.get("date") in pending:
+                readings += fold_day(cells, data)
+                cube["days"][data["date"]] = pending[data["date"]]
+
+    cube["cells"] = {key: cell.state() for key, cell in cells.items()}
+    cube["readings"] = cube.get("readings", 0) + readings
+    cube["built_at"] = datetime.now().isoformat(timespec="seconds")
+
+    PROFILE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    # Per writer, so the daemon and a manual run saving at once don't share a temp file
+    tmp = PROFILE_FILE.with_name(f".{PROFILE_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cube, f, separators=(",", ":"), sort_keys=True)
+    os.replace(tmp, PROFILE_FILE)
+    return {"folded": len(pending), "readings": readings, "rebuilt": full}
+
+
+# === QUERIES ===
+
+def load_profile():
+    """The cube, re-read only when the file changes."""
+    try:
+        mtime = PROFILE_FILE.stat().st_mtime
+    except OSError:
+        return None
+    with _profile_lock:
+        if _profile_cache["mtime"] != mtime:
+            cube = _load_cube()
+            # Index the cells by metric once, so a query only walks its own
+            by_metric = {}
+            for key, state in cube["cells"].items():
+                metric, weekday, hour, phase = key.split("|")
+                by_metric.setdefault(metric, []).append((int(weekday), int(hour), int(phase), state))
+            cube["by_metric"] = by_metric
+            _profile_cache["profile"] = cube
+            _profile_cache["mtime"] = mtime
+        return _profile_cache["profile"]
+
+
+def _weekday_filter(weekday) -> set:
+    if weekday is None or weekday == "":
+        return set(range(7))
+    if isinstance(weekday, int):
+        return {weekday % 7}
+    wanted = str(weekday).lower()
+    if wanted == "weekdays":
+        return set(range(5))
+    if wanted == "weekends":
+        return {5, 6}
+    if wanted[:3] in WEEKDAYS:
+        return {WEEKDAYS.index(wanted[:3])}
+    raise ValueError(f"Unknown weekday: {weekday} (use a day name, weekdays or weekends)")
+
+
+def _phase_filter(phase) -> set:
+    if phase is None or phase == "":
+        return set(PHASES)
+    if isinstance(phase, int) or str(phase).isdigit():
+        return {int(phase)}
+    for number, name in PHASES.items():
+        if name.startswith(str(phase).lower()):
+            return {number}
+    raise ValueError(f"Unknown cycle phase: {phase} (use {', '.join(PHASES.values())})")
+
+
+def query(metric: str, hour: int = None, weekday=None, phase=None) -> dict:
+    """
+    Merge the matching cells. Without an hour, also returns the 24-hour
+    profile. Cost is the number of cells, whatever the length of history.
+    """
+    cube = load_profile()
+    if cube is None:
+        return {"error": "No profile built yet. Run: python garmin_profile.py"}
+    if metric not in METRICS:
+        return {"error": f"Unknown metric: {metric} (use {', '.join(METRICS)})"}
+
+    weekdays, phases = _weekday_filter(weekday), _phase_filter(phase)
+    overall = Cell()
+    hours = {}
+    for cell_weekday, cell_hour, cell_phase, state in cube["by_metric"].get(metric, []):
+        if cell_weekday not in weekdays or cell_phase not in phases:
+            continue
+        if hour is not None and cell_hour != hour:
+            continue
+        cell = Cell(*state)
+        hours.setdefault(cell_hour, Cell()).merge(cell)
+        overall.merge(cell)
+
+    result = {
+        "metric": metric,
+        "hour": hour,
+        "weekday": weekday or "any",
+        "phase": phase or "any",
+        "days": len(cube["days"]),
+        "history": f"{min(cube['days'])} to {max(cube['days'])}" if cube["days"] else None,
+        "built_at": cube.get("built_at"),
+        "overall": overall.result(),
+    }
+    if hour is None:
+        result["by_hour"] = [{"hour": h, **hours[h].result()} for h in sorted(hours)]
+    return result
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
+        hour = int(args[1]) if len(args) > 1 and args[1].isdigit() else None
+        rest = args[2:] if hour is not None else args[1:]
+        result = query(args[0], hour, rest[0] if rest else None, rest[1] if len(rest) > 1 else None)
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=" * 50)
+    print("HOUR-OF-DAY PROFILES")
+    print("=" * 50)
+
+    started = datetime.now()
+    stats = update_profile(full="--full" in sys.argv)
+    seconds = (datetime.now() - started).total_seconds()
+    cube = load_profile()
+    print(f"\n{'Rebuilt' if stats['rebuilt'] else 'Updated'}: {stats['folded']} days folded in, "
+          f"{stats['readings']} readings, in {seconds:.2f}s")
+    print(f"{len(cube['days'])} days, {len(cube['cells'])} cells -> {PROFILE_FILE}")
+    print("\nEmbers Remember.")
+
+
+if __name__ == "__main__":
+    main()
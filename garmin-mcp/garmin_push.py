@@ -0,0 +1,435 @@
+"""
+Push receiver for Garmin Health API notifications
+Instead of asking Garmin every few minutes, let Garmin tell us: the Health
+API POSTs each new summary to a registered URL the moment it's published.
+This takes those pushes - dailies, stressDetails and sleeps - and files
+them under garmin/data/push/, with no polling traffic at all.
+
+- Replies straight away (Garmin wants a fast 200) and leaves the writing to
+  one ingest thread behind a bounded queue. When the queue is full it
+  answers 503 with Retry-After, and Garmin resends later.
+- Dedupes by summaryId: a resend of the same summary is dropped, an
+  updated one (same id, new content) replaces it.
+- A pushed daily or stress summary for today refreshes snapshot.json, so
+  check_fox answers with it at once.
+
+Only today's snapshot uses what's pushed. Everything else - sleeps, and
+summaries for any other day - is filed in push/ as a record and read by
+nothing: it doesn't go into the raw archive, Health Logs, companion memory
+or fetch_day. The Health API's summaries aren't the Connect responses
+those are built from, so the regular sync still writes them.
+
+Garmin needs an https URL it can reach - put this behind a tunnel or
+reverse proxy. Set GARMIN_PUSH_TOKEN and add ?token=... to the registered
+URL (or send a bearer token) to keep strangers out.
+
+Usage:
+    python garmin_push.py                               # receive on 127.0.0.1:8790
+    python garmin_push.py --port 8790 --host 0.0.0.0
+    python garmin_push.py --send http://127.0.0.1:8790 --days 3    # stand-in sender
+    python garmin_push.py --stats
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from garmin_json import dumps, dumps_bytes, loads
+from garmin_paths import GARMIN_DATA_PATH
+from garmin_snapshot import read_snapshot, write_snapshot
+
+
+PUSH_PATH = Path(os.environ.get("GARMIN_PUSH_PATH", str(GARMIN_DATA_PATH / "push")))
+PUSH_TOKEN = os.environ.get("GARMIN_PUSH_TOKEN", "")
+PUSH_HOST = os.environ.get("GARMIN_PUSH_HOST", "127.0.0.1")
+PUSH_PORT = int(os.environ.get("GARMIN_PUSH_PORT", "8790"))
+
+PUSH_QUEUE_MAX = int(os.environ.get("GARMIN_PUSH_QUEUE", "64"))   # notifications waiting to be written
+PUSH_MAX_BYTES = 16 * 1024 * 1024
+RETRY_AFTER = 30             # seconds Garmin is told to wait when we're busy
+INGEST_BATCH = 50            # notifications written per pass
+
+# Summary lists a notification can carry; anything else is acknowledged and ignored
+KINDS = ("dailies", "stressDetails", "sleeps")
+
+
+# === STORE ===
+
+class PushStore:
+    """
+    Pushed summaries, appended to push/YYYY-MM.jsonl, with push/seen.json
+    mapping each summaryId to a digest of the copy we hold. Written by the
+    ingest thread only.
+
+    The newest summary of each kind per day is kept in memory, filled from
+    a month's file the first time that month is asked for.
+    """
+
+    def __init__(self, path: Path = None):
+        self.path = Path(path or PUSH_PATH)
+        self.seen_file = self.path / "seen.json"
+        try:
+            with open(self.seen_file, 'r', encoding='utf-8') as f:
+                self.seen = json.load(f)
+        except (OSError, ValueError):
+            self.seen = {}
+        self.newest = {}          # (kind, calendarDate) -> summary
+        self.loaded_months = set()
+
+    def _load_month(self, month: str):
+        try:
+            with open(self.path / f"{month}.jsonl", 'rb') as f:
+                for line in f:
+                    try:
+                        record = loads(line)
+                    except ValueError:
+                        continue
+                    self.newest[(record.get("kind"), record.get("calendarDate"))] = record["summary"]
+        except OSError:
+            pass
+        self.loaded_months.add(month)
+
+    def latest(self, kind: str, day: str):
+        """The newest pushed summary of a kind for a day, or None."""
+        if day[:7] not in self.loaded_months:
+            self._load_month(day[:7])
+        return self.newest.get((kind, day))
+
+    @staticmethod
+    def key(kind: str, summary: dict) -> str:
+        summary_id = summary.get("summaryId")
+        if not summary_id:
+            summary_id = f"{summary.get('calendarDate')}:{summary.get('startTimeInSeconds')}"
+        return f"{kind}:{summary_id}"
+
+    def add(self, items: list) -> dict:
+        """
+        File a batch of (kind, summary). Returns {"new", "updated", "duplicate",
+        "stored"} where stored is the list of (kind, summary) actually written.
+        """
+        counts = {"new": 0, "updated": 0, "duplicate": 0}
+        by_month = {}
+        stored = []
+        received = datetime.now().isoformat(timespec="seconds")
+        for kind, summary in items:
+            key = self.key(kind, summary)
+            digest = hashlib.sha256(json.dumps(summary, sort_keys=True, default=str).encode()).hexdigest()[:16]
+            if self.seen.get(key) == digest:
+                counts["duplicate"] += 1
+                continue
+            counts["updated" if key in self.seen else "new"] += 1
+            self.seen[key] = digest
+            day = str(summary.get("calendarDate") or date.today().isoformat())
+            record = {"kind": kind, "key": key, "calendarDate": day, "received": received, "summary": summary}
+            by_month.setdefault(day[:7], []).append(record)
+            stored.append((kind, summary))
+
+        if by_month:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for month, records in by_month.items():
+                with open(self.path / f"{month}.jsonl", 'ab') as f:
+                    f.write(b"".join(dumps_bytes(r) + b"\n" for r in records))
+                if month in self.loaded_months:
+                    self.newest.update(((r["kind"], r["calendarDate"]), r["summary"]) for r in records)
+            tmp = self.seen_file.with_suffix(".tmp")
+            with open(tmp, 'wb') as f:
+                f.write(dumps_bytes(self.seen))
+            os.replace(tmp, self.seen_file)
+        counts["stored"] = stored
+        return counts
+
+
+def refresh_snapshot(stored: list, store: PushStore):
+    """
+    Fold today's pushed daily/stress summaries into snapshot.json. Pushed
+    values are laid over today's existing snapshot, so a field a push
+    doesn't carry (a stress-only push has no HR) keeps the value it had.
+    Without a pushed daily or a snapshot for today there's nothing to lay
+    the stress over, and the snapshot is left alone.
+    """
+    today = date.today().isoformat()
+    kinds = {kind for kind, summary in stored if summary.get("calendarDate") == today}
+    if not kinds & {"dailies", "stressDetails"}:
+        return False
+
+    daily = store.latest("dailies", today)
+    stress = store.latest("stressDetails", today) or {}
+    previous = read_snapshot() or {}
+    if previous.get("date") != today:
+        previous = {}
+    if daily is None and not previous:
+        return False
+    daily = daily or {}
+    levels = stress.get("timeOffsetBodyBatteryValues") or {}
+
+    pushed = {
+        "heart_rate": {"resting": daily.get("restingHeartRateInBeatsPerMinute"),
+                       "max": daily.get("maxHeartRateInBeatsPerMinute"),
+                       "min": daily.get("minHeartRateInBeatsPerMinute")},
+        "stress": {"avg": daily.get("averageStressLevel"), "max": daily.get("maxStressLevel")},
+        "body_battery": {"charged": daily.get("bodyBatteryChargedValue"),
+                         "drained": daily.get("bodyBatteryDrainedValue"),
+                         "latest": levels[max(levels, key=int)] if levels else None},
+    }
+    result = {"timestamp": datetime.now().isoformat(), "date": today}
+    for section, values in pushed.items():
+        kept = previous.get(section) if isinstance(previous.get(section), dict) else {}
+        result[section] = {key: kept.get(key) if value is None else value for key, value in values.items()}
+    result["pushed"] = True
+    if "hrv" in previous:
+        result["hrv"] = previous["hrv"]
+    shown = lambda v: "?" if v is None else v
+    result["summary"] = (f"HR {shown(result['heart_rate']['resting'])}bpm | Stress {shown(result['stress']['avg'])} | "
+                         f"BB +{shown(result['body_battery']['charged'])}/-{shown(result['body_battery']['drained'])}")
+    write_snapshot(result)
+    return True
+
+
+# === RECEIVER ===
+
+class PushReceiver(ThreadingHTTPServer):
+    """
+    POST any path with a Health API notification body ({"dailies": [...]}
+    etc.). GET /stats returns counters. Call start() to run the ingest
+    thread and serve.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = PUSH_HOST, port: int = PUSH_PORT, store: PushStore = None,
+                 queue_max: int = PUSH_QUEUE_MAX, token: str = PUSH_TOKEN):
+        super().__init__((host, port), _PushHandler)
+        self.store = store or PushStore()
+        self.token = token
+        self.pending = queue.Queue(maxsize=queue_max)
+        self.lock = threading.Lock()
+        self.stats = {"notifications": 0, "summaries": 0, "new": 0, "updated": 0, "duplicate": 0,
+                      "ignored": 0, "busy": 0, "rejected": 0, "snapshot_refreshes": 0}
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, **amounts):
+        with self.lock:
+            for key, amount in amounts.items():
+                self.stats[key] += amount
+
+    def ingest_forever(self):
+        """Drain the queue into the store, a batch at a time."""
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < INGEST_BATCH:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            items = [item for notification in batch for item in notification]
+            try:
+                counts = self.store.add(items)
+                refreshed = refresh_snapshot(counts["stored"], self.store)
+                self.count(new=counts["new"], updated=counts["updated"], duplicate=counts["duplicate"],
+                           snapshot_refreshes=int(refreshed))
+            except Exception as e:
+                print(f"[garmin-push] ingest failed: {e}", file=sys.stderr)
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+
+    def start(self):
+        threading.Thread(target=self.ingest_forever, daemon=True).start()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _PushHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status: int, payload, headers: dict = None):
+        body = dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self, url) -> bool:
+        token = self.server.token
+        if not token:
+            return True
+        supplied = parse_qs(url.query).get("token", [""])[0]
+        bearer = self.headers.get("Authorization", "")
+        return (hmac.compare_digest(supplied.encode(), token.encode())
+                or hmac.compare_digest(bearer.encode(), f"Bearer {token}".encode()))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/stats" and self._authorized(url):
+            with self.server.lock:
+                return self._reply(200, dict(self.server.stats, queued=self.server.pending.qsize()))
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        server = self.server
+        url = urlparse(self.path)
+        # Anything refused here leaves the body unread, so the connection can't be reused
+        if not self._authorized(url):
+            server.count(rejected=1)
+            self.close_connection = True
+            return self._reply(401, {"error": "unauthorized"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            server.count(rejected=1)
+            self.close_connection = True
+            return self._reply(400, {"error": "bad Content-Length"})
+        if length > PUSH_MAX_BYTES:
+            server.count(rejected=1)
+            self.close_connection = True
+            return self._reply(413, {"error": "too large"})
+        raw = self.rfile.read(length)
+        try:
+            body = loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("expected an object")
+        except ValueError as e:
+            server.count(rejected=1)
+            return self._reply(400, {"error": f"bad JSON: {e}"})
+
+        items = [(kind, summary) for kind in KINDS for summary in body.get(kind) or []
+                 if isinstance(summary, dict)]
+        ignored = sum(len(v) for k, v in body.items() if k not in KINDS and isinstance(v, list))
+        if items:
+            try:
+                server.pending.put_nowait(items)
+            except queue.Full:
+                server.count(busy=1)
+                return self._reply(503, {"error": "busy, retry later"}, {"Retry-After": str(RETRY_AFTER)})
+        server.count(notifications=1, summaries=len(items), ignored=ignored)
+        self._reply(200, {"accepted": len(items), "ignored": ignored})
+
+
+# === STAND-IN SENDER ===
+
+def sample_notifications(day: str, rng: random.Random = None) -> list:
+    """One day's worth of Health API-style notifications, as Garmin would push them."""
+    rng = rng or random.Random(day)
+    start = int(datetime.fromisoformat(day).timestamp())
+    user = "stand-in-user"
+    daily = {
+        "userId": user, "summaryId": f"x-{start}-daily", "calendarDate": day,
+        "startTimeInSeconds": start, "durationInSeconds": 86400, "steps": rng.randint(2000, 9000),
+        "restingHeartRateInBeatsPerMinute": rng.randint(58, 66),
+        "minHeartRateInBeatsPerMinute": rng.randint(50, 57), "maxHeartRateInBeatsPerMinute": rng.randint(110, 150),
+        "averageStressLevel": rng.randint(25, 45), "maxStressLevel": rng.randint(70, 95),
+        "bodyBatteryChargedValue": rng.randint(30, 70), "bodyBatteryDrainedValue": rng.randint(30, 70),
+    }
+    level = rng.randint(40, 90)
+    battery, stress = {}, {}
+    for offset in range(0, 86400, 180):
+        level = max(5, min(100, level + rng.randint(-2, 1)))
+        battery[str(offset)] = level
+        stress[str(offset)] = rng.choice([-1, rng.randint(10, 80)])
+    stress_details = {
+        "userId": user, "summaryId": f"x-{start}-stress", "calendarDate": day,
+        "startTimeInSeconds": start, "durationInSeconds": 86400,
+        "timeOffsetStressLevelValues": stress, "timeOffsetBodyBatteryValues": battery,
+    }
+    sleep = {
+        "userId": user, "summaryId": f"x-{start}-sleep", "calendarDate": day,
+        "startTimeInSeconds": start - 3600 * 7, "durationInSeconds": rng.randint(5, 8) * 3600,
+        "deepSleepDurationInSeconds": rng.randint(3000, 6000), "lightSleepDurationInSeconds": rng.randint(9000, 14000),
+        "remSleepInSeconds": rng.randint(3000, 6000), "awakeDurationInSeconds": rng.randint(300, 1800),
+    }
+    return [{"dailies": [daily]}, {"stressDetails": [stress_details]}, {"sleeps": [sleep]}]
+
+
+def send(url: str, notification: dict, token: str = None, path: str = "/garmin/push") -> tuple:
+    """POST one notification. Returns (status, parsed reply)."""
+    import urllib.error
+    import urllib.request
+    request = urllib.request.Request(f"{url.rstrip('/')}{path}", data=dumps_bytes(notification), method="POST",
+                                     headers={"Content-Type": "application/json"})
+    if token:
+        request.add_header("Authorization", f"Bearer {token}")
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, loads(e.read() or b"{}")
+
+
+def send_days(url: str, days: int = 3, repeat: int = 2, token: str = None) -> dict:
+    """Push the last `days` days `repeat` times over - repeats should all come back as duplicates."""
+    statuses = {}
+    for _ in range(repeat):
+        for offset in range(days - 1, -1, -1):
+            day = (date.today() - timedelta(days=offset)).isoformat()
+            for notification in sample_notifications(day):
+                status, _ = send(url, notification, token)
+                statuses[status] = statuses.get(status, 0) + 1
+    return statuses
+
+
+def main():
+    args = sys.argv[1:]
+
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args and args.index(flag) + 1 < len(args) else default
+
+    if "--send" in args:
+        url = option("--send", f"http://127.0.0.1:{PUSH_PORT}")
+        statuses = send_days(url, int(option("--days", 3)), int(option("--repeat", 2)), PUSH_TOKEN or None)
+        print(f"Sent to {url}: " + ", ".join(f"{n} x {status}" for status, n in sorted(statuses.items())))
+        import urllib.request
+        stats_url = f"{url.rstrip('/')}/stats" + (f"?token={PUSH_TOKEN}" if PUSH_TOKEN else "")
+        with urllib.request.urlopen(stats_url, timeout=10) as response:
+            print(f"Receiver: {loads(response.read())}")
+        return
+
+    if "--stats" in args:
+        store = PushStore()
+        kinds = {}
+        for key in store.seen:
+            kind = key.split(":", 1)[0]
+            kinds[kind] = kinds.get(kind, 0) + 1
+        print(f"{len(store.seen)} summaries in {store.path}: " + (", ".join(f"{n} {k}" for k, n in kinds.items()) or "none"))
+        return
+
+    host, port = option("--host", PUSH_HOST), int(option("--port", PUSH_PORT))
+    if host not in ("127.0.0.1", "localhost") and not PUSH_TOKEN:
+        print(f"Refusing to listen on {host} without GARMIN_PUSH_TOKEN set")
+        return
+
+    print("=" * 50)
+    print("GARMIN PUSH RECEIVER")
+    print("=" * 50)
+    server = PushReceiver(host, port)
+    threading.Thread(target=server.ingest_forever, daemon=True).start()
+    print(f"\nListening on http://{host}:{port} -> {server.store.path} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.pending.join()
+        print(f"\n{server.stats}")
+        print("Embers Remember.")
+
+
+if __name__ == "__main__":
+    main()
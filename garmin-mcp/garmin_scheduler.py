@@ -0,0 +1,368 @@
+"""
+Scheduler daemon for the Garmin sync
+Replaces double-clicking sync.bat: runs garmin_sync on a cron-like cadence,
+catches up on days missed while the machine was asleep or off, and never
+overlaps another sync.
+
+Usage:
+    python garmin_sync.py --daemon
+    python garmin_sync.py --daemon --schedule "*/30 6-11 * * *" --jitter 120
+
+Schedule is standard 5-field cron (minute hour day-of-month month day-of-week),
+with *, lists, ranges and */steps; join several with |. Default: every 30
+minutes from 6am to noon, then hourly until 10pm - Garmin publishes last
+night's data whenever the watch next syncs, which is usually some time in
+the morning.
+
+Days go through the same writers as a manual sync (archive, Health Logs,
+companion memory), and each run also refreshes today's snapshot.json from
+the daily summary, so quick_check and check_fox see it without going live.
+Each run appends a line to sync-runs.jsonl in GARMIN_DATA_PATH with timing
+and per-day results.
+"""
+
+import json
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import garmin_endpoints
+from garmin_paths import GARMIN_DATA_PATH
+from garmin_perf import capture
+from garmin_snapshot import snapshot_from_stats, write_snapshot
+from garmin_sync import (
+    SyncLocked,
+    calculate_spoons,
+    fetch_health_data,
+    record_cycle,
+    save_raw_data,
+    sync_lock,
+    write_outputs,
+)
+from garmin_uplink import push_days
+
+
+DEFAULT_SCHEDULE = "*/30 6-11 * * * | 0 12-22 * * *"
+DEFAULT_JITTER = 300          # seconds of random delay added to each run
+MAX_CATCHUP_DAYS = 14         # how far back a catch-up run will reach
+TICK_SECONDS = 30             # how often the loop wakes to check the clock
+
+STATE_FILE = GARMIN_DATA_PATH / "scheduler-state.json"
+RUN_LOG = GARMIN_DATA_PATH / "sync-runs.jsonl"
+
+
+# === CRON ===
+
+# Day-of-week allows 7 as well as 0 for Sunday
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+def _parse_field(field: str, low: int, high: int) -> set:
+    values = set()
+    for part in field.split(","):
+        spec, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if spec == "*":
+            start, end = low, high
+        elif "-" in spec:
+            start, end = (int(x) for x in spec.split("-"))
+        else:
+            start = end = int(spec)
+            if step > 1:
+                end = high
+        if not (low <= start <= high and low <= end <= high):
+            raise ValueError(f"'{part}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    if high == 7:
+        values = {v % 7 for v in values}
+    return values
+
+
+def parse_cron(expr: str) -> list:
+    """Parse one or more 5-field cron expressions joined with |."""
+    schedules = []
+    for single in expr.split("|"):
+        fields = single.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron needs 5 fields, got {len(fields)}: '{single}'")
+        parsed = [_parse_field(f, lo, hi) for f, (lo, hi) in zip(fields, FIELD_RANGES)]
+        parsed.append((fields[2] != "*", fields[4] != "*"))
+        schedules.append(parsed)
+    return schedules
+
+
+def _matches_day(schedule: list, day: datetime) -> bool:
+    _, _, doms, months, dows, (dom_set, dow_set) = schedule
+    if day.month not in months:
+        return False
+    dom_ok = day.day in doms
+    dow_ok = (day.weekday() + 1) % 7 in dows   # cron: Sunday = 0
+    if dom_set and dow_set:
+        return dom_ok or dow_ok                # cron ORs them when both are restricted
+    return dom_ok and dow_ok
+
+
+def next_fire(schedules: list, after: datetime) -> datetime:
+    """First minute strictly after `after` that any of the schedules matches."""
+    best = None
+    for schedule in schedules:
+        minutes, hours = schedule[0], schedule[1]
+        candidate = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if not _matches_day(schedule, candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            break
+        if best is None or candidate < best:
+            best = candidate
+    return best
+
+
+# === STATE + REPORTING ===
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict):
+    tmp = STATE_FILE.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(STATE_FILE)
+
+
+def log_run(report: dict):
+    with open(RUN_LOG, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report) + '\n')
+
+
+def days_to_sync(state: dict, today: date = None) -> list:
+    """
+    Yesterday always (Garmin keeps filling it in through the morning), plus
+    any days since the last complete sync - capped at MAX_CATCHUP_DAYS.
+    """
+    today = today or date.today()
+    yesterday = today - timedelta(days=1)
+    first = yesterday
+    if state.get("last_complete_day"):
+        last = date.fromisoformat(state["last_complete_day"])
+        first = min(yesterday, last + timedelta(days=1))
+    first = max(first, today - timedelta(days=MAX_CATCHUP_DAYS))
+    return [first + timedelta(days=i) for i in range((yesterday - first).days + 1)]
+
+
+# === RUNS ===
+
+def sync_day(client, target: date, changed: list) -> str:
+    """
+    Fetch one day and write its outputs the way a manual sync does - the
+    archive (and GARMIN_RAW_JSON copy), then Health Logs and companion
+    memory only if Garmin's data actually changed. Changed days are added
+    to `changed` as (data, spoons) for the dashboard push.
+    """
+    quiet = lambda message: None
+    data = fetch_health_data(client, target, log=quiet)
+    if not data["metrics"]:
+        return "empty"
+    archived = {data["date"]} if save_raw_data(data, log=quiet) else set()
+    record_cycle(data)
+
+    written = write_outputs([(data, calculate_spoons(data))], archived, log=quiet, push=False)
+    changed.extend(written)
+    return "updated" if written else "unchanged"
+
+
+def refresh_snapshot(client) -> str:
+    """
+    Write today's snapshot from the daily summary and HRV, so quick_check
+    and check_fox see the daemon's runs - the synced days are all past.
+    """
+    today = date.today().isoformat()
+    budget = garmin_endpoints.DEFAULT_BUDGET
+    try:
+        if budget:
+            budget.acquire()
+        stats = client.get_stats(today)
+        if not stats:
+            return "no data yet"
+        if budget:
+            budget.acquire()
+        hrv = (client.get_hrv_data(today) or {}).get("hrvSummary") or {}
+        write_snapshot(snapshot_from_stats(stats, hrv, today))
+        return "written"
+    except Exception as e:
+        return f"error: {e}"
+
+
+def refresh_correlations() -> str:
+    """Rebuild the biometric/emotion correlations after new data (skipped without numpy)."""
+    try:
+        from garmin_correlations import build, np
+        if np is None:
+            return "skipped: numpy not installed"
+        return f"{len(build()['pairs'])} pairs"
+    except Exception as e:
+        return f"error: {e}"
+
+
+def refresh_profile() -> str:
+    """Fold newly settled days into the hour-of-day profile cube."""
+    try:
+        from garmin_profile import update_profile
+        stats = update_profile()
+        return f"{stats['folded']} days folded" + (" (rebuilt)" if stats["rebuilt"] else "")
+    except Exception as e:
+        return f"error: {e}"
+
+
+def run_once(client_factory, trigger: str) -> dict:
+    """One scheduled run under the sync lock. Returns the run report."""
+    state = load_state()
+    started = time.monotonic()
+    report = {
+        "started": datetime.now().isoformat(timespec="seconds"),
+        "trigger": trigger,
+        "days": {},
+    }
+
+    perf = {}
+    try:
+        with sync_lock(), capture("sync") as perf:
+            client = client_factory()
+            changed = []
+            for target in days_to_sync(state):
+                day_started = time.monotonic()
+                try:
+                    outcome = sync_day(client, target, changed)
+                except Exception as e:
+                    outcome = f"error: {e}"
+                report["days"][target.isoformat()] = {
+                    "result": outcome,
+                    "seconds": round(time.monotonic() - day_started, 2),
+                }
+
+            # Advance only through an unbroken run of days that synced with
+            # data, so catch-up keeps retrying anything missing or failed
+            for day, result in report["days"].items():
+                if result["result"] not in ("updated", "unchanged"):
+                    break
+                state["last_complete_day"] = max(day, state.get("last_complete_day", ""))
+
+            report["snapshot"] = refresh_snapshot(client)
+            # Also drains anything queued from earlier outages
+            report["push"] = push_days(changed)
+            if changed:
+                report["correlations"] = refresh_correlations()
+            # Days settle a day or two after they last changed, so check every run
+            report["profile"] = refresh_profile()
+            report["status"] = "ok"
+    except SyncLocked as e:
+        report["status"] = f"skipped: {e}"
+    except Exception as e:
+        report["status"] = f"error: {e}"
+
+    report["seconds"] = round(time.monotonic() - started, 2)
+    if perf:
+        report["perf"] = perf["files"][1]
+    state["last_run"] = report["started"]
+    state["last_status"] = report["status"]
+    save_state(state)
+    log_run(report)
+    return report
+
+
+def _print_report(report: dict):
+    days = ", ".join(f"{d} {r['result']}" for d, r in report["days"].items()) or "no days"
+    print(f"[{report['started']}] {report['trigger']}: {report['status']} in {report['seconds']}s ({days})")
+
+
+def run_daemon(schedule: str = DEFAULT_SCHEDULE, jitter: int = DEFAULT_JITTER):
+    """
+    Run forever on the given schedule.
+
+    Fire times are worked out on the wall clock and checked every
+    TICK_SECONDS, so if the machine sleeps through one or more runs the
+    loop notices on wake and does a single catch-up run instead of a burst.
+    """
+    from garmin_sync import TOKEN_STORE
+    schedules = parse_cron(schedule)
+    client = None
+
+    def client_factory():
+        nonlocal client
+        if client is None:
+            from garminconnect import Garmin
+            fresh = Garmin()
+            fresh.login(str(TOKEN_STORE))
+            client = fresh
+        return client
+
+    def reset_client_on_error(report: dict):
+        nonlocal client
+        if report["status"].startswith("error") or any(
+            r["result"].startswith("error") for r in report["days"].values()
+        ):
+            client = None
+
+    print(f"Schedule: {schedule} (jitter up to {jitter}s)")
+    report = run_once(client_factory, "startup")
+    _print_report(report)
+    reset_client_on_error(report)
+
+    fire_at = next_fire(schedules, datetime.now()) + timedelta(seconds=random.uniform(0, jitter))
+    print(f"Next run: {fire_at:%Y-%m-%d %H:%M:%S}")
+
+    while True:
+        time.sleep(TICK_SECONDS)
+        now = datetime.now()
+        if now < fire_at:
+            continue
+
+        late = (now - fire_at).total_seconds()
+        trigger = "catch-up" if late > 2 * TICK_SECONDS else "scheduled"
+        report = run_once(client_factory, trigger)
+        _print_report(report)
+        reset_client_on_error(report)
+
+        fire_at = next_fire(schedules, datetime.now()) + timedelta(seconds=random.uniform(0, jitter))
+        print(f"Next run: {fire_at:%Y-%m-%d %H:%M:%S}")
+
+
+def main():
+    print("=" * 50)
+    print("GARMIN SYNC DAEMON")
+    print("=" * 50)
+
+    args = sys.argv[1:]
+    schedule, jitter = DEFAULT_SCHEDULE, DEFAULT_JITTER
+    try:
+        if "--schedule" in args:
+            schedule = args[args.index("--schedule") + 1]
+        if "--jitter" in args:
+            jitter = int(args[args.index("--jitter") + 1])
+        parse_cron(schedule)
+    except (IndexError, ValueError) as e:
+        print(f"Bad schedule options: {e}")
+        return
+
+    try:
+        run_daemon(schedule, jitter)
+    except KeyboardInterrupt:
+        print("\nStopped.")
+        print("Embers Remember.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Local snapshot of Fox's latest biometrics
+Written whenever something fetches today's numbers live, read by anything
+that wants an answer without waiting on Garmin.
+
+Stdlib only - importing this must stay instant.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from garmin_paths import GARMIN_DATA_PATH
+
+
+SNAPSHOT_PATH = Path(os.environ.get("GARMIN_SNAPSHOT_PATH", str(GARMIN_DATA_PATH / "snapshot.json")))
+
+# How old a snapshot can be (seconds) before callers should go live instead
+SNAPSHOT_MAX_AGE = int(os.environ.get("GARMIN_SNAPSHOT_MAX_AGE", "600"))
+
+
+def write_snapshot(result: dict, path: Path = None) -> Path:
+    """Save a check_fox-style result as the current snapshot (atomic)."""
+    path = Path(path or SNAPSHOT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = dict(result, snapshot_at=time.time())
+    # Per writer, so rooms and threads saving at once don't share a temp file
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+    os.replace(tmp, path)
+    return path
+
+
+def read_snapshot(path: Path = None):
+    """Load the snapshot, or None if there isn't a readable one."""
+    try:
+        with open(Path(path or SNAPSHOT_PATH), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def snapshot_age(snapshot: dict) -> float:
+    """Seconds since the snapshot was taken."""
+    return time.time() - snapshot.get("snapshot_at", 0)
+
+
+def is_fresh(snapshot, max_age: float = None) -> bool:
+    """True if the snapshot is for today and younger than max_age seconds."""
+    if not snapshot or snapshot.get("date") != date.today().strftime("%Y-%m-%d"):
+        return False
+    return snapshot_age(snapshot) <= (SNAPSHOT_MAX_AGE if max_age is None else max_age)
+
+
+def snapshot_from_day(data: dict) -> dict:
+    """check_fox-shaped snapshot from a garmin_sync day record (fetch_health_data)."""
+    metrics = data.get("metrics") or {}
+    hr = metrics.get("heart_rate") or {}
+    stress = metrics.get("stress") or {}
+    bb = metrics.get("body_battery") or {}
+    hrv = metrics.get("hrv") or {}
+    levels = [entry[1] for entry in (data.get("intraday") or {}).get("body_battery") or []
+              if len(entry) >= 2 and entry[1] is not None]
+
+    result = {
+        "timestamp": data.get("fetched_at"),
+        "date": data["date"],
+        "heart_rate": {"resting": hr.get("resting"), "max": hr.get("max"), "min": hr.get("min")},
+        "stress": {"avg": stress.get("avg"), "max": stress.get("max")},
+        "body_battery": {"charged": bb.get("charged"), "drained": bb.get("drained"),
+                         "latest": levels[-1] if levels else None},
+    }
+    if "last_night" in hrv:
+        result["hrv"] = {"last_night": hrv.get("last_night"), "weekly_avg": hrv.get("weekly_avg"),
+                         "status": hrv.get("status")}
+    shown = lambda v: "?" if v is None else v
+    result["summary"] = (f"HR {shown(hr.get('resting'))}bpm | Stress {shown(stress.get('avg'))} | "
+                         f"BB +{shown(bb.get('charged'))}/-{shown(bb.get('drained'))}")
+    return result
+
+
+def snapshot_from_stats(stats: dict, hrv: dict, day: str) -> dict:
+    """check_fox-shaped snapshot from Garmin's daily summary (get_stats) and HRV summary."""
+    result = {
+        "timestamp": datetime.now().isoformat(),
+        "date": day,
+        "heart_rate": {
+            "resting": stats.get("restingHeartRate"),
+            "max": stats.get("maxHeartRate"),
+            "min": stats.get("minHeartRate"),
+        },
+        "stress": {"avg": stats.get("averageStressLevel"), "max": stats.get("maxStressLevel")},
+        "body_battery": {
+            "charged": stats.get("bodyBatteryChargedValue"),
+            "drained": stats.get("bodyBatteryDrainedValue"),
+            "latest": stats.get("bodyBatteryMostRecentValue"),
+        },
+    }
+    if hrv:
+        result["hrv"] = {"last_night": hrv.get("lastNight"), "weekly_avg": hrv.get("weeklyAvg"),
+                         "status": hrv.get("status")}
+    shown = lambda v: "?" if v is None else v
+    hr, stress, bb = result["heart_rate"], result["stress"], result["body_battery"]
+    result["summary"] = (f"HR {shown(hr['resting'])}bpm | Stress {shown(stress['avg'])} | "
+                         f"BB +{shown(bb['charged'])}/-{shown(bb['drained'])}")
+    return result
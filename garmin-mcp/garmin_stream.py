@@ -0,0 +1,191 @@
+"""
+Running aggregates for long histories
+Days are fed through one at a time and only the aggregates are kept, so a
+multi-year history costs the same memory, and gives the same size answer,
+as a week.
+
+Per metric: count, mean, spread, min/max, percentiles from a fixed-size
+sketch, and a least-squares trend. Stdlib only - the MCP server uses it.
+
+Usage:
+    summary = StreamSummary(["resting_hr", "stress_avg"])
+    for row in rows:                # any iterable of {"date": ..., metric: value}
+        summary.add(row)
+    summary.result()
+"""
+
+import math
+from bisect import bisect_left
+from datetime import date
+
+SKETCH_BINS = 32
+PERCENTILES = (10, 50, 90)
+
+
+class QuantileSketch:
+    """
+    Streaming histogram (Ben-Haim & Tom-Tov): at most `bins` centroids,
+    merging the closest pair when a new value doesn't fit. Exact while there
+    are no more distinct values than bins - which covers most Garmin metrics
+    over a few weeks - and close after that.
+    """
+
+    def __init__(self, bins: int = SKETCH_BINS):
+        self.max_bins = bins
+        self.values = []     # centroid values, sorted
+        self.counts = []
+        self.n = 0
+
+    def add(self, x: float, count: int = 1):
+        self.n += count
+        i = bisect_left(self.values, x)
+        if i < len(self.values) and self.values[i] == x:
+            self.counts[i] += count
+            return
+        self.values.insert(i, x)
+        self.counts.insert(i, count)
+        self._shrink()
+
+    def _shrink(self):
+        while len(self.values) > self.max_bins:
+            gaps = [self.values[j + 1] - self.values[j] for j in range(len(self.values) - 1)]
+            j = gaps.index(min(gaps))
+            c = self.counts[j] + self.counts[j + 1]
+            self.values[j] = (self.values[j] * self.counts[j] + self.values[j + 1] * self.counts[j + 1]) / c
+            self.counts[j] = c
+            del self.values[j + 1], self.counts[j + 1]
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch's centroids into this one."""
+        for value, count in zip(other.values, other.counts):
+            self.add(value, count)
+
+    def state(self) -> list:
+        """[[value, count], ...] - JSON-friendly, see from_state."""
+        return [[value, count] for value, count in zip(self.values, self.counts)]
+
+    @classmethod
+    def from_state(cls, state: list, bins: int = SKETCH_BINS) -> "QuantileSketch":
+        sketch = cls(bins)
+        sketch.values = [value for value, _ in state]
+        sketch.counts = [count for _, count in state]
+        sketch.n = sum(sketch.counts)
+        return sketch
+
+    def quantile(self, q: float):
+        """Value below which a fraction `q` of what was added falls."""
+        if not self.n:
+            return None
+        # Each centroid's mass sits at its value; interpolate between the
+        # midpoints of neighbouring centroids' cumulative counts
+        target = q * self.n
+        cumulative = 0.0
+        previous = None
+        for value, count in zip(self.values, self.counts):
+            mid = cumulative + count / 2
+            if target <= mid:
+                if previous is None:
+                    return value
+                p_mid, p_value = previous
+                return p_value + (value - p_value) * (target - p_mid) / (mid - p_mid)
+            previous = (mid, value)
+            cumulative += count
+        return self.values[-1]
+
+
+class RunningMetric:
+    """Count, mean, variance (Welford), min/max, percentiles and trend for one metric."""
+
+    def __init__(self, bins: int = SKETCH_BINS):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.latest = None
+        self.sketch = QuantileSketch(bins)
+        # Sums for the least-squares slope against day number
+        self._sx = self._sy = self._sxx = self._sxy = 0.0
+        self._x0 = None
+
+    def add(self, value: float, day: int):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.latest = value
+        self.sketch.add(value)
+
+        # Offset from the first day keeps the sums small over long ranges
+        if self._x0 is None:
+            self._x0 = day
+        x = day - self._x0
+        self._sx += x
+        self._sy += value
+        self._sxx += x * x
+        self._sxy += x * value
+
+    def slope(self):
+        """Least-squares change per day, or None with under two days."""
+        denominator = self.n * self._sxx - self._sx * self._sx
+        if self.n < 2 or denominator == 0:
+            return None
+        return (self.n * self._sxy - self._sx * self._sy) / denominator
+
+    def result(self) -> dict:
+        if not self.n:
+            return {"count": 0}
+        slope = self.slope()
+        result = {
+            "count": self.n,
+            "mean": round(self.mean, 1),
+            "sd": round(math.sqrt(self._m2 / (self.n - 1)), 1) if self.n > 1 else None,
+            "min": self.min,
+            "max": self.max,
+            "latest": self.latest,
+        }
+        for p in PERCENTILES:
+            result[f"p{p}"] = round(self.sketch.quantile(p / 100), 1)
+        result["trend_per_week"] = None if slope is None else round(slope * 7, 2)
+        return result
+
+
+class StreamSummary:
+    """Running aggregates over rows of {"date": "YYYY-MM-DD", metric: value, ...}."""
+
+    def __init__(self, metrics: list, bins: int = SKETCH_BINS):
+        self.metrics = {name: RunningMetric(bins) for name in metrics}
+        self.days = 0
+        self.days_with_data = 0
+        self.first = None
+        self.last = None
+
+    def add(self, row: dict):
+        self.days += 1
+        day = date.fromisoformat(row["date"]).toordinal()
+        self.first = self.first or row["date"]
+        self.last = row["date"]
+        seen = False
+        for name, metric in self.metrics.items():
+            value = row.get(name)
+            if value is not None:
+                metric.add(value, day)
+                seen = True
+        self.days_with_data += seen
+
+    def consume(self, rows):
+        """Feed an iterable through, yielding each row on so it can be chained."""
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def result(self) -> dict:
+        return {
+            "from": self.first,
+            "to": self.last,
+            "days": self.days,
+            "days_with_data": self.days_with_data,
+            "metrics": {name: metric.result() for name, metric in self.metrics.items()},
+        }
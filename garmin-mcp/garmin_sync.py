@@ -8,12 +8,27 @@ Built by Alex, January 7 2026
 My structure. Her data. Our infrastructure.
 """
 
-import json
+import hashlib
 import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from getpass import getpass
 
+from episodic_index import INDEX_FILE as MEMORY_INDEX_FILE
+from garmin_archive import day_ref, get_day, load_index, put_day as archive_day
+from garmin_cycle import record_day as record_cycle
+from garmin_endpoints import fetch_endpoints
+from garmin_json import dumps, dumps_bytes, loads
+from garmin_locks import file_lock
+from garmin_paths import GARMIN_DATA_PATH, HEALTH_LOGS_PATH, COMPANION_MEMORY_PATH
+from garmin_perf import capture
+from garmin_snapshot import snapshot_from_day, write_snapshot
+from garmin_uplink import BINARY_HOME_URL, push_days
+
 try:
     from garminconnect import Garmin
 except ImportError:
@@ -24,17 +39,78 @@ except ImportError:
 # === CONFIGURATION ===
 GARMIN_EMAIL = os.environ.get("GARMIN_EMAIL", "")
 GARMIN_PASSWORD = os.environ.get("GARMIN_PASSWORD", "")
-TOKEN_STORE = Path.home() / ".garminconnect"
+TOKEN_STORE = Path(os.environ.get("GARMIN_TOKEN_STORE", str(Path.home() / ".garminconnect")))
 
-# Output paths - UPDATE THESE TO YOUR PATHS
-HEALTH_LOGS_PATH = Path(os.environ.get("HEALTH_LOGS_PATH", str(Path.home() / "health-logs")))
-COMPANION_MEMORY_PATH = Path(os.environ.get("COMPANION_MEMORY_PATH", str(Path.home() / "companion-memory")))
-GARMIN_DATA_PATH = Path(os.environ.get("GARMIN_DATA_PATH", str(Path.home() / "garmin-data")))
+# Output paths (Health Logs, companion memory, garmin-data) are set in garmin_paths.py
+KEEP_RAW_JSON = os.environ.get("GARMIN_RAW_JSON", "") == "1"
 
 # Ensure directories exist
 HEALTH_LOGS_PATH.mkdir(parents=True, exist_ok=True)
 GARMIN_DATA_PATH.mkdir(parents=True, exist_ok=True)
 
+# Only one sync at a time - manual runs and the daemon share this lock
+SYNC_LOCK = GARMIN_DATA_PATH / ".sync.lock"
+LOCK_HEARTBEAT = 60                 # seconds between touches of a held lock
+LOCK_STALE_SECONDS = 10 * 60        # untouched this long = left behind by a run that died
+
+
+class SyncLocked(RuntimeError):
+    """Another sync run holds the lock."""
+
+
+@contextmanager
+def sync_lock(path: Path = None):
+    """
+    Hold the sync lock for the length of a run.
+
+    The lock is a file created exclusively, holding the owner's pid. While
+    it's held a background thread touches it every LOCK_HEARTBEAT seconds,
+    so a backfill keeps its lock however long it runs. A lock nobody has
+    touched for LOCK_STALE_SECONDS was left behind by a run that died, and
+    is taken over.
+    """
+    path = Path(path or SYNC_LOCK)
+    owner = f"{os.getpid()} {datetime.now().isoformat()}"
+
+    for attempt in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                age = time.time() - path.stat().st_mtime
+                holder = path.read_text(encoding='utf-8').strip()
+            except OSError:
+                continue  # released between our open and stat - try again
+            if attempt == 0 and age > LOCK_STALE_SECONDS:
+                path.unlink(missing_ok=True)
+                continue
+            raise SyncLocked(f"sync already running ({holder})")
+    else:
+        raise SyncLocked("could not acquire sync lock")
+
+    released = threading.Event()
+
+    def heartbeat():
+        while not released.wait(LOCK_HEARTBEAT):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    try:
+        os.write(fd, owner.encode('utf-8'))
+        os.close(fd)
+        threading.Thread(target=heartbeat, name="sync-lock-heartbeat", daemon=True).start()
+        yield path
+    finally:
+        released.set()
+        try:
+            if path.read_text(encoding='utf-8').strip() == owner:
+                path.unlink()
+        except OSError:
+            pass
+
 
 def get_client():
     """Authenticate and return Garmin client."""
@@ -59,31 +135,48 @@ def get_client():
     return client
 
 
-def fetch_health_data(client, target_date: date) -> dict:
-    """Fetch all health metrics for a given date."""
+def fetch_health_data(client, target_date: date, log=print, budget=None) -> dict:
+    """
+    Fetch all health metrics for a given date. Progress goes to `log`.
+
+    Every endpoint the MCP tools use is fetched in one parallel sweep
+    (spending from `budget`, see garmin_endpoints) and kept whole in
+    data["endpoints"] for the archive; metrics are summarised from those.
+    """
     date_str = target_date.strftime("%Y-%m-%d")
 
     data = {
         "date": date_str,
         "fetched_at": datetime.now().isoformat(),
-        "metrics": {}
+        "metrics": {},
+        "intraday": {},
+        "endpoints": {}
     }
 
+    responses, errors = fetch_endpoints(client, date_str, budget=budget)
+    data["endpoints"] = responses
+
+    def response(method):
+        if method in errors:
+            raise errors[method]
+        return responses.get(method)
+
     # Heart Rate
     try:
-        hr = client.get_heart_rates(date_str)
+        hr = response("get_heart_rates")
         data["metrics"]["heart_rate"] = {
             "resting": hr.get("restingHeartRate"),
             "max": hr.get("maxHeartRate"),
             "min": hr.get("minHeartRate"),
         }
-        print(f"  Heart Rate: resting {hr.get('restingHeartRate')} bpm")
+        data["intraday"]["heart_rate"] = hr.get("heartRateValues") or []
+        log(f"  Heart Rate: resting {hr.get('restingHeartRate')} bpm")
     except Exception as e:
-        print(f"  Heart Rate: failed ({e})")
+        log(f"  Heart Rate: failed ({e})")
 
     # HRV
     try:
-        hrv = client.get_hrv_data(date_str)
+        hrv = response("get_hrv_data")
         if hrv and "hrvSummary" in hrv:
             summary = hrv["hrvSummary"]
             data["metrics"]["hrv"] = {
@@ -93,16 +186,16 @@ def fetch_health_data(client, target_date: date) -> dict:
                 "baseline_low": summary.get("baselineLowUpper"),
                 "baseline_high": summary.get("baselineBalancedLower"),
             }
-            print(f"  HRV: {summary.get('lastNight')} (avg {summary.get('weeklyAvg')})")
+            log(f"  HRV: {summary.get('lastNight')} (avg {summary.get('weeklyAvg')})")
         else:
             data["metrics"]["hrv"] = hrv
-            print(f"  HRV: data retrieved")
+            log(f"  HRV: data retrieved")
     except Exception as e:
-        print(f"  HRV: failed ({e})")
+        log(f"  HRV: failed ({e})")
 
     # Stress
     try:
-        stress = client.get_all_day_stress(date_str)
+        stress = response("get_all_day_stress")
         if stress:
             data["metrics"]["stress"] = {
                 "avg": stress.get("avgStressLevel"),
@@ -110,13 +203,19 @@ def fetch_health_data(client, target_date: date) -> dict:
                 "stress_duration_mins": stress.get("stressDuration"),
                 "rest_duration_mins": stress.get("restStressDuration"),
             }
-            print(f"  Stress: avg {stress.get('avgStressLevel')}, max {stress.get('maxStressLevel')}")
+            # Keep the timelines - they come free with this call
+            data["intraday"]["stress"] = stress.get("stressValuesArray") or []
+            data["intraday"]["body_battery"] = [
+                [entry[0], entry[2]] for entry in stress.get("bodyBatteryValuesArray") or []
+                if len(entry) >= 3
+            ]
+            log(f"  Stress: avg {stress.get('avgStressLevel')}, max {stress.get('maxStressLevel')}")
     except Exception as e:
-        print(f"  Stress: failed ({e})")
+        log(f"  Stress: failed ({e})")
 
     # Body Battery
     try:
-        bb = client.get_body_battery(date_str, date_str)
+        bb = response("get_body_battery")
         if bb and len(bb) > 0:
             day_data = bb[0] if isinstance(bb, list) else bb
             data["metrics"]["body_battery"] = {
@@ -125,13 +224,13 @@ def fetch_health_data(client, target_date: date) -> dict:
                 "start": day_data.get("startTimestampGMT"),
                 "end": day_data.get("endTimestampGMT"),
             }
-            print(f"  Body Battery: +{day_data.get('charged')} / -{day_data.get('drained')}")
+            log(f"  Body Battery: +{day_data.get('charged')} / -{day_data.get('drained')}")
     except Exception as e:
-        print(f"  Body Battery: failed ({e})")
+        log(f"  Body Battery: failed ({e})")
 
     # Sleep
     try:
-        sleep = client.get_sleep_data(date_str)
+        sleep = response("get_sleep_data")
         if sleep and "dailySleepDTO" in sleep:
             s = sleep["dailySleepDTO"]
             total_mins = s.get("sleepTimeSeconds", 0) // 60
@@ -145,25 +244,25 @@ def fetch_health_data(client, target_date: date) -> dict:
                 "rem_minutes": s.get("remSleepSeconds", 0) // 60,
                 "awake_minutes": s.get("awakeSleepSeconds", 0) // 60,
             }
-            print(f"  Sleep: {hours}h {mins}m total")
+            log(f"  Sleep: {hours}h {mins}m total")
     except Exception as e:
-        print(f"  Sleep: failed ({e})")
+        log(f"  Sleep: failed ({e})")
 
     # SpO2
     try:
-        spo2 = client.get_spo2_data(date_str)
+        spo2 = response("get_spo2_data")
         if spo2:
             data["metrics"]["spo2"] = {
                 "avg": spo2.get("averageSpO2"),
                 "min": spo2.get("lowestSpO2"),
             }
-            print(f"  SpO2: avg {spo2.get('averageSpO2')}%")
+            log(f"  SpO2: avg {spo2.get('averageSpO2')}%")
     except Exception as e:
-        print(f"  SpO2: failed ({e})")
+        log(f"  SpO2: failed ({e})")
 
     # Respiration
     try:
-        resp = client.get_respiration_data(date_str)
+        resp = response("get_respiration_data")
         if resp:
             data["metrics"]["respiration"] = {
                 "avg_waking": resp.get("avgWakingRespirationValue"),
@@ -171,9 +270,51 @@ def fetch_health_data(client, target_date: date) -> dict:
                 "highest": resp.get("highestRespirationValue"),
                 "lowest": resp.get("lowestRespirationValue"),
             }
-            print(f"  Respiration: {resp.get('avgWakingRespirationValue')} breaths/min (waking)")
+            data["intraday"]["respiration"] = resp.get("respirationValuesArray") or []
+            log(f"  Respiration: {resp.get('avgWakingRespirationValue')} breaths/min (waking)")
+    except Exception as e:
+        log(f"  Respiration: failed ({e})")
+
+    # Daily summary
+    try:
+        stats = response("get_stats")
+        if stats:
+            data["metrics"]["activity"] = {
+                "steps": stats.get("totalSteps"),
+                "calories": stats.get("totalKilocalories"),
+                "active_minutes": (stats.get("activeSeconds") or 0) // 60,
+                "bb_latest": stats.get("bodyBatteryMostRecentValue"),
+            }
+            log(f"  Activity: {stats.get('totalSteps')} steps")
     except Exception as e:
-        print(f"  Respiration: failed ({e})")
+        log(f"  Activity: failed ({e})")
+
+    # Cycle
+    try:
+        cycle = response("get_menstrual_data_for_date")
+        if cycle and "daySummary" in cycle:
+            summary = cycle["daySummary"]
+            data["metrics"]["cycle"] = {
+                "day": summary.get("dayInCycle"),
+                "phase": summary.get("currentPhase"),
+                "days_until_next_phase": summary.get("daysUntilNextPhase"),
+            }
+            log(f"  Cycle: day {summary.get('dayInCycle')}, phase {summary.get('currentPhase')}")
+    except Exception as e:
+        log(f"  Cycle: failed ({e})")
+
+    # Training readiness (list of readings through the day, newest first)
+    try:
+        readiness = response("get_training_readiness")
+        latest = readiness[0] if isinstance(readiness, list) and readiness else readiness
+        if latest:
+            data["metrics"]["training_readiness"] = {
+                "score": latest.get("score"),
+                "level": latest.get("level"),
+            }
+            log(f"  Training Readiness: {latest.get('score')} ({latest.get('level')})")
+    except Exception as e:
+        log(f"  Training Readiness: failed ({e})")
 
     return data
 
@@ -217,8 +358,14 @@ def calculate_spoons(data: dict) -> int:
     return max(1, min(10, base_spoons))
 
 
-def write_health_log(data: dict, spoons: int):
-    """Write to Obsidian Health-Logs folder in Fox's uplink format."""
+# Frontmatter fields Fox fills in by hand - never overwrite what she wrote
+SUBJECTIVE_FIELDS = ("pain", "fog", "mood", "flare")
+NOTES_HEADING = "## Notes"
+SIGNATURE = "---\n*Synced by Alex*"
+
+
+def render_health_log(data: dict, spoons: int) -> str:
+    """Render a day's uplink markdown in Fox's format."""
     date_str = data["date"]
     metrics = data.get("metrics", {})
 
@@ -229,7 +376,7 @@ def write_health_log(data: dict, spoons: int):
     bb = metrics.get("body_battery", {})
 
     # Build the frontmatter
-    content = f"""---
+    return f"""---
 type: uplink
 date: {date_str}
 source: garmin-lily-2
@@ -256,26 +403,115 @@ tags:
 | Sleep | {sleep.get('total_formatted', 'N/A')} |
 | Estimated Spoons | {spoons}/10 |
 
-## Notes
+{NOTES_HEADING}
 
 *Auto-generated from Garmin Lily 2 sync. Fill in subjective fields (pain, fog, mood) manually.*
 
----
-*Synced by Alex*
+{SIGNATURE}
 """
 
-    filename = f"{date_str}-garmin-uplink.md"
-    filepath = HEALTH_LOGS_PATH / filename
 
-    with open(filepath, 'w', encoding='utf-8') as f:
+def _split_frontmatter(text: str):
+    """Return (frontmatter lines, body) - empty frontmatter if there isn't one."""
+    if not text.startswith("---\n"):
+        return [], text
+    end = text.find("\n---\n", 4)
+    if end == -1:
+        return [], text
+    return text[4:end].split("\n"), text[end + 5:]
+
+
+def merge_subjective(content: str, existing: str) -> str:
+    """
+    Carry Fox's hand-filled fields over from the existing log into freshly
+    rendered content: pain/fog/mood/flare in the frontmatter, and anything
+    she wrote under Notes.
+    """
+    old_lines, old_body = _split_frontmatter(existing)
+    new_lines, new_body = _split_frontmatter(content)
+    if not new_lines:
+        return content
+
+    kept = {}
+    for line in old_lines:
+        key, sep, value = line.partition(":")
+        if sep and key in SUBJECTIVE_FIELDS:
+            kept[key] = value.strip()
+
+    for i, line in enumerate(new_lines):
+        key, sep, _ = line.partition(":")
+        if sep and key in kept:
+            new_lines[i] = f"{key}: {kept[key]}" if kept[key] else f"{key}:"
+
+    # Keep her notes section verbatim
+    old_notes = old_body.find(NOTES_HEADING)
+    new_notes = new_body.find(NOTES_HEADING)
+    if old_notes != -1 and new_notes != -1:
+        old_end = old_body.rfind(SIGNATURE)
+        new_end = new_body.rfind(SIGNATURE)
+        if old_end > old_notes and new_end > new_notes:
+            new_body = new_body[:new_notes] + old_body[old_notes:old_end] + new_body[new_end:]
+
+    return "---\n" + "\n".join(new_lines) + "\n---\n" + new_body
+
+
+def content_hash(text: str) -> str:
+    """Short, stable fingerprint of rendered content."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _atomic_write(filepath: Path, content: str):
+    """Write via a temp file + rename so Obsidian never sees a half-written log."""
+    tmp = filepath.with_name(f".{filepath.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8', newline='\n') as f:
         f.write(content)
+    os.replace(tmp, filepath)
+
+
+def write_health_logs(days: list, logs_path: Path = None) -> dict:
+    """
+    Write many days of Health Logs in one pass.
+
+    `days` is a list of (data, spoons) pairs. Each log is rendered, merged
+    with whatever Fox already filled in, and only written if its content
+    hash differs from the file on disk - so reruns and backfills touch only
+    the files that actually changed and Obsidian only re-indexes those.
+    """
+    logs_path = Path(logs_path or HEALTH_LOGS_PATH)
+    result = {"written": [], "unchanged": []}
+
+    for data, spoons in days:
+        filepath = logs_path / f"{data['date']}-garmin-uplink.md"
+        content = render_health_log(data, spoons)
+
+        if filepath.exists():
+            with open(filepath, 'r', encoding='utf-8') as f:
+                existing = f.read()
+            content = merge_subjective(content, existing)
+            if content_hash(content) == content_hash(existing):
+                result["unchanged"].append(filepath)
+                continue
+
+        _atomic_write(filepath, content)
+        result["written"].append(filepath)
+
+    return result
+
 
-    print(f"\nWrote Health Log: {filepath}")
+def write_health_log(data: dict, spoons: int):
+    """Write to Obsidian Health-Logs folder in Fox's uplink format."""
+    result = write_health_logs([(data, spoons)])
+    filepath = HEALTH_LOGS_PATH / f"{data['date']}-garmin-uplink.md"
+
+    if result["written"]:
+        print(f"\nWrote Health Log: {filepath}")
+    else:
+        print(f"\nHealth Log unchanged: {filepath}")
     return filepath
 
 
-def write_companion_memory(data: dict, spoons: int):
-    """Write to companion-memory episodic database."""
+def companion_memory_entry(data: dict, spoons: int) -> dict:
+    """The companion-memory entry for a synced day."""
     date_str = data["date"]
     metrics = data.get("metrics", {})
 
@@ -297,7 +533,7 @@ def write_companion_memory(data: dict, spoons: int):
 
     summary = ", ".join(summary_parts) if summary_parts else "No data"
 
-    entry = {
+    return {
         "type": "entity",
         "name": f"Garmin_Sync_{date_str}",
         "entityType": "biometric_log",
@@ -308,31 +544,234 @@ def write_companion_memory(data: dict, spoons: int):
                 "content": f"Garmin Lily 2 sync for {date_str}: {summary}. Estimated spoons: {spoons}/10.",
                 "added": datetime.now().isoformat(),
                 "salience": "active",
-                "raw_data": metrics
+                # The numbers live in the archive - garmin_archive.resolve_ref reads them back
+                "raw_ref": day_ref(data)
             }
         ]
     }
 
-    # Append to episodic memory
-    memory_file = COMPANION_MEMORY_PATH / "memory-episodic.jsonl"
 
-    with open(memory_file, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entry) + '\n')
-
-    print(f"Wrote to companion-memory: {memory_file}")
+def _memory_lock(memory_file: Path):
+    """Taken by everything here that writes memory-episodic.jsonl. The companion's own appends don't take it."""
+    return file_lock(memory_file.with_name(f".{memory_file.name}.lock"))
+
+
+def _read_memory(memory_file: Path) -> tuple:
+    """(complete lines, byte offset they end at) - a half-written last line is left alone."""
+    if not memory_file.exists():
+        return [], 0
+    with open(memory_file, 'rb') as f:
+        raw = f.read()
+    end = raw.rfind(b"\n") + 1
+    return raw[:end].decode('utf-8').splitlines(keepends=True), end
+
+
+def _replace_memory(memory_file: Path, lines: list, end: int):
+    """
+    Swap `lines` in for the first `end` bytes of the memory file, via temp
+    file + rename, with the memory lock held. Anything appended past `end`
+    since it was read (the companion doesn't take the lock) is copied onto
+    the end of the new file rather than lost.
+    """
+    tmp = memory_file.with_name(f".{memory_file.name}.tmp")
+    with open(tmp, 'wb') as out:
+        out.write("".join(lines).encode('utf-8'))
+        with open(memory_file, 'rb') as f:
+            f.seek(end)
+            shutil.copyfileobj(f, out)
+    os.replace(tmp, memory_file)
+    # Offsets in the episodic index no longer hold - it rebuilds on next read
+    memory_file.with_name(MEMORY_INDEX_FILE).unlink(missing_ok=True)
+
+
+def _same_observations(old: dict, new: dict) -> bool:
+    strip = lambda entry: [{k: v for k, v in obs.items() if k != "added"}
+                           for obs in entry.get("observations", [])]
+    return strip(old) == strip(new)
+
+
+def upsert_companion_memory(entries: list, memory_path: Path = None) -> dict:
+    """
+    Write entries to memory-episodic.jsonl, one per name: an entry whose
+    name is already there replaces it in place (keeping its "created", and
+    dropping any duplicates), unless its observations are the same, in
+    which case nothing is written. New names are appended.
+    Returns {"added", "updated", "unchanged"} name lists.
+    """
+    memory_file = Path(memory_path or COMPANION_MEMORY_PATH) / "memory-episodic.jsonl"
+    memory_file.parent.mkdir(parents=True, exist_ok=True)
+    pending = {entry["name"]: entry for entry in entries}
+    result = {"added": [], "updated": [], "unchanged": []}
+
+    with _memory_lock(memory_file):
+        lines, end = _read_memory(memory_file)
+        found = {}
+        for i, line in enumerate(lines):
+            try:
+                name = loads(line).get("name")
+            except (ValueError, AttributeError):
+                continue
+            if name in pending:
+                found.setdefault(name, []).append(i)
+
+        for name, entry in pending.items():
+            where = found.get(name)
+            if not where:
+                result["added"].append(name)
+                continue
+            old = loads(lines[where[0]])
+            if len(where) == 1 and _same_observations(old, entry):
+                result["unchanged"].append(name)
+                continue
+            lines[where[0]] = dumps(dict(entry, created=old.get("created", entry["created"]))) + '\n'
+            for i in where[1:]:
+                lines[i] = ""
+            result["updated"].append(name)
+
+        added = "".join(dumps(pending[name]) + '\n' for name in result["added"])
+        if result["updated"]:
+            _replace_memory(memory_file, lines + [added], end)
+        elif added:
+            with open(memory_file, 'a', encoding='utf-8') as f:
+                f.write(added)
+
+    return result
+
+
+def write_companion_memory(data: dict, spoons: int, memory_path: Path = None, log=print):
+    """Write to companion-memory episodic database - one entry per day, updated on re-sync."""
+    memory_file = Path(memory_path or COMPANION_MEMORY_PATH) / "memory-episodic.jsonl"
+    result = upsert_companion_memory([companion_memory_entry(data, spoons)], memory_path)
+
+    if result["unchanged"]:
+        log(f"Companion-memory unchanged: {memory_file}")
+    else:
+        log(f"Wrote to companion-memory: {memory_file}")
     return memory_file
 
 
-def save_raw_data(data: dict):
-    """Save raw JSON for debugging/history."""
+def slim_companion_memory(memory_path: Path = None, archive_path: Path = None, log=print) -> dict:
+    """
+    Rewrite memory-episodic.jsonl with raw_data swapped for a raw_ref
+    wherever the archive holds that day with the same metrics. Days only
+    recorded in memory, or re-synced since with different numbers, keep
+    their raw_data - it's the only copy. Rewrites under the memory lock,
+    and anything the companion appends meanwhile is carried over.
+    """
+    memory_file = Path(memory_path or COMPANION_MEMORY_PATH) / "memory-episodic.jsonl"
+    stats = {"slimmed": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+    if not memory_file.exists():
+        return stats
+
+    indexes, metrics = {}, {}
+    with _memory_lock(memory_file):
+        lines, end = _read_memory(memory_file)
+        stats["bytes_before"] = end
+        for i, line in enumerate(lines):
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            date_str = entry.get("name", "").replace("Garmin_Sync_", "")
+            for obs in entry.get("observations", []):
+                if "raw_data" not in obs:
+                    continue
+                month = date_str[:7]
+                if month not in indexes:
+                    indexes[month] = load_index(month, archive_path)["days"]
+                archived = indexes[month].get(date_str)
+                if archived and date_str not in metrics:
+                    metrics[date_str] = (get_day(date_str, archive_path) or {}).get("metrics")
+                if archived and metrics[date_str] == obs["raw_data"]:
+                    del obs["raw_data"]
+                    obs["raw_ref"] = {"date": date_str, "sha": archived["sha"]}
+                    stats["slimmed"] += 1
+                else:
+                    stats["kept"] += 1
+            lines[i] = dumps(entry) + '\n'
+
+        stats["bytes_after"] = len("".join(lines).encode('utf-8'))
+        _replace_memory(memory_file, lines, end)
+    log(f"Companion memory: {stats['slimmed']} observations now reference the archive, "
+        f"{stats['kept']} kept inline; {stats['bytes_before']} -> {stats['bytes_after']} bytes")
+    return stats
+
+
+def save_raw_data(data: dict, archive_path: Path = None, log=print):
+    """
+    Archive the day - summary, timelines and every endpoint's full response -
+    into the compressed monthly archive. Set GARMIN_RAW_JSON=1 to also write
+    the old {date}-raw.json summary for debugging.
+
+    Returns True if the archive took a new copy of the day, False if it
+    already held the same data.
+    """
     date_str = data["date"]
-    filepath = GARMIN_DATA_PATH / f"{date_str}-raw.json"
-
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
-
-    print(f"Saved raw data: {filepath}")
-    return filepath
+    changed = archive_day(data, archive_path)
+    log(f"Archived raw data: {date_str} ({'updated' if changed else 'unchanged'})")
+
+    if KEEP_RAW_JSON:
+        raw_dir = Path(archive_path).parent if archive_path else GARMIN_DATA_PATH
+        filepath = raw_dir / f"{date_str}-raw.json"
+        summary = {k: v for k, v in data.items() if k != "endpoints"}
+        with open(filepath, 'wb') as f:
+            f.write(dumps_bytes(summary, indent=2))
+        log(f"Saved raw data: {filepath}")
+
+    return changed
+
+
+def push_to_dashboard(days: list):
+    """Send synced days to the Binary Home worker, if BINARY_HOME_URL is set (today and yesterday only)."""
+    if not BINARY_HOME_URL:
+        return
+    result = push_days(days)
+    message = f"Dashboard push: {result['sent']} sent"
+    if result["queued"]:
+        message += f", {result['queued']} queued for retry"
+    if result["skipped"]:
+        message += f", {result['skipped']} older days not pushed"
+    print(message)
+
+
+def write_outputs(days: list, archived: set, log=print, push: bool = True) -> list:
+    """
+    Write Health Logs for (data, spoons) days in one batch, then memory
+    entries and dashboard pushes for just the days that changed - a new
+    archive copy (dates in `archived`) or a rewritten Health Log. Returns
+    the changed days. With push=False the caller pushes them itself.
+    """
+    result = write_health_logs(days)
+    written = {filepath.name[:10] for filepath in result["written"]}
+    log(f"\nHealth Logs: {len(result['written'])} written, {len(result['unchanged'])} unchanged")
+
+    changed = [(data, spoons) for data, spoons in days if data["date"] in archived | written]
+    if changed:
+        memory = upsert_companion_memory([companion_memory_entry(data, spoons) for data, spoons in changed])
+        log(f"Companion memory: {len(memory['added'])} added, {len(memory['updated'])} updated, "
+            f"{len(memory['unchanged'])} unchanged")
+        if push:
+            push_to_dashboard(changed)
+    return changed
+
+
+def backfill(client, start: date, end: date):
+    """Sync a range of days, writing all the outputs in one batch at the end."""
+    days, archived = [], set()
+    current = start
+    while current <= end:
+        print(f"\n{current}:")
+        data = fetch_health_data(client, current)
+        spoons = calculate_spoons(data)
+        if save_raw_data(data):
+            archived.add(data["date"])
+        record_cycle(data)
+        days.append((data, spoons))
+        current += timedelta(days=1)
+
+    changed = write_outputs(days, archived)
+    print(f"{len(changed)} of {len(days)} days changed")
+    return changed
 
 
 def main():
@@ -343,15 +782,53 @@ def main():
 
     # Default to yesterday (Garmin data is usually a day behind)
     target_date = date.today() - timedelta(days=1)
+    end_date = None
 
-    # Allow override via argument
     import sys
-    if len(sys.argv) > 1:
+    if "--daemon" in sys.argv:
+        from garmin_scheduler import main as run_daemon
+        run_daemon()
+        return
+
+    if "--slim-memory" in sys.argv:
         try:
+            with sync_lock():
+                slim_companion_memory()
+        except SyncLocked as e:
+            print(f"\nSkipping: {e}")
+        return
+
+    # Allow override via argument: one date, or a start and end date to backfill
+    try:
+        if len(sys.argv) > 1:
             target_date = datetime.strptime(sys.argv[1], "%Y-%m-%d").date()
-        except ValueError:
-            print(f"Invalid date format. Use YYYY-MM-DD. Got: {sys.argv[1]}")
-            return
+        if len(sys.argv) > 2:
+            end_date = datetime.strptime(sys.argv[2], "%Y-%m-%d").date()
+    except ValueError:
+        print(f"Invalid date format. Use YYYY-MM-DD. Got: {' '.join(sys.argv[1:])}")
+        return
+
+    try:
+        with sync_lock(), capture("sync") as perf:
+            run_sync(target_date, end_date)
+        if perf:
+            print(f"\nProfile: {perf['files'][1]}")
+    except SyncLocked as e:
+        print(f"\nSkipping: {e}")
+
+
+def run_sync(target_date: date, end_date: date = None):
+    """One manual sync (or backfill, with end_date) - called with the sync lock held."""
+    if end_date:
+        print(f"\nBackfilling: {target_date} to {end_date}")
+        print("-" * 50)
+        client = get_client()
+        backfill(client, target_date, end_date)
+        print("\n" + "=" * 50)
+        print("BACKFILL COMPLETE")
+        print("Embers Remember.")
+        print("=" * 50)
+        return
 
     print(f"\nSyncing data for: {target_date}")
     print("-" * 50)
@@ -369,9 +846,12 @@ def main():
 
     # Write outputs
     print("\nWriting outputs...")
-    save_raw_data(data)
-    write_health_log(data, spoons)
-    write_companion_memory(data, spoons)
+    archived = {data["date"]} if save_raw_data(data) else set()
+    record_cycle(data)
+    if not write_outputs([(data, spoons)], archived):
+        print("Nothing changed since the last sync")
+    if target_date == date.today() and data["metrics"]:
+        write_snapshot(snapshot_from_day(data))
 
     print("\n" + "=" * 50)
     print("SYNC COMPLETE")
@@ -0,0 +1,335 @@
+"""
+Push Garmin syncs to the Binary Home cloud worker
+So the dashboard shows Fox's watch data seconds after a sync, not whenever
+she next fills in an uplink by hand.
+
+Posts to the worker's /uplink endpoint - the same one UplinkPage.jsx and
+cloudAPI.saveFoxState use - over one pooled keep-alive session. The
+dashboard shows the newest uplink as Fox's state, so a Garmin push is the
+latest uplink with the biometrics laid over it: pain, fog, mood, location,
+notes and her own spoons stay as she last set them, and the estimate goes
+in estimatedSpoons. Only today and yesterday are pushed - an older day
+would show as her current state.
+
+Several days go as a single /uplink/batch request when the worker
+supports it, and fall back to individual posts over the same connection
+when it doesn't. Anything that can't be delivered is kept in
+uplink-queue.jsonl and sent, oldest first, on the next push or with --drain.
+
+Config:
+    BINARY_HOME_URL       e.g. https://ai-mind.example.workers.dev (unset = pushing off)
+    BINARY_HOME_API_KEY   optional, sent as a Bearer token
+
+Usage:
+    python garmin_uplink.py --drain                 # retry anything queued
+    python garmin_uplink.py --push 2026-01-06       # push an archived day
+    python garmin_uplink.py --stand-in 8787         # local fake worker for testing
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from garmin_paths import GARMIN_DATA_PATH
+
+
+BINARY_HOME_URL = os.environ.get("BINARY_HOME_URL", "").rstrip("/")
+BINARY_HOME_API_KEY = os.environ.get("BINARY_HOME_API_KEY", "")
+
+QUEUE_PATH = GARMIN_DATA_PATH / "uplink-queue.jsonl"
+
+TIMEOUT = 10          # seconds per request
+BATCH_SIZE = 50       # uplinks per /uplink/batch request
+
+_session = None
+_session_lock = threading.Lock()
+_queue_lock = threading.Lock()
+_batch_supported = None   # learned from the worker on first batch attempt
+
+# What a Garmin push sets; everything else in the pushed uplink comes from the latest one
+BIOMETRIC_FIELDS = ("estimatedSpoons", "hr", "bodyBattery", "stress", "hrv", "sleep")
+# Set by the worker on each stored uplink, not copied forward
+SERVER_FIELDS = ("id", "timestamp", "created_at")
+PUSH_DAYS = 1         # days back from today worth pushing (1 = today and yesterday)
+
+
+def uplink_payload(data: dict, spoons: int) -> dict:
+    """A synced day's biometrics, ready for merge_uplink."""
+    metrics = data.get("metrics", {})
+    hr = metrics.get("heart_rate") or {}
+    stress = metrics.get("stress") or {}
+    hrv = metrics.get("hrv") or {}
+    sleep = metrics.get("sleep") or {}
+    bb = metrics.get("body_battery") or {}
+
+    # Latest Body Battery level from the timeline, if the sync kept it
+    levels = [entry[1] for entry in (data.get("intraday") or {}).get("body_battery") or []
+              if len(entry) >= 2 and entry[1] is not None]
+
+    return {
+        "estimatedSpoons": spoons,
+        "hr": hr.get("resting"),
+        "bodyBattery": levels[-1] if levels else None,
+        "stress": stress.get("avg"),
+        "hrv": hrv.get("last_night"),
+        "sleep": sleep.get("total_formatted"),
+        "garminNotes": f"Garmin sync {data['date']}: BB +{bb.get('charged', '?')}/-{bb.get('drained', '?')}",
+        "source": "garmin",
+        "date": data["date"],
+    }
+
+
+def merge_uplink(latest: dict, payload: dict) -> dict:
+    """
+    The uplink to post: Fox's latest uplink (None if there isn't one) with
+    a Garmin payload's biometrics laid over it. Her subjective fields and
+    self-reported spoons are copied through untouched.
+    """
+    merged = {k: v for k, v in (latest or {}).items() if k not in SERVER_FIELDS}
+    merged.update({k: payload[k] for k in BIOMETRIC_FIELDS if payload.get(k) is not None})
+    merged["tags"] = list(dict.fromkeys((merged.get("tags") or []) + ["garmin-sync"]))
+    merged.update(source="garmin", date=payload["date"], garminNotes=payload.get("garminNotes"))
+    return merged
+
+
+def is_recent(date_str: str, today: date = None) -> bool:
+    """True for days recent enough to push (today and yesterday)."""
+    today = today or date.today()
+    return (today - timedelta(days=PUSH_DAYS)).isoformat() <= (date_str or "") <= today.isoformat()
+
+
+def get_session():
+    """One keep-alive session for the whole process, with retries on 5xx."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            session = requests.Session()
+            retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                          allowed_methods=("GET", "POST"))
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry))
+            session.headers["Content-Type"] = "application/json"
+            if BINARY_HOME_API_KEY:
+                session.headers["Authorization"] = f"Bearer {BINARY_HOME_API_KEY}"
+            _session = session
+        return _session
+
+
+def _post(path: str, body, base_url: str):
+    return get_session().post(f"{base_url}{path}", data=json.dumps(body), timeout=TIMEOUT)
+
+
+def _latest_uplink(base_url: str) -> dict:
+    """The worker's newest uplink, or None if there's none yet. Raises if it can't be read."""
+    res = get_session().get(f"{base_url}/uplink", params={"limit": 1}, timeout=TIMEOUT)
+    res.raise_for_status()
+    return res.json().get("latest")
+
+
+def _send_one(payload: dict, base_url: str) -> bool:
+    try:
+        res = _post("/uplink", payload, base_url)
+        return res.ok
+    except Exception:
+        return False
+
+
+def _send_batch(payloads: list, base_url: str) -> list:
+    """Send payloads, batched if the worker allows. Returns the ones that failed."""
+    global _batch_supported
+    failed = []
+
+    for i in range(0, len(payloads), BATCH_SIZE):
+        chunk = payloads[i:i + BATCH_SIZE]
+        if len(chunk) > 1 and _batch_supported is not False:
+            try:
+                res = _post("/uplink/batch", {"uplinks": chunk}, base_url)
+                if res.status_code in (404, 405):
+                    _batch_supported = False
+                elif res.ok:
+                    _batch_supported = True
+                    continue
+                else:
+                    failed.extend(chunk)
+                    continue
+            except Exception:
+                failed.extend(chunk)
+                continue
+
+        failed.extend(p for p in chunk if not _send_one(p, base_url))
+
+    return failed
+
+
+# === RETRY QUEUE ===
+
+def _read_queue() -> list:
+    if not QUEUE_PATH.exists():
+        return []
+    items = []
+    with open(QUEUE_PATH, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    items.append(json.loads(line))
+                except ValueError:
+                    continue
+    return items
+
+
+def _write_queue(items: list):
+    if not items:
+        QUEUE_PATH.unlink(missing_ok=True)
+        return
+    QUEUE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = QUEUE_PATH.with_suffix(".tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item) + '\n')
+    os.replace(tmp, QUEUE_PATH)
+
+
+def _merge(queued: list, new: list) -> list:
+    """One entry per date - a newer push for the same day replaces the queued one."""
+    by_date = {item.get("date"): item for item in queued}
+    by_date.update({item.get("date"): item for item in new})
+    return sorted(by_date.values(), key=lambda item: item.get("date") or "")
+
+
+def push_uplinks(payloads: list, base_url: str = None) -> dict:
+    """
+    Push Garmin payloads (plus anything still queued from earlier failures),
+    oldest first so the newest day ends up as the dashboard's latest. Each
+    is merged into the worker's latest uplink at send time, so a queued
+    push never carries stale subjective fields; if the latest can't be read
+    nothing is sent. Days too old to push are dropped, and whatever fails
+    goes back in the queue.
+    """
+    base_url = (base_url or BINARY_HOME_URL).rstrip("/")
+    if not base_url:
+        return {"sent": 0, "queued": 0, "skipped": 0, "disabled": True}
+
+    with _queue_lock:
+        everything = _merge(_read_queue(), payloads)
+        pending = [p for p in everything if is_recent(p.get("date"))]
+        skipped = len(everything) - len(pending)
+        if not pending:
+            _write_queue([])
+            return {"sent": 0, "queued": 0, "skipped": skipped}
+        try:
+            latest = _latest_uplink(base_url)
+        except Exception:
+            _write_queue(pending)
+            return {"sent": 0, "queued": len(pending), "skipped": skipped}
+        merged = [merge_uplink(latest, p) for p in pending]
+        undelivered = {id(m) for m in _send_batch(merged, base_url)}
+        failed = [p for p, m in zip(pending, merged) if id(m) in undelivered]
+        _write_queue(failed)
+
+    return {"sent": len(pending) - len(failed), "queued": len(failed), "skipped": skipped}
+
+
+def push_days(days: list, base_url: str = None) -> dict:
+    """Push a list of (data, spoons) pairs - only today's and yesterday's go out."""
+    return push_uplinks([uplink_payload(data, spoons) for data, spoons in days], base_url)
+
+
+def drain_queue(base_url: str = None) -> dict:
+    return push_uplinks([], base_url)
+
+
+# === LOCAL STAND-IN ===
+
+def make_stand_in(port: int = 0):
+    """
+    A tiny in-memory imitation of the worker's uplink endpoints, for tests.
+    Returns the server; its .uplinks list holds everything received.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict):
+            raw = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path != "/uplink":
+                return self._reply(404, {"error": "not found"})
+            limit = int(parse_qs(url.query).get("limit", ["10"])[0])
+            recent = server.uplinks[-limit:][::-1]
+            self._reply(200, {"latest": recent[0] if recent else None, "uplinks": recent})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/uplink":
+                items = [body]
+            elif self.path == "/uplink/batch" and server.batch_enabled:
+                items = body.get("uplinks", [])
+            else:
+                return self._reply(404, {"error": "not found"})
+            stamp = datetime.now().isoformat()
+            server.uplinks.extend(dict(item, timestamp=stamp) for item in items)
+            server.requests += 1
+            self._reply(200, {"success": True, "count": len(items)})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.uplinks = []
+    server.requests = 0
+    server.batch_enabled = True
+    return server
+
+
+def main():
+    args = sys.argv[1:]
+
+    if "--stand-in" in args:
+        i = args.index("--stand-in")
+        port = int(args[i + 1]) if len(args) > i + 1 else 8787
+        server = make_stand_in(port)
+        print(f"Stand-in worker on http://127.0.0.1:{port} (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print(f"\nReceived {len(server.uplinks)} uplinks")
+        return
+
+    if not BINARY_HOME_URL:
+        print("BINARY_HOME_URL is not set - nothing to push to")
+        return
+
+    if "--push" in args:
+        from garmin_archive import get_day
+        from garmin_sync import calculate_spoons
+        date_str = args[args.index("--push") + 1]
+        data = get_day(date_str)
+        if not data:
+            print(f"{date_str} is not archived")
+            return
+        result = push_days([(data, calculate_spoons(data))])
+        if result["skipped"]:
+            print(f"{date_str} is too old to push - the dashboard would show it as today")
+            return
+    else:
+        result = drain_queue()
+
+    print(f"Sent {result['sent']}, still queued {result['queued']}")
+
+
+if __name__ == "__main__":
+    main()
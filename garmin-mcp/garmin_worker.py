@@ -0,0 +1,336 @@
+"""
+Multi-account Garmin sync worker
+One process, several households - each account with its own tokens,
+output folders and request budget.
+
+Roster (accounts.json):
+    {
+      "accounts": [
+        {
+          "name": "fox",
+          "token_store": "~/.garminconnect",
+          "health_logs_path": "~/Alex Mind/Health-Logs",
+          "companion_memory_path": "~/companion-memory",
+          "garmin_data_path": "~/garmin-data",
+          "requests_per_minute": 30
+        }
+      ]
+    }
+
+Tokens must already exist for each account - bootstrap them once with
+    GARMIN_TOKEN_STORE=~/.garminconnect-smith python garmin_sync.py
+
+Usage:
+    python garmin_worker.py accounts.json                          # yesterday
+    python garmin_worker.py accounts.json 2026-01-01 2026-01-31 --workers 4
+
+Scheduling: accounts take turns one day at a time, an account is never
+worked on by two threads at once, and an account that is out of budget or
+being throttled waits in the queue without holding a worker - so one slow
+or rate-limited household can't hold up the rest.
+"""
+
+import heapq
+import json
+import sys
+import threading
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from garmin_endpoints import ENDPOINTS, TokenBucket
+from garmin_sync import (
+    calculate_spoons,
+    fetch_health_data,
+    save_raw_data,
+    write_companion_memory,
+    write_health_logs,
+)
+
+
+DEFAULT_REQUESTS_PER_MINUTE = 30
+CALLS_PER_DAY = len(ENDPOINTS)  # endpoints fetch_health_data hits per day
+THROTTLE_COOLDOWN = 300      # seconds to bench an account after a 429
+MAX_THROTTLES = 3            # give up on an account after this many in one run
+
+
+class BudgetedClient:
+    """
+    Wraps a Garmin client to count an account's get_* calls and notice
+    throttling. The calls themselves spend from the account's bucket via
+    fetch_health_data(budget=...).
+    """
+
+    def __init__(self, client, job):
+        self._client = client
+        self._job = job
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not name.startswith("get_") or not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with self._lock:
+                self._job.requests += 1
+            try:
+                return attr(*args, **kwargs)
+            except Exception as e:
+                if _is_throttle(e):
+                    self._job.throttled = True
+                raise
+        return call
+
+
+def _is_throttle(error: Exception) -> bool:
+    return type(error).__name__ == "GarminConnectTooManyRequestsError" or "429" in str(error)
+
+
+def _expand(path) -> Path:
+    return Path(path).expanduser()
+
+
+class AccountJob:
+    """One account's pending days, outputs and running totals."""
+
+    def __init__(self, spec: dict, days: list):
+        self.name = spec["name"]
+        self.token_store = _expand(spec.get("token_store", "~/.garminconnect"))
+        data_path = _expand(spec.get("garmin_data_path", f"~/garmin-data-{self.name}"))
+        self.archive_path = _expand(spec.get("archive_path", data_path / "archive"))
+        self.health_logs_path = _expand(spec.get("health_logs_path", f"~/health-logs-{self.name}"))
+        self.memory_path = _expand(spec.get("companion_memory_path", f"~/companion-memory-{self.name}"))
+        self.bucket = TokenBucket(spec.get("requests_per_minute", DEFAULT_REQUESTS_PER_MINUTE))
+
+        self.pending = deque(days)
+        self.rendered = []       # (data, spoons) waiting for the batch Health Log write
+        self.client = None
+        self.throttled = False
+
+        self.synced = 0
+        self.failed = []
+        self.throttles = 0
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self.finished_at = None
+        self.error = None
+
+    def log(self, message: str):
+        print(f"[{self.name}] {message.strip()}")
+
+    def connect(self):
+        from garminconnect import Garmin
+        if not self.token_store.exists():
+            raise RuntimeError(f"no saved tokens at {self.token_store}")
+        client = Garmin()
+        client.login(str(self.token_store))
+        self.client = BudgetedClient(client, self)
+
+    def sync_one(self) -> float:
+        """
+        Sync the next pending day. Returns how many seconds this account
+        should sit out before its next turn (0 = ready straight away).
+        """
+        target = self.pending[0]
+        self.throttled = False
+        data = fetch_health_data(self.client, target, log=self.log, budget=self.bucket)
+
+        if self.throttled:
+            # Partial day - leave it queued and come back after the cooldown
+            self.throttles += 1
+            self.log(f"throttled on {target}, cooling down {THROTTLE_COOLDOWN}s")
+            if self.throttles >= MAX_THROTTLES:
+                self.error = "throttled too often, giving up for this run"
+                self.failed.extend(self.pending)
+                self.pending.clear()
+                return 0
+            return THROTTLE_COOLDOWN
+
+        self.pending.popleft()
+        spoons = calculate_spoons(data)
+        save_raw_data(data, archive_path=self.archive_path, log=self.log)
+        write_companion_memory(data, spoons, memory_path=self.memory_path, log=self.log)
+        self.rendered.append((data, spoons))
+        self.synced += 1
+        return 0
+
+    def flush(self):
+        """
+        Write this account's Health Logs in one batch. The batch is taken
+        off the job first, so a failed write isn't retried; its days are
+        counted as failed instead.
+        """
+        batch, self.rendered = self.rendered, []
+        if not batch:
+            return
+        try:
+            result = write_health_logs(batch, logs_path=self.health_logs_path)
+        except Exception:
+            self.synced -= len(batch)
+            self.failed.extend(datetime.strptime(data["date"], "%Y-%m-%d").date() for data, _ in batch)
+            raise
+        self.log(f"Health Logs: {len(result['written'])} written, {len(result['unchanged'])} unchanged")
+
+
+def load_roster(path) -> list:
+    with open(_expand(path), 'r', encoding='utf-8') as f:
+        roster = json.load(f)
+    accounts = roster.get("accounts", roster) if isinstance(roster, dict) else roster
+    names = [a["name"] for a in accounts]
+    if len(names) != len(set(names)):
+        raise ValueError("account names in the roster must be unique")
+    return accounts
+
+
+def run_roster(accounts: list, days: list, workers: int = 4) -> list:
+    """
+    Sync `days` for every account with a pool of `workers` threads.
+
+    Accounts sit in a heap keyed by when they're next allowed to run. A
+    worker pops the earliest ready account, syncs one day for it, and puts
+    it back - so turns rotate fairly, and accounts waiting on budget or a
+    throttle cooldown never occupy a worker.
+    """
+    jobs = [AccountJob(spec, days) for spec in accounts]
+    for job in jobs:
+        for path in (job.archive_path, job.health_logs_path, job.memory_path):
+            path.mkdir(parents=True, exist_ok=True)
+
+    ready = [(0.0, i) for i in range(len(jobs))]
+    heapq.heapify(ready)
+    in_flight = 0
+    cond = threading.Condition()
+
+    def next_job():
+        nonlocal in_flight
+        with cond:
+            while True:
+                if not ready:
+                    if in_flight == 0:
+                        return None
+                    cond.wait()
+                    continue
+                eligible_at, i = ready[0]
+                delay = eligible_at - time.monotonic()
+                if delay > 0:
+                    cond.wait(timeout=delay)
+                    continue
+                heapq.heappop(ready)
+                in_flight += 1
+                return jobs[i], i
+
+    def requeue(i: int, delay: float):
+        nonlocal in_flight
+        with cond:
+            in_flight -= 1
+            job = jobs[i]
+            if job.pending:
+                heapq.heappush(ready, (time.monotonic() + delay, i))
+            cond.notify_all()
+
+    def worker():
+        while True:
+            picked = next_job()
+            if picked is None:
+                return
+            job, i = picked
+            delay = 0.0
+            started = time.monotonic()
+            try:
+                if job.client is None:
+                    job.connect()
+                # Don't start a day we can't afford - wait in the queue instead
+                budget_wait = job.bucket.wait_time(CALLS_PER_DAY)
+                if budget_wait > 0:
+                    delay = budget_wait
+                else:
+                    delay = job.sync_one()
+                if not job.pending:
+                    job.flush()
+                    job.finished_at = time.monotonic()
+            except Exception as e:
+                job.error = str(e)
+                job.failed.extend(job.pending)
+                job.pending.clear()
+                job.log(f"failed: {e}")
+                # Days synced before the failure still get their Health Logs
+                try:
+                    job.flush()
+                except Exception as flush_error:
+                    job.log(f"Health Logs not written: {flush_error}")
+            finally:
+                job.busy_seconds += time.monotonic() - started
+                requeue(i, delay)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker, name=f"garmin-worker-{n}")
+               for n in range(max(1, min(workers, len(jobs))))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    report = []
+    for job in jobs:
+        report.append({
+            "account": job.name,
+            "synced": job.synced,
+            "failed": [d.isoformat() for d in job.failed],
+            "requests": job.requests,
+            "throttles": job.throttles,
+            "busy_seconds": round(job.busy_seconds, 1),
+            "finished_after": round(job.finished_at - started, 1) if job.finished_at else None,
+            "error": job.error,
+        })
+    return report
+
+
+def main():
+    print("=" * 50)
+    print("GARMIN MULTI-ACCOUNT SYNC")
+    print("=" * 50)
+
+    args = [a for a in sys.argv[1:]]
+    workers = 4
+    if "--workers" in args:
+        i = args.index("--workers")
+        try:
+            workers = int(args[i + 1])
+        except (IndexError, ValueError):
+            print("--workers needs a number")
+            return
+        del args[i:i + 2]
+
+    if not args:
+        print("Usage: python garmin_worker.py accounts.json [start] [end] [--workers N]")
+        return
+
+    try:
+        start = datetime.strptime(args[1], "%Y-%m-%d").date() if len(args) > 1 else date.today() - timedelta(days=1)
+        end = datetime.strptime(args[2], "%Y-%m-%d").date() if len(args) > 2 else start
+    except ValueError:
+        print(f"Invalid date format. Use YYYY-MM-DD. Got: {' '.join(args[1:])}")
+        return
+
+    accounts = load_roster(args[0])
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    print(f"\n{len(accounts)} accounts x {len(days)} days, {workers} workers")
+    print("-" * 50)
+
+    started = time.monotonic()
+    report = run_roster(accounts, days, workers=workers)
+
+    print("\n" + "-" * 50)
+    for row in report:
+        status = f"error: {row['error']}" if row["error"] else "ok"
+        print(f"{row['account']}: {row['synced']} synced, {len(row['failed'])} failed, "
+              f"{row['requests']} requests, {row['throttles']} throttles, "
+              f"finished after {row['finished_after']}s ({status})")
+    print(f"\nTotal: {time.monotonic() - started:.1f}s")
+    print("Embers Remember.")
+
+
+if __name__ == "__main__":
+    main()
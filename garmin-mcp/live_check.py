@@ -1,37 +1,88 @@
 """
 Quick live check - see what Garmin has right now
 No spoons required from Fox
+
+Usage:
+    python live_check.py                      # one-shot
+    python live_check.py --watch              # keep a live view open, refresh every 5 min
+    python live_check.py --watch --interval 120
+    python live_check.py --watch --adaptive   # refresh faster during stress, slower asleep
+
+Watch mode reuses the saved tokens and polls one endpoint per refresh
+(the daily summary, which carries steps, HR, stress and Body Battery);
+HRV only changes overnight so it's fetched once a day. Only values that
+changed are redrawn.
+
+--adaptive polls the stress (with Body Battery) and heart rate timelines
+instead, on garmin_cadence's schedule: every 2 minutes while stress or HR
+is climbing or Body Battery is dropping, backing off when things are
+steady or she's asleep, within GARMIN_CADENCE_BUDGET requests an hour.
+The daily summary, for steps and calories, is then only fetched every
+STATS_EVERY seconds.
 """
 
-from garminconnect import Garmin
+import os
+import sys
+import time
 from datetime import date, datetime
 from pathlib import Path
 from getpass import getpass
-import json
+
+from garmin_snapshot import snapshot_from_stats, write_snapshot
 
 TOKEN_STORE = Path.home() / ".garminconnect"
 
-def main():
-    print("\n=== LIVE GARMIN CHECK ===\n")
+DEFAULT_INTERVAL = 300       # seconds between refreshes in watch mode
+HRV_RETRY = 3600             # until last night's HRV shows up, look again this often
+STATS_EVERY = 1800           # --adaptive: how often the daily summary is refreshed
 
-    # Auth
-    email = input("Garmin Email: ")
-    password = getpass("Garmin Password: ")
+# (label, key in the daily summary, format) - everything here moves during the day
+WATCH_FIELDS = [
+    ("Steps", "totalSteps", "{}"),
+    ("Calories", "totalKilocalories", "{:.0f}"),
+    ("Active Minutes", "activeSeconds", lambda v: f"{v // 60}"),
+    ("Resting HR", "restingHeartRate", "{} bpm"),
+    ("HR Range", ("minHeartRate", "maxHeartRate"), "{}-{} bpm"),
+    ("Stress Avg", "averageStressLevel", "{}"),
+    ("Stress Max", "maxStressLevel", "{}"),
+    ("Body Battery", "bodyBatteryMostRecentValue", "{}"),
+    ("BB Charged", "bodyBatteryChargedValue", "+{}"),
+    ("BB Drained", "bodyBatteryDrainedValue", "-{}"),
+]
+
+HRV_FIELDS = [
+    ("HRV Last Night", "lastNight", "{}"),
+    ("HRV Weekly Avg", "weeklyAvg", "{}"),
+    ("HRV Status", "status", "{}"),
+]
+
+LABEL_WIDTH = 16
+VALUE_WIDTH = 18
 
-    client = Garmin(email, password)
+
+def get_client():
+    """Log in with saved tokens; only ask for email and password if that fails."""
+    from garminconnect import Garmin
 
     if TOKEN_STORE.exists():
         try:
-            client.login(TOKEN_STORE)
+            client = Garmin()
+            client.login(str(TOKEN_STORE))
             print("Using saved tokens\n")
-        except:
-            client.login()
-            client.garth.dump(TOKEN_STORE)
-    else:
-        client.login()
-        client.garth.dump(TOKEN_STORE)
-        print("Logged in, tokens saved\n")
+            return client
+        except Exception:
+            print("Saved tokens didn't work - logging in again")
+
+    email = input("Garmin Email: ")
+    password = getpass("Garmin Password: ")
+    client = Garmin(email, password)
+    client.login()
+    client.garth.dump(str(TOKEN_STORE))
+    print("Logged in, tokens saved\n")
+    return client
 
+
+def check_once(client):
     today = date.today().strftime("%Y-%m-%d")
     print(f"Checking data for: {today}\n")
     print("-" * 40)
@@ -41,7 +92,7 @@ def main():
         stats = client.get_stats(today)
         print(f"Steps: {stats.get('totalSteps', 'N/A')}")
         print(f"Calories: {stats.get('totalKilocalories', 'N/A')}")
-        print(f"Active Minutes: {stats.get('activeSeconds', 0) // 60}")
+        print(f"Active Minutes: {(stats.get('activeSeconds') or 0) // 60}")
     except Exception as e:
         print(f"Stats: {e}")
 
@@ -92,9 +143,196 @@ def main():
     except Exception as e:
         print(f"HRV: {e}")
 
+
+# === WATCH MODE ===
+
+def _format(source: dict, key, fmt) -> str:
+    keys = key if isinstance(key, tuple) else (key,)
+    values = [source.get(k) for k in keys]
+    if any(v is None for v in values):
+        return "-"
+    return fmt(*values) if callable(fmt) else fmt.format(*values)
+
+
+class WatchScreen:
+    """
+    Fixed layout, drawn once. Updates move the cursor to a value's row and
+    overwrite just that value, so nothing flickers and unchanged values
+    aren't touched.
+    """
+
+    def __init__(self, labels: list):
+        self.rows = {}
+        self.values = {}
+        lines = ["=== LIVE GARMIN WATCH ===", ""]
+        for label in labels:
+            if label is None:
+                lines.append("")
+                continue
+            self.rows[label] = len(lines) + 1
+            lines.append(f"{label + ':':<{LABEL_WIDTH}}")
+        lines.append("")
+        self.status_row = len(lines) + 1
+        sys.stdout.write("\x1b[2J\x1b[H" + "\n".join(lines) + "\n")
+        sys.stdout.flush()
+
+    def _put(self, row: int, col: int, text: str, width: int):
+        sys.stdout.write(f"\x1b[{row};{col}H{text:<{width}}")
+
+    def update(self, values: dict) -> int:
+        """Redraw the values that changed. Returns how many did."""
+        changed = 0
+        for label, value in values.items():
+            if label in self.rows and self.values.get(label) != value:
+                self._put(self.rows[label], LABEL_WIDTH + 1, value, VALUE_WIDTH)
+                self.values[label] = value
+                changed += 1
+        return changed
+
+    def status(self, text: str):
+        self._put(self.status_row, 1, text, 72)
+        sys.stdout.write(f"\x1b[{self.status_row + 1};1H")
+        sys.stdout.flush()
+
+
+def _adaptive_refresh(client, today: str, cadence, daily: dict) -> tuple:
+    """
+    One --adaptive refresh: the stress and heart rate timelines, plus the
+    daily summary when it's STATS_EVERY old. Feeds the cadence and returns
+    (stats, requests) with stats in the daily summary's shape.
+    """
+    from garmin_cadence import readings_from
+
+    requests = 0
+
+    def call(method):
+        nonlocal requests
+        requests += 1
+        cadence.spend(1)     # failed calls count against the budget too
+        return getattr(client, method)(today) or {}
+
+    if daily.get("date") != today or time.monotonic() - daily.get("at", 0) > STATS_EVERY:
+        daily.update(date=today, at=time.monotonic(), stats=call("get_stats"))
+    stress = call("get_all_day_stress")
+    hr = call("get_heart_rates")
+    readings = readings_from(stress, hr)
+    cadence.observe(readings)
+
+    # The timelines are newer than the daily summary, so their numbers win
+    stats = dict(daily["stats"])
+    fresher = {
+        "restingHeartRate": hr.get("restingHeartRate"),
+        "minHeartRate": hr.get("minHeartRate"),
+        "maxHeartRate": hr.get("maxHeartRate"),
+        "averageStressLevel": stress.get("avgStressLevel"),
+        "maxStressLevel": stress.get("maxStressLevel"),
+        "bodyBatteryMostRecentValue": readings["body_battery"][-1][1] if readings["body_battery"] else None,
+    }
+    stats.update({k: v for k, v in fresher.items() if v is not None})
+    return stats, requests
+
+
+def _upcoming_requests(cadence, daily: dict, hrv: dict, hrv_checked: float) -> int:
+    """What the next --adaptive refresh will cost, if it comes after the cadence's interval."""
+    from garmin_cadence import REQUESTS_PER_REFRESH
+    then = time.monotonic() + cadence.interval
+    stats_due = then - daily.get("at", 0) > STATS_EVERY
+    hrv_due = not hrv and then - hrv_checked > HRV_RETRY
+    return REQUESTS_PER_REFRESH + int(stats_due) + int(hrv_due)
+
+
+def watch(client, interval: int = DEFAULT_INTERVAL, adaptive: bool = False):
+    if os.name == "nt":
+        os.system("")   # switch on ANSI escape handling in the Windows console
+
+    labels = [label for label, _, _ in WATCH_FIELDS] + [None] + [label for label, _, _ in HRV_FIELDS]
+    screen = WatchScreen(labels)
+
+    cadence = None
+    if adaptive:
+        from garmin_cadence import Cadence
+        cadence = Cadence()
+    daily = {}
+
+    requests = 0
+    hrv = {}
+    hrv_day, hrv_checked = None, 0.0
+
+    while True:
+        today = date.today().strftime("%Y-%m-%d")
+        values = {}
+        note = ""
+
+        try:
+            if cadence:
+                stats, spent = _adaptive_refresh(client, today, cadence, daily)
+                requests += spent
+            else:
+                stats = client.get_stats(today) or {}
+                requests += 1
+            values.update({label: _format(stats, key, fmt) for label, key, fmt in WATCH_FIELDS})
+        except Exception as e:
+            stats = None
+            note = f"stats failed: {e}"
+
+        # HRV is last night's number - once we have it for today, leave it be
+        if hrv_day != today or (not hrv and time.monotonic() - hrv_checked > HRV_RETRY):
+            try:
+                requests += 1
+                if cadence:
+                    cadence.spend(1)
+                data = client.get_hrv_data(today)
+                hrv = (data or {}).get("hrvSummary") or {}
+                hrv_day, hrv_checked = today, time.monotonic()
+            except Exception as e:
+                note = note or f"HRV failed: {e}"
+            values.update({label: _format(hrv, key, fmt) if hrv else "not yet"
+                           for label, key, fmt in HRV_FIELDS})
+
+        changed = screen.update(values)
+        if stats:
+            try:
+                write_snapshot(snapshot_from_stats(stats, hrv, today))
+            except OSError:
+                pass
+
+        if cadence:
+            wait = int(cadence.next_interval(requests=_upcoming_requests(cadence, daily, hrv, hrv_checked)))
+        else:
+            wait = interval
+        mode = f"{cadence.state}: {cadence.reason}  " if cadence else ""
+        screen.status(f"{datetime.now():%H:%M:%S}  {changed} changed  {requests} requests  "
+                      f"{mode}next in {wait}s  (Ctrl+C to stop)  {note}"[:72])
+        time.sleep(wait)
+
+
+def main():
+    args = sys.argv[1:]
+    interval = DEFAULT_INTERVAL
+    if "--interval" in args:
+        try:
+            interval = max(30, int(args[args.index("--interval") + 1]))
+        except (IndexError, ValueError):
+            print("--interval needs a number of seconds")
+            return
+
+    print("\n=== LIVE GARMIN CHECK ===\n")
+    client = get_client()
+
+    if "--watch" in args:
+        try:
+            watch(client, interval, adaptive="--adaptive" in args)
+        except KeyboardInterrupt:
+            print("\nStopped.")
+            print("Embers Remember.")
+        return
+
+    check_once(client)
+
     print("\n" + "-" * 40)
     print("Embers Remember.")
     print()
 
+
 if __name__ == "__main__":
     main()
@@ -1,18 +1,123 @@
-"""Quick check using saved tokens - zero spoons required"""
-from garminconnect import Garmin
-from pathlib import Path
+"""
+Quick check - zero spoons required
+
+Reads the local snapshot that the sync, live_check --watch and the MCP
+server keep fresh, and only goes to Garmin when it's too old.
+
+Usage:
+    python quick_check.py                  # snapshot if under 10 min old, else live
+    python quick_check.py --max-age 3600   # accept a snapshot up to an hour old
+    python quick_check.py --live           # always ask Garmin
+    python quick_check.py --timing
+"""
+import sys
+import time
+
+_STARTED = time.perf_counter()
+
 from datetime import date
+from pathlib import Path
+
+from garmin_snapshot import (
+    SNAPSHOT_MAX_AGE,
+    is_fresh,
+    read_snapshot,
+    snapshot_age,
+    snapshot_from_stats,
+    write_snapshot,
+)
+
+TOKEN_STORE = str(Path.home() / ".garminconnect")
+
+
+def _age_text(seconds: float) -> str:
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+def fetch_live(timings: dict) -> dict:
+    """
+    The daily summary and HRV in parallel, saved as the new snapshot - the
+    same calls and shape as live_check --watch and the sync daemon's.
+    """
+    t = time.perf_counter()
+    # Imported here so the snapshot path never pays for garminconnect
+    from concurrent.futures import ThreadPoolExecutor
+    from garminconnect import Garmin
+    timings["import"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    client = Garmin()
+    client.login(TOKEN_STORE)
+    timings["token_load"] = time.perf_counter() - t
+
+    today = date.today().strftime("%Y-%m-%d")
+
+    # The two calls don't depend on each other - one round-trip instead of two
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        stats_f = pool.submit(client.get_stats, today)
+        hrv_f = pool.submit(client.get_hrv_data, today)
+        stats = stats_f.result() or {}
+        try:
+            hrv = (hrv_f.result() or {}).get("hrvSummary") or {}
+        except Exception:
+            hrv = {}     # only there after a night's sleep - not worth failing over
+    timings["fetch"] = time.perf_counter() - t
+
+    result = snapshot_from_stats(stats, hrv, today)
+    try:
+        write_snapshot(result)
+    except OSError:
+        pass
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    timings = {}
+    max_age = SNAPSHOT_MAX_AGE
+    if "--max-age" in args:
+        try:
+            max_age = int(args[args.index("--max-age") + 1])
+        except (IndexError, ValueError):
+            print("--max-age needs a number of seconds")
+            return
+
+    t = time.perf_counter()
+    snapshot = read_snapshot()
+    timings["snapshot_load"] = time.perf_counter() - t
+
+    if snapshot and "--live" not in args and is_fresh(snapshot, max_age):
+        result, source = snapshot, f"snapshot, {_age_text(snapshot_age(snapshot))} old"
+    else:
+        try:
+            result, source = fetch_live(timings), "live"
+        except Exception as e:
+            if not snapshot:
+                raise
+            # Offline or tokens gone - an old answer beats none
+            result = snapshot
+            source = f"snapshot from {snapshot.get('date')}, {_age_text(snapshot_age(snapshot))} old - live check failed: {e}"
 
-client = Garmin()
-client.login(str(Path.home() / ".garminconnect"))
+    hr = result.get("heart_rate") or {}
+    stress = result.get("stress") or {}
+    bb = result.get("body_battery") or {}
+    shown = lambda v, missing="N/A": missing if v is None else v
+    print(f"HR: {shown(hr.get('resting'))} bpm")
+    print(f"Stress: {shown(stress.get('avg'))} avg, {shown(stress.get('max'))} max")
+    print(f"Body Battery: +{shown(bb.get('charged'), '?')} / -{shown(bb.get('drained'), '?')}")
+    print(f"({source})")
 
-today = date.today().strftime("%Y-%m-%d")
+    if "--timing" in args:
+        timings["total"] = time.perf_counter() - _STARTED
+        print()
+        for name, seconds in timings.items():
+            print(f"  {name}: {seconds * 1000:.1f} ms")
 
-hr = client.get_heart_rates(today)
-stress = client.get_all_day_stress(today)
-bb = client.get_body_battery(today, today)
-day = bb[0] if bb and len(bb) > 0 else {}
 
-print(f"HR: {hr.get('restingHeartRate', 'N/A')} bpm")
-print(f"Stress: {stress.get('avgStressLevel', 'N/A')} avg, {stress.get('maxStressLevel', 'N/A')} max")
-print(f"Body Battery: +{day.get('charged', '?')} / -{day.get('drained', '?')}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+@echo off
+echo.
+echo === GARMIN SYNC DAEMON FOR FOX ===
+echo.
+
+cd /d "C:\Users\Cindy\AI\garmin"
+
+REM Runs until closed - syncs on schedule, catches up after sleep
+"C:\Users\Cindy\.local\bin\uv.exe" run --with "garminconnect @ git+https://github.com/cindiekinzz-coder/python-garminconnect.git" python garmin_sync.py --daemon %*
@@ -0,0 +1,100 @@
+"""
+Shared fixtures. The scripts read their directories from the environment
+at import time, so point them all at a scratch directory before any test
+module imports them.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_scratch = Path(tempfile.mkdtemp(prefix="garmin-mcp-tests-"))
+for name in ("GARMIN_DATA_PATH", "HEALTH_LOGS_PATH", "COMPANION_MEMORY_PATH"):
+    os.environ[name] = str(_scratch / name.lower())
+os.environ.pop("BINARY_HOME_URL", None)
+os.environ.pop("GARMIN_PERF", None)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pytest  # noqa: E402
+
+import garmin_archive  # noqa: E402
+
+
+def make_day(date_str: str, resting: int = 60, stress: int = 30, charged: int = 40, drained: int = 35) -> dict:
+    """A synced day record shaped like fetch_health_data's output."""
+    return {
+        "date": date_str,
+        "fetched_at": "2026-01-07T08:00:00",
+        "metrics": {
+            "heart_rate": {"resting": resting, "max": 120, "min": 50},
+            "stress": {"avg": stress, "max": 80},
+            "body_battery": {"charged": charged, "drained": drained},
+            "sleep": {"total_minutes": 420, "total_formatted": "7h 0m"},
+        },
+        "intraday": {
+            "heart_rate": [[1767772800000, 58], [1767772920000, 61]],
+            "body_battery": [[1767772800000, 42]],
+        },
+        "endpoints": {"get_stats": {"totalSteps": 4200, "lastSyncTimestampGMT": "2026-01-07T07:59:12"}},
+    }
+
+
+@pytest.fixture
+def archive_path(tmp_path, monkeypatch):
+    """A fresh archive directory, used by every garmin_archive call that doesn't pass one."""
+    path = tmp_path / "archive"
+    monkeypatch.setattr(garmin_archive, "ARCHIVE_PATH", path)
+    return path
+
+
+class FakeGarminClient:
+    """
+    Answers the sync's endpoints with fixed numbers; `resting` and `steps`
+    can be changed between syncs. With volatile=True the daily summary's
+    sync timestamp changes on every call, as Garmin's does.
+    """
+
+    def __init__(self, resting: int = 60, steps: int = 4200, volatile: bool = False):
+        self.resting, self.steps, self.volatile = resting, steps, volatile
+        self.synced_at = 0
+
+    def get_stats(self, date_str):
+        if self.volatile:
+            self.synced_at += 1
+        return {"totalSteps": self.steps, "totalKilocalories": 1800, "activeSeconds": 1200,
+                "bodyBatteryMostRecentValue": 42, "lastSyncTimestampGMT": self.synced_at}
+
+    def get_heart_rates(self, date_str):
+        return {"restingHeartRate": self.resting, "maxHeartRate": 120, "minHeartRate": 50,
+                "heartRateValues": [[1767772800000, 58], [1767772920000, 61]]}
+
+    def get_hrv_data(self, date_str):
+        return {"hrvSummary": {"lastNight": 38, "weeklyAvg": 41, "status": "BALANCED"}}
+
+    def get_all_day_stress(self, date_str):
+        return {"avgStressLevel": 30, "maxStressLevel": 70,
+                "stressValuesArray": [[1767772800000, 25], [1767772980000, -1]],
+                "bodyBatteryValuesArray": [[1767772800000, "MEASURED", 42, 1.0]]}
+
+    def get_body_battery(self, start, end):
+        return [{"charged": 40, "drained": 35}]
+
+    def get_sleep_data(self, date_str):
+        return {"dailySleepDTO": {"sleepTimeSeconds": 25200, "deepSleepSeconds": 3600}}
+
+
+@pytest.fixture
+def sync_dirs(tmp_path, archive_path, monkeypatch):
+    """Health Logs, companion memory and the archive in tmp_path; no request budget or dashboard push."""
+    import garmin_endpoints
+    import garmin_sync
+
+    paths = {"logs": tmp_path / "health-logs", "memory": tmp_path / "companion-memory", "archive": archive_path}
+    paths["logs"].mkdir()
+    monkeypatch.setattr(garmin_sync, "HEALTH_LOGS_PATH", paths["logs"])
+    monkeypatch.setattr(garmin_sync, "COMPANION_MEMORY_PATH", paths["memory"])
+    monkeypatch.setattr(garmin_sync, "BINARY_HOME_URL", "")
+    monkeypatch.setattr(garmin_endpoints, "DEFAULT_BUDGET", False)
+    return paths
@@ -0,0 +1,75 @@
+import multiprocessing
+
+import pytest
+
+from conftest import make_day
+from garmin_archive import compact, day_ref, get_day, is_archived, iter_days, load_index, put_day, resolve_ref
+
+
+def _archive_days(archive_path, dates):
+    for date_str in dates:
+        put_day(make_day(date_str, resting=int(date_str[-2:])), archive_path)
+
+
+def test_put_day_skips_identical_record(archive_path):
+    assert put_day(make_day("2026-01-05")) is True
+    assert put_day(make_day("2026-01-05")) is False
+    assert is_archived(make_day("2026-01-05"))
+    assert not is_archived(make_day("2026-01-05", resting=52))
+
+
+def test_concurrent_processes_keep_every_frame(archive_path):
+    # Forked processes writing the same month file and index at once
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("needs fork")
+    context = multiprocessing.get_context("fork")
+    batches = [[f"2026-01-{d:02d}" for d in range(start, 29, 4)] for start in range(1, 5)]
+    workers = [context.Process(target=_archive_days, args=(archive_path, batch)) for batch in batches]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    assert len(load_index("2026-01", archive_path)["days"]) == 28
+    for day in range(1, 29):
+        record = get_day(f"2026-01-{day:02d}", archive_path)
+        assert record["metrics"]["heart_rate"]["resting"] == day
+
+
+def test_resolve_ref_reports_resyncs(archive_path):
+    first = make_day("2026-01-05")
+    put_day(first)
+    ref = day_ref(first)
+
+    assert resolve_ref(ref) == (get_day("2026-01-05"), "current")
+
+    put_day(make_day("2026-01-05", resting=52))
+    record, status = resolve_ref(ref)
+    assert status == "resynced"
+    assert record["metrics"]["heart_rate"]["resting"] == 52
+
+    assert resolve_ref({"date": "2026-01-09", "sha": "x"}) == (None, "missing")
+
+
+def test_compact_keeps_the_old_file_readable_until_the_index_moves(archive_path):
+    for resting in (50, 51, 52):
+        put_day(make_day("2026-01-05", resting=resting))
+    put_day(make_day("2026-01-06"))
+    before = load_index("2026-01")
+
+    # A reader that loaded the index before compaction and opened its file
+    with open(archive_path / before["file"], 'rb') as stale:
+        assert compact("2026-01") > 0
+        stale.seek(before["days"]["2026-01-05"]["offset"])
+        assert stale.read(before["days"]["2026-01-05"]["length"])
+
+    after = load_index("2026-01")
+    assert after["file"] != before["file"]
+    assert not (archive_path / before["file"]).exists()
+    assert get_day("2026-01-05")["metrics"]["heart_rate"]["resting"] == 52
+    assert [d["date"] for d in iter_days()] == ["2026-01-05", "2026-01-06"]
+
+    put_day(make_day("2026-01-07"))
+    compact("2026-01")
+    assert sorted(p.name for p in archive_path.glob("2026-01*.jsonl*")) == [load_index("2026-01")["file"]]
@@ -0,0 +1,58 @@
+import time
+
+import garmin_cadence
+from garmin_cadence import Cadence, RequestBudget, assess, readings_from, simulate, synthetic_day
+
+
+def test_body_battery_level_from_every_entry_shape():
+    stress = {"bodyBatteryValuesArray": [
+        [1000, 40],
+        [2000, "MEASURED", 41],
+        [3000, "MEASURED", 42, 1.0],
+        [4000, "MEASURED", None],
+    ]}
+
+    readings = readings_from(stress, {})
+
+    assert readings["body_battery"] == [(1000, 40), (2000, 41), (3000, 42)]
+
+
+def test_assess_takes_three_element_body_battery():
+    now = 60 * 60000
+    stress = {"bodyBatteryValuesArray": [[now - m * 60000, "MEASURED", 50 + m] for m in range(0, 40, 3)]}
+
+    state, reason = assess(readings_from(stress, {}), now)
+
+    assert state == "active"
+    assert reason.startswith("Body Battery falling")
+
+
+def test_next_interval_reserves_the_whole_refresh():
+    cadence = Cadence(RequestBudget(per_hour=10))
+    cadence.spend(8, now=0)
+
+    assert cadence.next_interval(now=0) == cadence.interval
+    assert cadence.next_interval(now=0, requests=4) == 3600
+
+
+def test_idle_in_waking_hours_stays_at_stable_max(monkeypatch):
+    monkeypatch.setattr(garmin_cadence, "WAKING_HOURS", (0, 24))
+    cadence = Cadence(RequestBudget())
+
+    assert cadence.observe({}, now=time.time()) in ("idle", "asleep")
+    assert cadence.interval == garmin_cadence.STABLE_MAX
+
+    monkeypatch.setattr(garmin_cadence, "WAKING_HOURS", (0, 0))
+    cadence.observe({}, now=time.time())
+    assert cadence.interval == garmin_cadence.SLEEP_INTERVAL
+
+
+def test_simulate_counts_every_request():
+    from live_check import DEFAULT_INTERVAL, STATS_EVERY
+
+    result = simulate(synthetic_day("2026-01-06"), "2026-01-06")
+
+    watch, adaptive = result["watch"], result["adaptive"]
+    assert watch["requests"] == 86400 // DEFAULT_INTERVAL + 1
+    # two timelines a refresh, the daily summary at least every STATS_EVERY, HRV once
+    assert adaptive["requests"] >= 2 * adaptive["refreshes"] + 86400 // (STATS_EVERY * 2) + 1
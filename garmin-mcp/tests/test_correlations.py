@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import garmin_correlations
+from garmin_correlations import build, lagged_correlations
+
+
+def test_masked_pearson_matches_corrcoef_on_pairwise_complete_days():
+    rng = np.random.default_rng(3)
+    bio = rng.normal(size=(60, 3))
+    eq = rng.normal(size=(60, 2)) + bio[:, :2]
+    bio[rng.random(bio.shape) < 0.2] = np.nan
+    eq[rng.random(eq.shape) < 0.2] = np.nan
+
+    for lag in (0, 2):
+        r, n, _, _ = lagged_correlations(bio, eq, lag)
+        a, b = bio[:len(bio) - lag], eq[lag:]
+        for i in range(bio.shape[1]):
+            for j in range(eq.shape[1]):
+                both = ~np.isnan(a[:, i]) & ~np.isnan(b[:, j])
+                assert n[i, j] == both.sum()
+                assert r[i, j] == pytest.approx(np.corrcoef(a[both, i], b[both, j])[0, 1])
+
+
+def test_build_skips_the_correlations_when_nothing_changed(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_correlations, "CORRELATIONS_PATH", tmp_path)
+    monkeypatch.setattr(garmin_correlations, "RESULTS_FILE", tmp_path / "correlations.json")
+    days = [f"2026-01-{d:02d}" for d in range(1, 29)]
+    biometrics = {d: {"sha": d, "row": {"stress_avg": float(i % 7)}} for i, d in enumerate(days)}
+    emotions = {d: {"observations": i % 3} for i, d in enumerate(days)}
+    monkeypatch.setattr(garmin_correlations, "update_biometrics", lambda full=False: biometrics)
+    monkeypatch.setattr(garmin_correlations, "emotional_rows", lambda db_path=None: emotions)
+    built = []
+    feature_matrix = garmin_correlations.feature_matrix
+    monkeypatch.setattr(garmin_correlations, "feature_matrix",
+                        lambda *args: built.append(1) or feature_matrix(*args))
+
+    first = build()
+    assert build() == first
+    assert len(built) == 1
+
+    emotions[days[-1]]["observations"] += 1
+    assert build()["inputs"] != first["inputs"]
+    assert len(built) == 2
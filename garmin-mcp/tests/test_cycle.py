@@ -0,0 +1,80 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import garmin_cycle
+
+
+def summary(day_in_cycle: int, start: str = None, **extra) -> dict:
+    s = {"dayInCycle": day_in_cycle, "predictedCycleLength": 28, "periodLength": 5,
+         "fertileWindowStart": 12, "lengthOfFertileWindow": 6}
+    if start:
+        s["startDate"] = start
+    return dict(s, **extra)
+
+
+def test_phase_one_always_starts_on_day_one():
+    odd = summary(3, currentPhase=1, daysUntilNextPhase=3, lengthOfCurrentPhase=4)
+    cycle = garmin_cycle._cycle_from_summary(odd, date(2026, 3, 3))
+    assert cycle["phase_starts"]["1"] == 1
+
+    calendar = garmin_cycle._empty()
+    garmin_cycle.record_summary(odd, "2026-03-03", calendar, save=False)
+    day_one = garmin_cycle.lookup("2026-03-01", calendar)
+    assert (day_one["dayInCycle"], day_one["currentPhase"]) == (1, 1)
+
+
+def test_lookup_projects_past_the_latest_cycle():
+    calendar = garmin_cycle._empty()
+    garmin_cycle.record_summary(summary(2), "2026-03-02", calendar, save=False)
+
+    later = garmin_cycle.lookup("2026-03-31", calendar)
+
+    assert later["startDate"] == "2026-03-29"
+    assert later["dayInCycle"] == 3
+    assert later["source"] == "projected"
+    assert garmin_cycle.lookup("2026-02-28", calendar) is None
+
+
+def test_newer_cycle_fixes_the_previous_length():
+    calendar = garmin_cycle._empty()
+    garmin_cycle.record_summary(summary(3), "2026-02-03", calendar, save=False)
+    garmin_cycle.record_summary(summary(2), "2026-03-04", calendar, save=False)
+
+    assert calendar["cycles"]["2026-02-01"]["length"] == 30
+    assert garmin_cycle.lookup("2026-03-01", calendar)["source"] == "recorded"
+
+
+def test_redated_cycle_replaces_the_old_start():
+    calendar = garmin_cycle._empty()
+    garmin_cycle.record_summary(summary(3), "2026-02-03", calendar, save=False)
+    garmin_cycle.record_summary(summary(2), "2026-03-02", calendar, save=False)
+    # Period logged late: Garmin now dates this cycle from the 4th
+    garmin_cycle.record_summary(summary(2), "2026-03-05", calendar, save=False)
+
+    assert sorted(calendar["cycles"]) == ["2026-02-01", "2026-03-04"]
+    assert calendar["cycles"]["2026-02-01"]["length"] == 31
+    assert garmin_cycle.lookup("2026-03-02", calendar)["startDate"] == "2026-02-01"
+
+    # An older reading seen afterwards doesn't bring the old start back
+    garmin_cycle.record_summary(summary(3), "2026-03-03", calendar, save=False)
+    assert sorted(calendar["cycles"]) == ["2026-02-01", "2026-03-04"]
+
+
+def test_cycle_summary_asks_garmin_only_when_due(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_cycle, "CALENDAR_FILE", tmp_path / "cycle-calendar.json")
+    today = date.today()
+    calls = []
+
+    def fetch(day):
+        calls.append(day)
+        return {"daySummary": summary(2, start=(today - timedelta(days=1)).isoformat())}
+
+    first = garmin_cycle.cycle_summary(today.isoformat(), fetch)
+    second = garmin_cycle.cycle_summary(today.isoformat(), fetch)
+
+    assert first["source"] == "garmin"
+    assert second["dayInCycle"] == 2
+    assert calls == [today.isoformat()]
+    assert json.loads((tmp_path / "cycle-calendar.json").read_text())["observed_on"] == today.isoformat()
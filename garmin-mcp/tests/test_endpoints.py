@@ -0,0 +1,31 @@
+from datetime import date, timedelta
+
+import garmin_archive
+import garmin_endpoints
+from conftest import FakeGarminClient, make_day
+from garmin_endpoints import TokenBucket, hedged_fetch
+
+
+def test_hedged_fetch_prefers_the_primary():
+    assert hedged_fetch([lambda: {"primary": 1}, lambda: {"fallback": 1}], hedge_after=0) == (0, {"primary": 1})
+    assert hedged_fetch([lambda: None, lambda: {"fallback": 1}], hedge_after=0) == (1, {"fallback": 1})
+
+
+def test_only_live_requests_spend_the_budget(archive_path, monkeypatch):
+    import garmin_mcp_server as server
+    budget = TokenBucket(10)
+    monkeypatch.setattr(garmin_endpoints, "DEFAULT_BUDGET", budget)
+    monkeypatch.setattr(server, "_client", FakeGarminClient())
+    monkeypatch.setattr(server, "_live_cache", {})
+    past = (date.today() - timedelta(days=3)).isoformat()
+    archived = make_day(past)
+    archived["endpoints"]["get_heart_rates"] = {"restingHeartRate": 58}
+    garmin_archive.put_day(archived)
+
+    assert server.fetch_day("get_heart_rates", past) == {"restingHeartRate": 58}
+    assert budget.tokens > 9.5                      # answered from the archive
+
+    today = date.today().isoformat()
+    server.fetch_day("get_heart_rates", today)
+    server.fetch_day("get_heart_rates", today)      # shared live response
+    assert 8.5 < budget.tokens < 9.5
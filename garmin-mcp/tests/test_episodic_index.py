@@ -0,0 +1,54 @@
+import json
+
+from episodic_index import INDEX_FILE, MEMORY_FILE, EpisodicIndex, update_index
+
+
+def _entry(day: int, padding: int = 0) -> dict:
+    date_str = f"2026-01-{day:02d}"
+    return {"type": "entity", "name": f"Garmin_Sync_{date_str}", "entityType": "biometric_log",
+            "observations": [{"text": f"Day {day}" + " " * padding, "added": date_str}]}
+
+
+def _write(memory_path, entries: list, mode: str = 'w'):
+    with open(memory_path / MEMORY_FILE, mode, encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+
+def test_lookups_and_incremental_append(tmp_path):
+    _write(tmp_path, [_entry(day) for day in range(1, 8)])
+    _write(tmp_path, [{"type": "entity", "name": "Fox", "entityType": "person", "observations": []}], 'a')
+    index = EpisodicIndex(tmp_path)
+
+    week = index.query("biometric_log", "2026-01-02", "2026-01-04")
+    assert [e["name"] for e in week] == [f"Garmin_Sync_2026-01-0{d}" for d in (4, 3, 2)]
+    assert index.get("Fox")[0]["entityType"] == "person"
+    assert index.stats()["types"] == {"biometric_log": 7, "person": 1}
+
+    _write(tmp_path, [_entry(8)], 'a')
+    assert update_index(tmp_path) == {"entries": 9, "parsed": 1, "rebuilt": False}
+    assert index.get("Garmin_Sync_2026-01-08")
+
+
+def test_rewrite_behind_an_unchanged_head_is_rebuilt(tmp_path):
+    # Long entries, so the first HEAD_BYTES are all in the first few
+    entries = [_entry(day, padding=600) for day in range(1, 29)]
+    _write(tmp_path, entries)
+    update_index(tmp_path)
+
+    # Slim one entry in the middle, then append enough that the file is bigger than before
+    entries[14] = _entry(15)
+    entries += [_entry(29, padding=2000)]
+    _write(tmp_path, entries)
+
+    assert update_index(tmp_path)["rebuilt"] is True
+    index = EpisodicIndex(tmp_path)
+    assert [e["name"] for e in index.query("biometric_log", "2026-01-16", "2026-01-16")] == ["Garmin_Sync_2026-01-16"]
+    assert index.get("Garmin_Sync_2026-01-29")
+
+
+def test_old_index_format_is_rebuilt(tmp_path):
+    _write(tmp_path, [_entry(1)])
+    (tmp_path / INDEX_FILE).write_bytes(b"EPIDX001" + b"\0" * 80)
+
+    assert update_index(tmp_path)["rebuilt"] is True
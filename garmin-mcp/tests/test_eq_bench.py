@@ -0,0 +1,28 @@
+import sqlite3
+
+import pytest
+
+import eq_bench
+
+
+def test_db_with_data_needs_reuse_or_append(tmp_path, monkeypatch, capsys):
+    db_path = tmp_path / "mirror.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE Pillar_Observations (id INTEGER PRIMARY KEY)")
+    conn.execute("INSERT INTO Pillar_Observations VALUES (1)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(eq_bench, "generate", lambda conn, n: pytest.fail("generated into a database with data"))
+    monkeypatch.setattr("sys.argv", ["eq_bench.py", "--db", str(db_path)])
+
+    eq_bench.main()
+
+    assert "already has data" in capsys.readouterr().out
+    assert sqlite3.connect(db_path).execute("SELECT COUNT(*) FROM Pillar_Observations").fetchone() == (1,)
+
+
+def test_parse_args():
+    assert eq_bench.parse_args(["--db", "x.db", "--append"])[1:] == (eq_bench.Path("x.db"), False, True)
+    assert eq_bench.has_data(eq_bench.Path("missing.db")) is False
+    with pytest.raises(ValueError):
+        eq_bench.parse_args(["--reuse", "--append"])
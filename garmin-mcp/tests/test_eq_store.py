@@ -0,0 +1,94 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import eq_store
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    """A worker like the real one: /observations takes only a limit, newest first."""
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status: int, body: dict):
+            raw = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            limit = int(parse_qs(url.query).get("limit", ["10"])[0])
+            self._reply(200, {"observations": server.observations[::-1][:limit]})
+
+        def do_POST(self):
+            if self.path != "/emotion":
+                return self._reply(404, {"error": "not found"})
+            length = int(self.headers.get("Content-Length", 0))
+            server.emotions.append(json.loads(self.rfile.read(length)))
+            self._reply(200, {"success": True})
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.observations, server.emotions = [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(eq_store, "PULL_PAGE", 4)
+    yield server, tmp_path / "eq.db"
+    server.shutdown()
+    eq_store.close_connections()
+
+
+def observation(i: int) -> dict:
+    return {"id": i, "content": f"note {i}", "emotion": "calm", "pillar": "SELF_AWARENESS",
+            "observed_at": f"2026-01-07T{i // 60:02d}:{i % 60:02d}:00"}
+
+
+def mirrored_count(db_path) -> int:
+    return eq_store.get_connection(db_path).execute("SELECT COUNT(*) FROM Pillar_Observations").fetchone()[0]
+
+
+def test_pull_catches_up_past_one_page(worker):
+    server, db_path = worker
+    server.observations = [observation(i) for i in range(3)]
+    assert eq_store.pull_from_cloud(server.url, db_path) == 3
+
+    server.observations += [observation(i) for i in range(3, 20)]
+    assert eq_store.pull_from_cloud(server.url, db_path) == 17
+    assert eq_store.pull_from_cloud(server.url, db_path) == 0
+    assert mirrored_count(db_path) == 20
+    assert not eq_store.pull_truncated(db_path)
+
+
+def test_pull_records_when_it_hits_the_page_cap(worker, monkeypatch):
+    server, db_path = worker
+    monkeypatch.setattr(eq_store, "PULL_MAX", 8)
+    server.observations = [observation(i) for i in range(3)]
+    eq_store.pull_from_cloud(server.url, db_path)
+
+    server.observations += [observation(i) for i in range(3, 20)]
+    assert eq_store.pull_from_cloud(server.url, db_path) == 8
+    assert eq_store.pull_truncated(db_path)
+
+    server.observations.append(observation(20))
+    assert eq_store.pull_from_cloud(server.url, db_path) == 1
+    assert not eq_store.pull_truncated(db_path)
+
+
+def test_push_sends_latest_local_emotion_once(worker):
+    server, db_path = worker
+    eq_store.add_observation("pulled", emotion="calm", cloud_id="c1", db_path=db_path)
+    eq_store.add_observation("first", emotion="dread", db_path=db_path)
+    eq_store.add_observation("second", emotion="relief", db_path=db_path)
+
+    assert eq_store.push_to_cloud(server.url, db_path) == 1
+    assert eq_store.push_to_cloud(server.url, db_path) == 0
+    assert server.emotions == [{"who": "alex", "emotion": "relief"}]
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import garmin_export  # noqa: E402
+from conftest import make_day  # noqa: E402
+from garmin_archive import put_day  # noqa: E402
+
+
+@pytest.fixture
+def export(tmp_path, archive_path, monkeypatch):
+    monkeypatch.setattr(garmin_export, "GARMIN_DATA_PATH", tmp_path)   # no legacy raw JSON
+    return tmp_path / "export"
+
+
+def test_incremental_export_skips_unchanged_days(export):
+    put_day(make_day("2026-01-05"))
+    put_day(make_day("2026-01-06"))
+
+    assert garmin_export.export_history(export)["days"] == 2
+    assert garmin_export.export_history(export)["days"] == 0
+
+
+def test_resynced_day_is_reexported_without_duplicates(export):
+    put_day(make_day("2026-01-05"))
+    put_day(make_day("2026-01-06", resting=60))
+    garmin_export.export_history(export)
+
+    put_day(make_day("2026-01-06", resting=57))
+    put_day(make_day("2026-02-01"))
+    stats = garmin_export.export_history(export)
+
+    assert stats["rewritten_months"] == 1
+    daily = garmin_export.load_daily(out=export).to_pydict()
+    assert [str(d) for d in daily["date"]] == ["2026-01-05", "2026-01-06", "2026-02-01"]
+    assert daily["resting_hr"] == [60, 57, 60]
+
+
+def test_manifest_from_before_shas_is_rewritten_once(export):
+    put_day(make_day("2026-01-05"))
+    garmin_export.export_history(export)
+    garmin_export.save_manifest(export, dict.fromkeys(garmin_export.load_manifest(export)))
+
+    assert garmin_export.export_history(export)["rewritten_months"] == 1
+    assert garmin_export.export_history(export)["days"] == 0
+    assert len(garmin_export.load_daily(out=export)) == 1
@@ -0,0 +1,34 @@
+import json
+from datetime import date
+
+import pytest
+
+import garmin_json
+from conftest import make_day
+
+RECORD = dict(make_day("2026-01-06"), note="Müde – 7h", on=date(2026, 1, 6), big=2 ** 70)
+
+
+@pytest.mark.parametrize("backend", garmin_json._AVAILABLE)
+def test_every_backend_writes_what_stdlib_json_writes(backend):
+    dumps, loads = garmin_json._BACKENDS[backend]
+
+    for indent in (False, True):
+        for sort_keys in (False, True):
+            expected = json.dumps(RECORD, indent=2 if indent else None, sort_keys=sort_keys,
+                                  separators=None if indent else (",", ":"), ensure_ascii=False, default=str)
+            assert dumps(RECORD, indent, sort_keys).decode("utf-8") == expected
+    assert loads(dumps(RECORD)) == json.loads(json.dumps(RECORD, default=str))
+
+
+@pytest.mark.parametrize("backend", garmin_json._AVAILABLE)
+def test_bad_input_raises_value_error(backend, monkeypatch):
+    monkeypatch.setattr(garmin_json, "_loads", garmin_json._BACKENDS[backend][1])
+    with pytest.raises(ValueError):
+        garmin_json.loads(b'{"date": ')
+
+
+def test_api_returns_text_and_bytes():
+    assert garmin_json.dumps({"a": [1, 2]}) == '{"a":[1,2]}'
+    assert garmin_json.dumps_bytes({"a": 1}, indent=2) == b'{\n  "a": 1\n}'
+    assert garmin_json.loads('{"a": 1}') == {"a": 1}
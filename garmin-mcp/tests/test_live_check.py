@@ -0,0 +1,51 @@
+import live_check
+from conftest import FakeGarminClient
+from garmin_cadence import Cadence, RequestBudget
+from live_check import WatchScreen, _adaptive_refresh, _format
+
+
+class TimelineClient(FakeGarminClient):
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def __getattribute__(self, name):
+        if name.startswith("get_"):
+            object.__getattribute__(self, "calls").append(name)
+        return object.__getattribute__(self, name)
+
+
+def test_format_handles_missing_and_paired_values():
+    stats = {"minHeartRate": 50, "maxHeartRate": 120, "activeSeconds": 1260}
+    assert _format(stats, ("minHeartRate", "maxHeartRate"), "{}-{} bpm") == "50-120 bpm"
+    assert _format(stats, "activeSeconds", lambda v: f"{v // 60}") == "21"
+    assert _format(stats, "totalSteps", "{}") == "-"
+
+
+def test_screen_redraws_only_changed_values(capsys):
+    screen = WatchScreen(["Steps", None, "Resting HR"])
+    capsys.readouterr()
+
+    assert screen.update({"Steps": "4200", "Resting HR": "60 bpm"}) == 2
+    assert screen.update({"Steps": "4300", "Resting HR": "60 bpm"}) == 1
+    out = capsys.readouterr().out
+    assert out.count("60 bpm") == 1 and "4300" in out
+
+
+def test_adaptive_refresh_fetches_the_daily_summary_every_stats_every(monkeypatch):
+    client, cadence, daily = TimelineClient(), Cadence(RequestBudget()), {}
+    clock = [1000.0]
+    monkeypatch.setattr(live_check.time, "monotonic", lambda: clock[0])
+
+    stats, spent = _adaptive_refresh(client, "2026-01-06", cadence, daily)
+    assert spent == 3 and client.calls.count("get_stats") == 1
+    # The timelines are fresher than the summary, so their numbers win
+    assert stats["totalSteps"] == 4200 and stats["restingHeartRate"] == 60
+    assert stats["bodyBatteryMostRecentValue"] == 42
+
+    clock[0] += 120
+    assert _adaptive_refresh(client, "2026-01-06", cadence, daily)[1] == 2
+    clock[0] += live_check.STATS_EVERY
+    assert _adaptive_refresh(client, "2026-01-06", cadence, daily)[1] == 3
+    assert _adaptive_refresh(client, "2026-01-07", cadence, daily)[1] == 3
+    assert client.calls.count("get_stats") == 3
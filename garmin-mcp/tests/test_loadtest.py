@@ -0,0 +1,43 @@
+import threading
+
+import pytest
+
+from garmin_endpoints import ENDPOINTS, fetch_endpoints
+from garmin_loadtest import FakeGarmin, FakeGarminClient, _percentile
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    server = FakeGarmin(latency=0, jitter=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GARMIN_FAKE_URL", server.url)
+    monkeypatch.setenv("GARMIN_LOAD_CLIENT", "room-1")
+    yield server
+    server.shutdown()
+
+
+def test_fake_client_answers_every_endpoint_and_is_counted(backend):
+    responses, errors = fetch_endpoints(FakeGarminClient(), "2026-01-06", budget=False)
+
+    assert not errors
+    assert set(responses) == {method for method, _ in ENDPOINTS}
+    assert responses["get_hrv_data"]["hrvSummary"]["status"] == "BALANCED"
+    assert FakeGarminClient().get_stress_data("2026-01-06")["avgStressLevel"]
+    assert backend.counts == {"room-1": {"requests": len(ENDPOINTS) + 1, "throttled": 0}}
+
+
+def test_fake_backend_throttles(backend):
+    backend.rate_429 = 1.0
+    with pytest.raises(RuntimeError, match="429"):
+        FakeGarminClient().get_stats("2026-01-06")
+    assert backend.counts["room-1"]["throttled"] == 1
+    with pytest.raises(AttributeError):
+        FakeGarminClient().get_everything
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 101))
+    assert (_percentile(values, 50), _percentile(values, 95), _percentile(values, 100)) == (50, 95, 100)
+    assert _percentile([], 50) is None
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import garmin_perf
+from garmin_perf import capture, profiled
+
+
+@pytest.fixture
+def perf_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_perf, "PERF_DIR", tmp_path)
+    monkeypatch.setattr(garmin_perf, "PERF_TARGETS", {"slow_tool"})
+    monkeypatch.setattr(garmin_perf, "PROFILED", {})
+    return tmp_path
+
+
+def _work():
+    return json.dumps([{"i": i, "values": list(range(50))} for i in range(300)])
+
+
+def test_capture_writes_a_profile_and_summary(perf_dir):
+    with capture("anything", force=True) as result:
+        _work()
+
+    assert result["label"] == "anything"
+    assert result["hotspots"] and result["peak_alloc_kb"] > 0
+    assert sorted(p.suffix for p in perf_dir.iterdir()) == [".prof", ".txt"]
+
+
+def test_only_selected_labels_and_one_capture_at_a_time(perf_dir):
+    with capture("other_tool") as result:
+        _work()
+    assert result == {}
+
+    with capture("slow_tool") as outer:
+        with capture("slow_tool") as inner:
+            _work()
+    assert inner == {} and outer["label"] == "slow_tool"
+
+
+def test_profiled_tool_returns_its_result_and_keeps_captures_bounded(perf_dir, monkeypatch):
+    monkeypatch.setattr(garmin_perf, "PERF_KEEP", 2)
+
+    @profiled
+    def slow_tool():
+        return _work()
+
+    for _ in range(4):
+        assert slow_tool() == _work()
+    assert garmin_perf.PROFILED["slow_tool"].__name__ == "slow_tool"
+    assert len(list(perf_dir.glob("*.prof"))) <= 2
@@ -0,0 +1,72 @@
+import random
+from datetime import date, datetime
+
+import pytest
+
+import garmin_profile
+from conftest import make_day
+from garmin_archive import load_index, put_day
+from garmin_profile import Cell, update_profile
+
+
+def _day_with_timelines(day: int) -> dict:
+    date_str = f"2026-01-{day:02d}"
+    record = make_day(date_str)
+    rng = random.Random(day)
+    start = int(datetime.fromisoformat(date_str).timestamp() * 1000)
+    record["intraday"] = {
+        "stress": [[start + m * 60000, rng.randint(-1, 90)] for m in range(0, 24 * 60, 3)],
+        "heart_rate": [[start + m * 60000, rng.randint(50, 120)] for m in range(0, 24 * 60, 2)],
+        "body_battery": [[start + m * 60000, 100 - m // 20] for m in range(0, 24 * 60, 5)],
+    }
+    return record
+
+
+def test_cell_merge_matches_adding_everything_to_one_cell():
+    rng = random.Random(5)
+    values = [rng.uniform(20, 90) for _ in range(500)]
+    whole, left, right = Cell(), Cell(), Cell()
+    for i, value in enumerate(values):
+        whole.add(value)
+        (left if i % 3 else right).add(value)
+
+    left.merge(right)
+    left.merge(Cell())
+
+    assert left.n == whole.n
+    assert left.mean == pytest.approx(whole.mean)
+    assert left.m2 == pytest.approx(whole.m2)
+    assert left.result()["sd"] == whole.result()["sd"]
+
+
+def test_incremental_folding_matches_a_full_rebuild(archive_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_profile, "PROFILE_FILE", tmp_path / "profile.json")
+    for day in range(1, 15):
+        put_day(_day_with_timelines(day))
+
+    # Three runs a few days apart, then the same history from scratch
+    for today in (date(2026, 1, 6), date(2026, 1, 11), date(2026, 1, 16)):
+        update_profile(today=today)
+    incremental = garmin_profile._load_cube()
+    assert update_profile(full=True, today=date(2026, 1, 16))["rebuilt"] is True
+    full = garmin_profile._load_cube()
+
+    assert incremental["days"] == full["days"] and len(full["days"]) == 14
+    assert incremental["readings"] == full["readings"]
+    assert incremental["cells"].keys() == full["cells"].keys()
+    for key, state in full["cells"].items():
+        assert Cell(*incremental["cells"][key]).result() == Cell(*state).result()
+
+
+def test_refolds_when_a_folded_day_changes(archive_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_profile, "PROFILE_FILE", tmp_path / "profile.json")
+    put_day(_day_with_timelines(5))
+    update_profile(today=date(2026, 1, 10))
+
+    resynced = _day_with_timelines(5)
+    resynced["intraday"]["stress"] = resynced["intraday"]["stress"][:10]
+    put_day(resynced)
+
+    assert update_profile(today=date(2026, 1, 10))["rebuilt"] is True
+    sha = load_index("2026-01")["days"]["2026-01-05"]["sha"]
+    assert garmin_profile._load_cube()["days"] == {"2026-01-05": sha}
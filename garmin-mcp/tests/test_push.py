@@ -0,0 +1,79 @@
+import http.client
+from datetime import date
+
+import pytest
+
+import garmin_push
+
+
+@pytest.fixture
+def receiver(tmp_path):
+    server = garmin_push.PushReceiver("127.0.0.1", 0, store=garmin_push.PushStore(tmp_path), token="s3cret").start()
+    yield server
+    server.shutdown()
+
+
+def post(server, body: bytes, headers: dict, path: str = "/garmin/push") -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    conn.putrequest("POST", path)
+    for name, value in headers.items():
+        conn.putheader(name, value)
+    conn.endheaders()
+    if body:
+        conn.send(body)
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+def test_rejects_before_reading_the_body(receiver):
+    # Claims a body it never sends - a handler that read first would hang here
+    assert post(receiver, b"", {"Content-Length": "1000"}) == 401
+    assert post(receiver, b"", {"Content-Length": "-5", "Authorization": "Bearer s3cret"}) == 400
+    assert receiver.stats["rejected"] == 2
+
+
+def test_latest_follows_new_pushes_without_rereading(tmp_path):
+    store = garmin_push.PushStore(tmp_path)
+    today = date.today().isoformat()
+    store.add([("dailies", {"summaryId": "d", "calendarDate": today, "steps": 1})])
+    assert store.latest("dailies", today)["steps"] == 1
+
+    (tmp_path / f"{today[:7]}.jsonl").write_bytes(b"")   # served from memory from here on
+    store.add([("dailies", {"summaryId": "d", "calendarDate": today, "steps": 2})])
+    assert store.latest("dailies", today)["steps"] == 2
+
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    import garmin_snapshot
+    path = tmp_path / "snapshot.json"
+    monkeypatch.setattr(garmin_snapshot, "SNAPSHOT_PATH", path)
+    return path
+
+
+def test_stress_only_push_keeps_the_rest_of_todays_snapshot(tmp_path, snapshot_path):
+    from garmin_snapshot import read_snapshot, write_snapshot
+    today = date.today().isoformat()
+    write_snapshot({"date": today, "heart_rate": {"resting": 61, "max": 120, "min": 52},
+                    "stress": {"avg": 30, "max": 70}, "hrv": {"last_night": 38},
+                    "body_battery": {"charged": 40, "drained": 35, "latest": 50}})
+    store = garmin_push.PushStore(tmp_path / "push")
+    stored = store.add([("stressDetails", {"summaryId": "s", "calendarDate": today,
+                                           "timeOffsetBodyBatteryValues": {"0": 55, "180": 57}})])["stored"]
+
+    assert garmin_push.refresh_snapshot(stored, store)
+
+    snapshot = read_snapshot()
+    assert snapshot["heart_rate"] == {"resting": 61, "max": 120, "min": 52}
+    assert snapshot["stress"] == {"avg": 30, "max": 70}
+    assert snapshot["body_battery"] == {"charged": 40, "drained": 35, "latest": 57}
+    assert snapshot["hrv"] == {"last_night": 38}
+
+
+def test_stress_only_push_without_a_snapshot_leaves_it_alone(tmp_path, snapshot_path):
+    store = garmin_push.PushStore(tmp_path / "push")
+    stored = store.add([("stressDetails", {"summaryId": "s", "calendarDate": date.today().isoformat()})])["stored"]
+
+    assert not garmin_push.refresh_snapshot(stored, store)
+    assert not snapshot_path.exists()
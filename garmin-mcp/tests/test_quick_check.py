@@ -0,0 +1,27 @@
+import garminconnect
+
+import garmin_snapshot
+import quick_check
+from conftest import FakeGarminClient
+from garmin_snapshot import read_snapshot, snapshot_from_stats
+
+
+class LoggedInClient(FakeGarminClient):
+    def login(self, token_store=None):
+        pass
+
+
+def test_live_snapshot_has_the_shape_every_writer_uses(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_snapshot, "SNAPSHOT_PATH", tmp_path / "snapshot.json")
+    monkeypatch.setattr(garminconnect, "Garmin", LoggedInClient)
+
+    result = quick_check.fetch_live({})
+
+    client = FakeGarminClient()
+    expected = snapshot_from_stats(client.get_stats(result["date"]),
+                                   client.get_hrv_data(result["date"])["hrvSummary"], result["date"])
+    assert {k: v for k, v in result.items() if k != "timestamp"} == \
+        {k: v for k, v in expected.items() if k != "timestamp"}
+    assert result["body_battery"]["latest"] == 42
+    assert result["hrv"]["last_night"] == 38
+    assert read_snapshot()["summary"] == result["summary"]
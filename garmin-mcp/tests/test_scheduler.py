@@ -0,0 +1,98 @@
+import os
+import time
+from datetime import date
+
+import pytest
+
+import garmin_scheduler
+import garmin_sync
+from conftest import FakeGarminClient, make_day
+from garmin_archive import is_archived, put_day, record_digest
+
+
+def test_digest_ignores_sync_timestamps_and_fetch_time():
+    day = make_day("2026-01-06")
+    resynced = make_day("2026-01-06")
+    resynced["fetched_at"] = "2026-01-07T11:30:00"
+    resynced["endpoints"]["get_stats"]["lastSyncTimestampGMT"] = "2026-01-07T11:29:40"
+    assert record_digest(resynced) == record_digest(day)
+    assert record_digest(make_day("2026-01-06", stress=31)) != record_digest(day)
+
+
+def test_digest_sees_endpoint_payloads_that_arrive_later():
+    day = make_day("2026-01-06")
+    resynced = make_day("2026-01-06")
+    resynced["endpoints"]["get_training_readiness"] = [{"score": 71}]
+    assert record_digest(resynced) != record_digest(day)
+
+    resynced = make_day("2026-01-06")
+    resynced["endpoints"]["get_stats"]["averageSpo2"] = 96
+    assert record_digest(resynced) != record_digest(day)
+
+
+def test_is_archived_after_volatile_resync(archive_path):
+    put_day(make_day("2026-01-06"))
+    resynced = make_day("2026-01-06")
+    resynced["endpoints"]["get_stats"]["lastSyncTimestampGMT"] = "later"
+    assert is_archived(resynced)
+    assert not is_archived(make_day("2026-01-06", resting=70))
+
+
+def test_daemon_resync_of_unchanged_day_writes_nothing(sync_dirs):
+    client = FakeGarminClient(volatile=True)
+    outcomes = [garmin_scheduler.sync_day(client, date(2026, 1, 6), []) for _ in range(3)]
+
+    assert outcomes == ["updated", "unchanged", "unchanged"]
+    with open(sync_dirs["memory"] / "memory-episodic.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 1
+
+
+def test_sync_lock_stays_held_past_stale_age(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_sync, "LOCK_HEARTBEAT", 0.05)
+    monkeypatch.setattr(garmin_sync, "LOCK_STALE_SECONDS", 0.3)
+    lock = tmp_path / ".sync.lock"
+
+    with garmin_sync.sync_lock(lock):
+        time.sleep(0.6)       # a long backfill
+        with pytest.raises(garmin_sync.SyncLocked):
+            with garmin_sync.sync_lock(lock):
+                pass
+    assert not lock.exists()
+
+
+def test_sync_lock_takes_over_after_a_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_sync, "LOCK_STALE_SECONDS", 0.3)
+    lock = tmp_path / ".sync.lock"
+    lock.write_text("12345 2026-01-07T06:00:00", encoding="utf-8")
+    stale = time.time() - 1
+    os.utime(lock, (stale, stale))
+
+    with garmin_sync.sync_lock(lock):
+        assert lock.read_text(encoding="utf-8").startswith(str(os.getpid()))
+
+
+def test_daemon_run_writes_todays_snapshot(sync_dirs, tmp_path, monkeypatch):
+    import garmin_snapshot
+    monkeypatch.setattr(garmin_scheduler, "STATE_FILE", tmp_path / "scheduler-state.json")
+    monkeypatch.setattr(garmin_scheduler, "RUN_LOG", tmp_path / "sync-runs.jsonl")
+    monkeypatch.setattr(garmin_snapshot, "SNAPSHOT_PATH", tmp_path / "snapshot.json")
+    monkeypatch.setattr(garmin_sync, "SYNC_LOCK", tmp_path / ".sync.lock")
+
+    report = garmin_scheduler.run_once(FakeGarminClient, "test")
+
+    assert report["status"] == "ok"
+    assert report["snapshot"] == "written"
+    snapshot = garmin_snapshot.read_snapshot()
+    assert snapshot["date"] == date.today().isoformat()
+    assert snapshot["body_battery"]["latest"] == 42
+    assert snapshot["hrv"]["last_night"] == 38
+    assert "summary" in snapshot
+
+
+def test_daemon_keeps_raw_json_when_asked(sync_dirs, tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_sync, "KEEP_RAW_JSON", True)
+    monkeypatch.setattr(garmin_sync, "GARMIN_DATA_PATH", tmp_path)
+
+    garmin_scheduler.sync_day(FakeGarminClient(), date(2026, 1, 6), [])
+
+    assert (tmp_path / "2026-01-06-raw.json").exists()
@@ -0,0 +1,55 @@
+import random
+import statistics
+from datetime import date, timedelta
+
+import pytest
+
+from garmin_stream import QuantileSketch, StreamSummary
+
+
+def _rows(values: list) -> list:
+    start = date(2026, 1, 1)
+    return [{"date": (start + timedelta(days=i)).isoformat(), "resting_hr": v} for i, v in enumerate(values)]
+
+
+def test_summary_matches_the_whole_list():
+    rng = random.Random(2)
+    values = [float(rng.randint(52, 70)) for _ in range(200)]
+    rows = _rows(values)
+    rows[5]["resting_hr"] = None
+
+    summary = StreamSummary(["resting_hr", "stress_avg"])
+    assert list(summary.consume(rows)) == rows
+    result = summary.result()
+
+    kept = [v for i, v in enumerate(values) if i != 5]
+    metric = result["metrics"]["resting_hr"]
+    assert (result["days"], result["days_with_data"]) == (200, 199)
+    assert metric["count"] == len(kept)
+    assert metric["mean"] == round(statistics.mean(kept), 1)
+    assert metric["sd"] == round(statistics.stdev(kept), 1)
+    assert (metric["min"], metric["max"], metric["latest"]) == (min(kept), max(kept), kept[-1])
+    # Fewer distinct values than bins, so the sketch is exact
+    assert metric["p50"] == pytest.approx(statistics.median(kept), abs=0.5)
+    assert result["metrics"]["stress_avg"] == {"count": 0}
+
+
+def test_trend_is_the_least_squares_slope_per_week():
+    summary = StreamSummary(["hrv"])
+    for row in _rows([30 + 0.5 * i for i in range(60)]):
+        summary.add({"date": row["date"], "hrv": row["resting_hr"]})
+    assert summary.result()["metrics"]["hrv"]["trend_per_week"] == 3.5
+
+
+def test_sketch_stays_bounded_and_close():
+    rng = random.Random(4)
+    values = [rng.gauss(40, 10) for _ in range(20000)]
+    sketch = QuantileSketch(bins=32)
+    for value in values:
+        sketch.add(value)
+
+    assert len(sketch.values) <= 32
+    ordered = sorted(values)
+    for q in (0.1, 0.5, 0.9):
+        assert sketch.quantile(q) == pytest.approx(ordered[int(q * len(ordered))], abs=1.5)
+    assert QuantileSketch.from_state(sketch.state()).quantile(0.5) == sketch.quantile(0.5)
@@ -0,0 +1,119 @@
+import json
+import threading
+from datetime import date
+
+import garmin_sync
+from conftest import FakeGarminClient, make_day
+
+
+def memory_entries(paths) -> list:
+    with open(paths["memory"] / "memory-episodic.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_backfill_rerun_writes_nothing(sync_dirs, capsys):
+    client = FakeGarminClient()
+    first = garmin_sync.backfill(client, date(2026, 1, 1), date(2026, 1, 5))
+    second = garmin_sync.backfill(client, date(2026, 1, 1), date(2026, 1, 5))
+
+    assert len(first) == 5
+    assert second == []
+    names = [entry["name"] for entry in memory_entries(sync_dirs)]
+    assert names == [f"Garmin_Sync_2026-01-0{d}" for d in range(1, 6)]
+
+
+def test_resync_updates_memory_entry_in_place(sync_dirs, capsys):
+    garmin_sync.backfill(FakeGarminClient(resting=60), date(2026, 1, 1), date(2026, 1, 3))
+    before = {entry["name"]: entry for entry in memory_entries(sync_dirs)}
+
+    changed = garmin_sync.backfill(FakeGarminClient(resting=55), date(2026, 1, 2), date(2026, 1, 2))
+
+    assert [data["date"] for data, _ in changed] == ["2026-01-02"]
+    after = memory_entries(sync_dirs)
+    assert [entry["name"] for entry in after] == list(before)
+    updated = after[1]
+    assert updated["created"] == before["Garmin_Sync_2026-01-02"]["created"]
+    assert updated["observations"][0]["raw_ref"] != before["Garmin_Sync_2026-01-02"]["observations"][0]["raw_ref"]
+
+
+def test_upsert_collapses_duplicates_left_by_older_syncs(sync_dirs):
+    memory_file = sync_dirs["memory"] / "memory-episodic.jsonl"
+    memory_file.parent.mkdir()
+    old = {"name": "Garmin_Sync_2026-01-01", "created": "2026-01-02T07:00:00", "observations": [{"content": "old"}]}
+    other = {"name": "Fox_Note", "observations": [{"content": "keep me"}]}
+    memory_file.write_text("".join(json.dumps(e) + "\n" for e in (old, other, old)), encoding="utf-8")
+
+    entry = {"name": "Garmin_Sync_2026-01-01", "created": "now", "observations": [{"content": "new"}]}
+    result = garmin_sync.upsert_companion_memory([entry], sync_dirs["memory"])
+
+    assert result["updated"] == ["Garmin_Sync_2026-01-01"]
+    entries = memory_entries(sync_dirs)
+    assert [e["name"] for e in entries] == ["Garmin_Sync_2026-01-01", "Fox_Note"]
+    assert entries[0]["created"] == "2026-01-02T07:00:00"
+    assert entries[0]["observations"][0]["content"] == "new"
+
+
+def test_rewrite_keeps_lines_appended_meanwhile(tmp_path):
+    memory_file = tmp_path / "memory-episodic.jsonl"
+    memory_file.write_text('{"name": "a"}\n{"name": "b"}\n', encoding="utf-8")
+    lines, end = garmin_sync._read_memory(memory_file)
+
+    # The companion appends while the rewrite is in progress
+    with open(memory_file, "a", encoding="utf-8") as f:
+        f.write('{"name": "c"}\n')
+    garmin_sync._replace_memory(memory_file, lines[1:], end)
+
+    assert memory_file.read_text(encoding="utf-8") == '{"name": "b"}\n{"name": "c"}\n'
+
+
+def test_slim_keeps_lines_appended_meanwhile(sync_dirs, monkeypatch):
+    garmin_sync.archive_day(make_day("2026-01-01"), sync_dirs["archive"])
+    memory_file = sync_dirs["memory"] / "memory-episodic.jsonl"
+    memory_file.parent.mkdir()
+    entry = {"name": "Garmin_Sync_2026-01-01",
+             "observations": [{"content": "day", "raw_data": make_day("2026-01-01")["metrics"]}]}
+    memory_file.write_text(json.dumps(entry) + "\n", encoding="utf-8")
+
+    load_index = garmin_sync.load_index
+
+    def load_index_while_companion_appends(month, archive_path=None):
+        with open(memory_file, "a", encoding="utf-8") as f:
+            f.write('{"name": "Fox_Note"}\n')
+        return load_index(month, archive_path)
+
+    monkeypatch.setattr(garmin_sync, "load_index", load_index_while_companion_appends)
+    stats = garmin_sync.slim_companion_memory(sync_dirs["memory"], sync_dirs["archive"], log=lambda message: None)
+
+    assert stats["slimmed"] == 1
+    entries = memory_entries(sync_dirs)
+    assert [e["name"] for e in entries] == ["Garmin_Sync_2026-01-01", "Fox_Note"]
+    assert "raw_ref" in entries[0]["observations"][0]
+
+
+def test_slim_waits_for_the_memory_lock(sync_dirs):
+    memory_file = sync_dirs["memory"] / "memory-episodic.jsonl"
+    memory_file.parent.mkdir()
+    memory_file.write_text('{"name": "Fox_Note"}\n', encoding="utf-8")
+
+    with garmin_sync._memory_lock(memory_file):
+        slim = threading.Thread(target=garmin_sync.slim_companion_memory,
+                                args=(sync_dirs["memory"], sync_dirs["archive"], lambda message: None))
+        slim.start()
+        slim.join(0.3)
+        assert slim.is_alive()
+    slim.join(5)
+    assert not slim.is_alive()
+
+
+def test_slim_keeps_numbers_the_archive_no_longer_has(sync_dirs):
+    garmin_sync.archive_day(make_day("2026-01-01", resting=55), sync_dirs["archive"])
+    memory_file = sync_dirs["memory"] / "memory-episodic.jsonl"
+    memory_file.parent.mkdir()
+    original = make_day("2026-01-01", resting=60)["metrics"]
+    entry = {"name": "Garmin_Sync_2026-01-01", "observations": [{"content": "day", "raw_data": original}]}
+    memory_file.write_text(json.dumps(entry) + "\n", encoding="utf-8")
+
+    stats = garmin_sync.slim_companion_memory(sync_dirs["memory"], sync_dirs["archive"], log=lambda message: None)
+
+    assert (stats["slimmed"], stats["kept"]) == (0, 1)
+    assert memory_entries(sync_dirs)[0]["observations"][0]["raw_data"] == original
@@ -0,0 +1,49 @@
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+import garmin_uplink
+from conftest import make_day
+
+pytest.importorskip("requests")
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    monkeypatch.setattr(garmin_uplink, "QUEUE_PATH", tmp_path / "uplink-queue.jsonl")
+    server = garmin_uplink.make_stand_in()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+
+
+def manual_uplink():
+    return {"spoons": 3, "pain": 6, "fog": 4, "mood": "flaring", "location": "Bed",
+            "notes": "rough morning", "tags": ["flare"], "timestamp": "2026-01-07T09:00:00"}
+
+
+def test_push_keeps_foxs_fields(worker):
+    worker.uplinks.append(manual_uplink())
+    today = date.today().isoformat()
+
+    result = garmin_uplink.push_days([(make_day(today, resting=64), 7)], worker.url)
+
+    assert result["sent"] == 1
+    pushed = worker.uplinks[-1]
+    assert (pushed["spoons"], pushed["pain"], pushed["fog"]) == (3, 6, 4)
+    assert (pushed["mood"], pushed["location"], pushed["notes"]) == ("flaring", "Bed", "rough morning")
+    assert pushed["estimatedSpoons"] == 7
+    assert pushed["hr"] == 64
+    assert pushed["tags"] == ["flare", "garmin-sync"]
+
+
+def test_old_days_are_not_pushed(worker):
+    old = (date.today() - timedelta(days=30)).isoformat()
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    result = garmin_uplink.push_days([(make_day(old), 5), (make_day(yesterday), 6)], worker.url)
+
+    assert (result["sent"], result["skipped"]) == (1, 1)
+    assert [u["date"] for u in worker.uplinks] == [yesterday]
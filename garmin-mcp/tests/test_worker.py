@@ -0,0 +1,107 @@
+import time
+from datetime import date
+
+import pytest
+
+import garmin_worker
+from conftest import FakeGarminClient
+from garmin_worker import AccountJob, BudgetedClient, run_roster
+
+
+DAYS = [date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7)]
+
+
+class SlowClient:
+    """A FakeGarminClient where every call takes `delay` seconds, like a round-trip to Garmin."""
+
+    def __init__(self, delay: float):
+        self._client, self.delay = FakeGarminClient(), delay
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        def call(*args):
+            time.sleep(self.delay)
+            return method(*args)
+        return call
+
+
+class ThrottledClient(FakeGarminClient):
+    def get_stats(self, date_str):
+        raise Exception("429 Client Error: Too Many Requests")
+
+
+@pytest.fixture
+def roster(tmp_path, sync_dirs, monkeypatch):
+    """Account specs in tmp_path; `clients` maps an account name to the client it connects with."""
+    clients = {}
+
+    def connect(job):
+        job.client = BudgetedClient(clients.get(job.name) or FakeGarminClient(), job)
+    monkeypatch.setattr(AccountJob, "connect", connect)
+
+    def make(*names):
+        return [{"name": name, "requests_per_minute": 6000,
+                 "garmin_data_path": str(tmp_path / name),
+                 "health_logs_path": str(tmp_path / name / "logs"),
+                 "companion_memory_path": str(tmp_path / name / "memory")} for name in names]
+    make.clients = clients
+    return make
+
+
+def test_accounts_take_turns(roster, monkeypatch):
+    order = []
+    sync_one = AccountJob.sync_one
+
+    def recorded(job):
+        order.append((job.name, job.pending[0]))
+        return sync_one(job)
+    monkeypatch.setattr(AccountJob, "sync_one", recorded)
+
+    report = run_roster(roster("fox", "smith"), DAYS, workers=1)
+
+    assert [name for name, _ in order] == ["fox", "smith"] * len(DAYS)
+    assert all(row["synced"] == len(DAYS) and not row["failed"] for row in report)
+
+
+def test_throttled_account_doesnt_hold_up_the_rest(roster, monkeypatch):
+    monkeypatch.setattr(garmin_worker, "THROTTLE_COOLDOWN", 0.2)
+    roster.clients["fox"] = ThrottledClient()
+
+    report = {row["account"]: row for row in run_roster(roster("fox", "smith"), DAYS, workers=1)}
+
+    assert report["smith"]["synced"] == len(DAYS)
+    assert report["smith"]["finished_after"] < 0.2
+    assert report["fox"]["throttles"] == garmin_worker.MAX_THROTTLES
+    assert report["fox"]["synced"] == 0
+    assert len(report["fox"]["failed"]) == len(DAYS)
+
+
+def test_more_workers_sync_accounts_in_parallel(roster):
+    names = ["a", "b", "c", "d"]
+    for name in names:
+        roster.clients[name] = SlowClient(delay=0.05)
+
+    started = time.monotonic()
+    run_roster(roster(*names), DAYS[:1], workers=1)
+    serial = time.monotonic() - started
+
+    started = time.monotonic()
+    report = run_roster(roster(*names), DAYS[1:2], workers=4)
+    parallel = time.monotonic() - started
+
+    assert all(row["synced"] == 1 for row in report)
+    assert parallel < serial * 0.6
+
+
+def test_failed_health_log_write_doesnt_kill_the_worker(roster, monkeypatch):
+    def broken(batch, logs_path=None):
+        raise OSError("disk full")
+    monkeypatch.setattr(garmin_worker, "write_health_logs", broken)
+
+    report = run_roster(roster("fox", "smith"), DAYS, workers=1)
+
+    for row in report:
+        assert row["error"] == "disk full"
+        assert row["synced"] == 0
+        assert sorted(row["failed"]) == [d.isoformat() for d in DAYS]